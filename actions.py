@@ -1,32 +1,39 @@
 """Action module.
 
 This module contains the functions called when executing a command.
-Each function takes 3 parameters:
-- game: the game object
-- list_of_words: the list of words from the command
-- number_of_parameters: the number of expected parameters
+Each function takes the game object followed by the parameters of the
+command, already split, checked and corrected by the dispatcher according to
+the signature of the command (see `command.py`).
 
 The functions return True if the command was executed correctly, False otherwise.
-They display an error message if the number of parameters is incorrect.
+All the text is sent to the output sink of the game (`game.out`, see `output.py`).
 
-Error messages are stored in `MSG0` and `MSG1` formatted with the command word.
+Error messages are stored in `MSG0` and `MSG1` formatted with the command word;
+the dispatcher prints them when the number of parameters is incorrect.
 `MSG0` is used for commands without parameters.
 """
 MSG0 = "\nLa commande '{command_word}' ne prend pas de paramètre.\n"
 # The message used when the command takes 1 parameter.
 MSG1 = "\nLa commande '{command_word}' prend 1 seul paramètre.\n"
+# Rooms where moving in or out does not count as a displacement.
+FREE_ROOMS = {"Grenier", "Jardin", "Cave", "Labo du commissariat"}
+# Displacements of one day of investigation: the time limit of the rules
+# (`Game.max_displacements`) is announced in days of this length.
+DAY_MOVES = 10
+# Rooms to visit and items to collect to complete Quest 1.
+CRIME_SCENE_ROOMS = ("Grenier", "Maison du crime", "Cave", "Jardin")
+CRIME_SCENE_ITEMS = ("photos", "couteau", "coffre", "arme")
 
 class Actions:
 
-    def go(game, list_of_words, number_of_parameters):
+    def go(game, direction):
         """
         Move the player in the direction specified as a parameter.
         The expected parameter is a cardinal direction (N, E, S, O, U, D).
 
         Parameters:
             game (Game): the game object.
-            list_of_words (list): the list of words from the command.
-            number_of_parameters (int): the number of expected parameters.
+            direction (str): the direction (N, E, S, O, U, D).
 
         Returns:
             bool: True if the command succeeded, False otherwise.
@@ -34,15 +41,6 @@ class Actions:
         
         
         player = game.player
-        l = len(list_of_words)
-        # If the number of parameters is incorrect, print an error message and return False.
-        if l != number_of_parameters + 1:
-            command_word = list_of_words[0]
-            print(MSG1.format(command_word=command_word))
-            return False
-
-        # Get the direction from the list of words.
-        direction = list_of_words[1]
         # Store current room before moving
         old_room = player.current_room
         # Move the player in the direction specified by the parameter.
@@ -51,7 +49,7 @@ class Actions:
         new_room = player.current_room
         if old_room != new_room:
             # Track crime scene rooms for Quest 1
-            if new_room.name in ["Grenier", "Maison du crime", "Cave", "Jardin"]:
+            if new_room.name in CRIME_SCENE_ROOMS:
                 game.visited_crime_scene_rooms.add(new_room.name)
                 # Check if Quest 1 should be completed
                 game.check_quest1_completion()
@@ -60,177 +58,151 @@ class Actions:
             game.quest_manager.check_room_objectives(new_room.name)
             
             # Count displacement if not in excluded rooms
-            excluded_rooms = {"Grenier", "Jardin", "Cave", "Labo du commissariat"}
-            if new_room.name not in excluded_rooms and old_room.name not in excluded_rooms:
+            if new_room.name not in FREE_ROOMS and old_room.name not in FREE_ROOMS:
                 game.displacement_count += 1
                 
-                # Display daily reminder every 10 displacements
-                if game.displacement_count % 10 == 0:
-                    day_number = game.displacement_count // 10
-                    remaining_moves = 40 - game.displacement_count
-                    remaining_days = 4 - day_number
+                # Display daily reminder at the end of each day
+                total_moves = game.max_displacements
+                remaining_moves = total_moves - game.displacement_count
+                if game.displacement_count % DAY_MOVES == 0:
+                    day_number = game.displacement_count // DAY_MOVES
+                    remaining_days = total_moves / DAY_MOVES - day_number
                     
-                    print("\n" + "="*60)
-                    print(f"FIN DU JOUR {day_number}")
-                    print("="*60)
-                    print(f"Déplacements effectués: {game.displacement_count}/40")
-                    print(f"Déplacements restants: {remaining_moves}")
-                    print(f"Jours restants: {remaining_days}")
-                    print("="*60 + "\n")
+                    game.out.print("\n" + "="*60)
+                    game.out.print(f"FIN DU JOUR {day_number}")
+                    game.out.print("="*60)
+                    game.out.print(f"Déplacements effectués: {game.displacement_count}/{total_moves}")
+                    game.out.print(f"Déplacements restants: {remaining_moves}")
+                    game.out.print(f"Jours restants: {remaining_days:g}")
+                    game.out.print("="*60 + "\n")
                     
-                    if remaining_days == 0:
-                        print("ATTENTION: Vous manquez de temps!\n")
+                    if remaining_days <= 0:
+                        game.out.print("ATTENTION: Vous manquez de temps!\n")
                 else:
-                    remaining_moves = 40 - game.displacement_count
-                    remaining_days = (remaining_moves / 40) * 4
-                    print(f"Déplacements: {game.displacement_count}/40 | Temps restant: ≈ {remaining_days:.1f} jours")
+                    remaining_days = remaining_moves / DAY_MOVES
+                    game.out.print(f"Déplacements: {game.displacement_count}/{total_moves} | Temps restant: ≈ {remaining_days:.1f} jours")
                     if remaining_moves <= 5:
-                        print("ATTENTION: Vous manquez de temps!")
+                        game.out.print("ATTENTION: Vous manquez de temps!")
         return True
 
 
 
-    def quit(game, list_of_words, number_of_parameters):
+    def quit(game):
         """
         Quit the game.
 
         Parameters:
             game (Game): the game object.
-            list_of_words (list): the list of words from the command.
-            number_of_parameters (int): the number of expected parameters.
 
         Returns:
             bool: True if the command succeeded, False otherwise.
         """
-        l = len(list_of_words)
-        # If the number of parameters is incorrect, print an error message and return False.
-        if l != number_of_parameters + 1:
-            command_word = list_of_words[0]
-            print(MSG0.format(command_word=command_word))
-            return False
-        
         # Set the finished attribute of the game object to True.
         player = game.player
         msg = f"\nMerci {player.name} d'avoir joué. Au revoir.\n"
-        print(msg)
+        game.out.print(msg)
         game.finished = True
         return True
 
-    def help(game, list_of_words, number_of_parameters):
+    def help(game):
         """
         Display the list of available commands.
 
         Parameters:
             game (Game): the game object.
-            list_of_words (list): the list of words from the command.
-            number_of_parameters (int): the number of expected parameters.
 
         Returns:
             bool: True if the command succeeded, False otherwise.
         """
 
-        # If the number of parameters is incorrect, print an error message and return False.
-        l = len(list_of_words)
-        if l != number_of_parameters + 1:
-            command_word = list_of_words[0]
-            print(MSG0.format(command_word=command_word))
-            return False
-        
+        # Display only: nothing to do when the output is discarded
+        if not game.out.enabled:
+            return True
+
         # Print the list of available commands.
-        print("\nVoici les commandes disponibles:")
+        game.out.print("\nVoici les commandes disponibles:")
         for command in game.commands.values():
-            print("\t- " + str(command))
-        
-        print("\n" + "="*60)
-        print("CONSEILS IMPORTANTS")
-        print("="*60)
-        print("\n1. PRENDRE ET EXAMINER LES OBJETS:")
-        print("   - Commande: take <objet>")
-        print("   - Les objets doivent etre dans votre inventaire pour etre analyses")
-        print("   - Examinez les objets pour obtenir des indices: examine <objet>")
-        print("   - Verifiez votre inventaire avec 'check'")
-        
-        print("\n2. UTILISER LES OBJETS (Interagir):")
-        print("   - Commande: use <objet1> on <objet2>")
-        print("   - Exemple: use cle on coffre (ouvre le coffre avec la cle)")
-        print("   - Revele des indices importants et des secrets")
-        
-        print("\n3. ANALYSER LES OBJETS (Un par un):")
-        print("   - Allez au Labo du commissariat")
-        print("   - L'objet doit etre dans votre inventaire")
-        print("   - Commande: analyze <objet>")
-        print("   - Vous pouvez analyser les 6 objets UN PAR UN")
-        print("   - Pas besoin d'avoir tous les objets en meme temps")
-        print("   - Apres chaque analyse, parlez au Chimiste: talk Chimiste")
-        
-        print("\n4. QUETES ET RECOMPENSES:")
-        print("   - Commande: quests")
-        print("   - Chaque quete completee donne un INDICE comme recompense")
-        print("   - Les indices vous aident a resoudre l'enquete")
-        
-        print("\n5. OBJETS A ANALYSER (6 requis):")
-        print("   - couteau, cle, lettre, coffre, photos, arme")
-        
-        print("\n6. RESOUDRE L'ENQUETE:")
-        print("   - Collecter les 6 objets requis")
-        print("   - Examiner les objets pour obtenir des indices (examine <objet>)")
-        print("   - Analyser tous les 6 objets au Labo")
-        print("   - Parler au Chimiste APRES chaque analyse pour obtenir les resultats")
-        print("   - Interroger les suspects pour decouvrir le coupable")
-        print("   - Accuser le coupable au Commissariat")
-        print("   - Tout faire en moins de 40 deplacements")
-        print("="*60 + "\n")
+            game.out.print("\t- " + str(command))
+        
+        game.out.print("\n" + "="*60)
+        game.out.print("CONSEILS IMPORTANTS")
+        game.out.print("="*60)
+        game.out.print("\n1. PRENDRE ET EXAMINER LES OBJETS:")
+        game.out.print("   - Commande: take <objet>")
+        game.out.print("   - Les objets doivent etre dans votre inventaire pour etre analyses")
+        game.out.print("   - Examinez les objets pour obtenir des indices: examine <objet>")
+        game.out.print("   - Verifiez votre inventaire avec 'check'")
+        
+        game.out.print("\n2. UTILISER LES OBJETS (Interagir):")
+        game.out.print("   - Commande: use <objet1> on <objet2>")
+        game.out.print("   - Exemple: use cle on coffre (ouvre le coffre avec la cle)")
+        game.out.print("   - Revele des indices importants et des secrets")
+        
+        game.out.print("\n3. ANALYSER LES OBJETS (Un par un):")
+        game.out.print("   - Allez au Labo du commissariat")
+        game.out.print("   - L'objet doit etre dans votre inventaire")
+        game.out.print("   - Commande: analyze <objet>")
+        game.out.print("   - Vous pouvez analyser les 6 objets UN PAR UN")
+        game.out.print("   - Pas besoin d'avoir tous les objets en meme temps")
+        game.out.print("   - Apres chaque analyse, parlez au Chimiste: talk Chimiste")
+        
+        game.out.print("\n4. QUETES ET RECOMPENSES:")
+        game.out.print("   - Commande: quests")
+        game.out.print("   - Chaque quete completee donne un INDICE comme recompense")
+        game.out.print("   - Les indices vous aident a resoudre l'enquete")
+        
+        game.out.print("\n5. OBJETS A ANALYSER (6 requis):")
+        game.out.print("   - couteau, cle, lettre, coffre, photos, arme")
+        
+        game.out.print("\n6. RESOUDRE L'ENQUETE:")
+        game.out.print("   - Collecter les 6 objets requis")
+        game.out.print("   - Examiner les objets pour obtenir des indices (examine <objet>)")
+        game.out.print("   - Analyser tous les 6 objets au Labo")
+        game.out.print("   - Parler au Chimiste APRES chaque analyse pour obtenir les resultats")
+        game.out.print("   - Interroger les suspects pour decouvrir le coupable")
+        game.out.print("   - Accuser le coupable au Commissariat")
+        game.out.print(f"   - Tout faire en moins de {game.max_displacements} deplacements")
+        game.out.print("="*60 + "\n")
         return True
 
-    def back(game, list_of_words, number_of_parameters):
+    def back(game):
         """
         Return to the previous room.
 
         Parameters:
             game (Game): the game object.
-            list_of_words (list): the list of words from the command.
-            number_of_parameters (int): the number of expected parameters.
 
         Returns:
             bool: True if the command succeeded, False otherwise.
         """
-        l = len(list_of_words)
-        if l != number_of_parameters + 1:
-            command_word = list_of_words[0]
-            print(MSG0.format(command_word=command_word))
-            return False
-        
         player = game.player
         if len(player.history) > 1:
             player.history.pop()
             player.current_room = player.history[-1]
-            print(player.current_room.get_long_description())
-            print(Actions.get_history(player))
+            if game.out.enabled:
+                game.out.print(player.current_room.get_long_description())
+                game.out.print(Actions.get_history(player))
             return True
         else:
-            print("\nVous ne pouvez pas revenir plus loin.\n")
+            game.out.print("\nVous ne pouvez pas revenir plus loin.\n")
             return False
 
-    def history(game, list_of_words, number_of_parameters):
+    def history(game):
         """
         Display the history of visited rooms.
 
         Parameters:
             game (Game): the game object.
-            list_of_words (list): the list of words from the command.
-            number_of_parameters (int): the number of expected parameters.
 
         Returns:
             bool: True if the command succeeded, False otherwise.
         """
-        l = len(list_of_words)
-        if l != number_of_parameters + 1:
-            command_word = list_of_words[0]
-            print(MSG0.format(command_word=command_word))
-            return False
-        
+        # Display only: nothing to do when the output is discarded
+        if not game.out.enabled:
+            return True
+
         player = game.player
-        print(Actions.get_history(player))
+        game.out.print(Actions.get_history(player))
         return True
 
     def get_history(player):
@@ -251,77 +223,65 @@ class Actions:
         result += "\n"
         return result
 
-    def look(game, list_of_words, number_of_parameters):
+    def look(game):
         """
         Display the room description, items, and NPCs.
 
         Parameters:
             game (Game): The game object.
-            list_of_words (list): The list of words from the command.
-            number_of_parameters (int): The number of expected parameters.
 
         Returns:
             bool: True if the command was executed successfully, False otherwise.
         """
-        l = len(list_of_words)
-        if l != number_of_parameters + 1:
-            command_word = list_of_words[0]
-            print(MSG0.format(command_word=command_word))
-            return False
-        
+        # Display only: nothing to do when the output is discarded
+        if not game.out.enabled:
+            return True
+
         player = game.player
         room = player.current_room
         
         # Display items
         if len(room.inventory) > 0:
-            print("\nOn voit:")
+            game.out.print("\nOn voit:")
             for item in room.inventory.values():
-                print(f"    - {item}")
+                game.out.print(f"    - {item}")
         else:
-            print("\nIl n'y a rien ici.")
+            game.out.print("\nIl n'y a rien ici.")
         
         # Display characters
         if len(room.characters) > 0:
-            print("\nPersonnages présents:")
+            game.out.print("\nPersonnages présents:")
             for character in room.characters.values():
-                print(f"    - {character}")
+                game.out.print(f"    - {character}")
         
-        print()
+        game.out.print()
         return True
 
-    def take(game, list_of_words, number_of_parameters):
+    def take(game, item_name):
         """
         Allow the player to take an item from the room.
 
         Parameters:
             game (Game): The game object.
-            list_of_words (list): The list of words from the command.
-            number_of_parameters (int): The number of expected parameters.
+            item_name (str): the name of the item.
 
         Returns:
             bool: True if the command was executed successfully, False otherwise.
         """
-        l = len(list_of_words)
-        if l != number_of_parameters + 1:
-            command_word = list_of_words[0]
-            print(MSG1.format(command_word=command_word))
-            return False
-        
         player = game.player
-        item_name = list_of_words[1]
         
         # Check if the item exists in the room
         if item_name not in player.current_room.inventory:
-            print(f"\nL'objet '{item_name}' n'est pas dans la pièce.\n")
+            game.out.print(f"\nL'objet '{item_name}' n'est pas dans la pièce.\n")
             return False
         
         # Take the item
         item = player.current_room.inventory.pop(item_name)
         player.inventory[item_name] = item
-        print(f"\nVous avez pris l'objet '{item_name}'.\n")
+        game.out.print(f"\nVous avez pris l'objet '{item_name}'.\n")
         
         # Track items for Quest 1
-        if item_name in ["photos", "couteau", "coffre", "arme"]:
+        if item_name in CRIME_SCENE_ITEMS:
             game.collected_items.add(item_name)
             # Check if Quest 1 should be completed
             game.check_quest1_completion()
@@ -350,115 +310,87 @@ class Actions:
         
         return True
 
-    def drop(game, list_of_words, number_of_parameters):
+    def drop(game, item_name):
         """
         Allow the player to drop an item in the room.
 
         Parameters:
             game (Game): The game object.
-            list_of_words (list): The list of words from the command.
-            number_of_parameters (int): The number of expected parameters.
+            item_name (str): the name of the item.
 
         Returns:
             bool: True if the command was executed successfully, False otherwise.
         """
-        l = len(list_of_words)
-        if l != number_of_parameters + 1:
-            command_word = list_of_words[0]
-            print(MSG1.format(command_word=command_word))
-            return False
-        
         player = game.player
-        item_name = list_of_words[1]
         
         # Check if the item exists in the inventory
         if item_name not in player.inventory:
-            print(f"\nL'objet '{item_name}' n'est pas dans l'inventaire.\n")
+            game.out.print(f"\nL'objet '{item_name}' n'est pas dans l'inventaire.\n")
             return False
         
         # Drop the item
         item = player.inventory.pop(item_name)
         player.current_room.inventory[item_name] = item
-        print(f"\nVous avez déposé l'objet '{item_name}'.\n")
+        game.out.print(f"\nVous avez déposé l'objet '{item_name}'.\n")
         return True
 
-    def check(game, list_of_words, number_of_parameters):
+    def check(game):
         """
         Display the player's inventory.
 
         Parameters:
             game (Game): The game object.
-            list_of_words (list): The list of words from the command.
-            number_of_parameters (int): The number of expected parameters.
 
         Returns:
             bool: True if the command was executed successfully, False otherwise.
         """
-        l = len(list_of_words)
-        if l != number_of_parameters + 1:
-            command_word = list_of_words[0]
-            print(MSG0.format(command_word=command_word))
-            return False
-        
+        # Display only: nothing to do when the output is discarded
+        if not game.out.enabled:
+            return True
+
         player = game.player
-        print(player.get_inventory())
+        game.out.print(player.get_inventory())
         return True
 
-    def wait(game, list_of_words, number_of_parameters):
+    def wait(game):
         """
         Advance NPCs by one step (manual 'wait' command).
 
         Parameters:
             game (Game): The game object.
-            list_of_words (list): The list of words from the command.
-            number_of_parameters (int): The number of expected parameters.
 
         Returns:
             bool: True if the command succeeded, False otherwise.
         """
-        l = len(list_of_words)
-        if l != number_of_parameters + 1:
-            command_word = list_of_words[0]
-            print(MSG0.format(command_word=command_word))
-            return False
         try:
             game.update_characters()
             return True
         except Exception:
-            print("\nImpossible d'avancer les PNJ pour le moment.\n")
+            game.out.print("\nImpossible d'avancer les PNJ pour le moment.\n")
             return False
 
-    def talk(game, list_of_words, number_of_parameters):
+    def talk(game, target_name):
         """
         Allow the player to speak to a character in the room.
 
         Parameters:
             game (Game): The game object.
-            list_of_words (list): The list of words from the command.
-            number_of_parameters (int): The number of expected parameters.
+            target_name (str): the name of the character.
 
         Returns:
             bool: True if the command was executed successfully, False otherwise.
         """
-        l = len(list_of_words)
-        # Allow composite names (multiple words) for the NPC:
-        if l < 2:
-            command_word = list_of_words[0]
-            print(MSG1.format(command_word=command_word))
-            return False
-
         player = game.player
         room = player.current_room
-        target_name = " ".join(list_of_words[1:])
         
         # Check if the character exists in the room
         character = room.characters.get(target_name, None)
         if character is None:
-            print(f"\nIl n'y a pas de personnage nommé '{target_name}' ici.\n")
+            game.out.print(f"\nIl n'y a pas de personnage nommé '{target_name}' ici.\n")
             return False
         
         # Display the character's message
-        print(character.get_msg())
+        game.out.print(character.get_msg())
         
         # Complete objectives based on talking to specific characters
         if target_name == "Médecin légiste":
@@ -476,30 +408,22 @@ class Actions:
         
         return True
 
-    def examine(game, list_of_words, number_of_parameters):
+    def examine(game, item_name):
         """
         Allow the player to examine an item and get more details/clues.
 
         Parameters:
             game (Game): The game object.
-            list_of_words (list): The list of words from the command.
-            number_of_parameters (int): The number of expected parameters.
+            item_name (str): the name of the item.
 
         Returns:
             bool: True if the command was executed successfully, False otherwise.
         """
-        l = len(list_of_words)
-        if l != number_of_parameters + 1:
-            command_word = list_of_words[0]
-            print(MSG1.format(command_word=command_word))
-            return False
-
         player = game.player
-        item_name = list_of_words[1]
         
         # Check if the item is in player's inventory
         if item_name not in player.inventory:
-            print(f"\nVous n'avez pas l'objet '{item_name}' dans votre inventaire.\n")
+            game.out.print(f"\nVous n'avez pas l'objet '{item_name}' dans votre inventaire.\n")
             return False
         
         # Item examinations with clues
@@ -513,111 +437,95 @@ class Actions:
         }
         
         if item_name in examinations:
-            print(examinations[item_name])
+            game.out.print(examinations[item_name])
             if item_name == "lettre":
                 game.quest_manager.complete_objective("Lire la lettre")
                 game.quest_manager.complete_quest("Lire la lettre mystérieuse", game.player)
         else:
-            print(f"\nVous examinez '{item_name}' mais ne trouvez rien d'intéressant.\n")
+            game.out.print(f"\nVous examinez '{item_name}' mais ne trouvez rien d'intéressant.\n")
         
         return True
 
-    def use(game, list_of_words, number_of_parameters):
+    def use(game, item1, item2):
         """
         Allow the player to use one item on another (e.g., key on chest).
 
         Parameters:
             game (Game): The game object.
-            list_of_words (list): The list of words from the command.
-            number_of_parameters (int): The number of expected parameters (flexible).
+            item1 (str): the item to use.
+            item2 (str): the item it is used on.
 
         Returns:
             bool: True if the command was executed successfully, False otherwise.
         """
-        l = len(list_of_words)
-        # We need at least 4 words: 'use', 'item1', 'on', 'item2'
-        if l < 4 or list_of_words[2].lower() != 'on':
-            print("\nUtilisation: use <objet1> on <objet2>\n")
-            return False
-
         player = game.player
-        item1 = list_of_words[1]
-        item2 = list_of_words[3]
         
         # Check if both items are in player's inventory
         if item1 not in player.inventory:
-            print(f"\nVous n'avez pas '{item1}' dans votre inventaire.\n")
+            game.out.print(f"\nVous n'avez pas '{item1}' dans votre inventaire.\n")
             return False
         
         if item2 not in player.inventory:
-            print(f"\nVous n'avez pas '{item2}' dans votre inventaire.\n")
+            game.out.print(f"\nVous n'avez pas '{item2}' dans votre inventaire.\n")
             return False
         
         # Use key on chest
         if item1 == "clé" and item2 == "coffre":
             if "clé_utilisée" not in game.flags:
                 game.flags.add("clé_utilisée")
-                print("\n Vous utilisez la clé sur le coffre.")
-                print("Le coffre s'ouvre et révèle son contenu caché!\n")
-                print(" DÉCOUVERTE MAJEURE:")
-                print("   Des documents secrets de Durand prouvant sa culpabilité!\n")
-                print("   Indice crucial: Durand est bien le coupable!\n")
+                game.out.print("\n Vous utilisez la clé sur le coffre.")
+                game.out.print("Le coffre s'ouvre et révèle son contenu caché!\n")
+                game.out.print(" DÉCOUVERTE MAJEURE:")
+                game.out.print("   Des documents secrets de Durand prouvant sa culpabilité!\n")
+                game.out.print("   Indice crucial: Durand est bien le coupable!\n")
                 game.quest_manager.complete_objective("Ouvrir le coffre")
                 game.quest_manager.complete_quest("Ouvrir le coffre", game.player)
             else:
-                print("\nLe coffre est déjà ouvert.\n")
+                game.out.print("\nLe coffre est déjà ouvert.\n")
             return True
         
         # Use chest with key (reverse order)
         elif item1 == "coffre" and item2 == "clé":
             if "clé_utilisée" not in game.flags:
                 game.flags.add("clé_utilisée")
-                print("\n Vous utilisez la clé sur le coffre.")
-                print("Le coffre s'ouvre et révèle son contenu caché!\n")
-                print(" DÉCOUVERTE MAJEURE:")
-                print("   Des documents secrets de Durand prouvant sa culpabilité!\n")
-                print("   Indice crucial: Durand est bien le coupable!\n")
+                game.out.print("\n Vous utilisez la clé sur le coffre.")
+                game.out.print("Le coffre s'ouvre et révèle son contenu caché!\n")
+                game.out.print(" DÉCOUVERTE MAJEURE:")
+                game.out.print("   Des documents secrets de Durand prouvant sa culpabilité!\n")
+                game.out.print("   Indice crucial: Durand est bien le coupable!\n")
                 game.quest_manager.complete_objective("Ouvrir le coffre")
                 game.quest_manager.complete_quest("Ouvrir le coffre", game.player)
             else:
-                print("\nLe coffre est déjà ouvert.\n")
+                game.out.print("\nLe coffre est déjà ouvert.\n")
             return True
         
         else:
-            print(f"\nVous ne pouvez pas utiliser '{item1}' sur '{item2}'.\n")
+            game.out.print(f"\nVous ne pouvez pas utiliser '{item1}' sur '{item2}'.\n")
             return False
 
-    def accuse(game, list_of_words, number_of_parameters):
+    def accuse(game, accused_name):
         """
         Allow the player to accuse a character of the crime.
         Can only be done by talking to the Policier at the Police Station.
 
         Parameters:
             game (Game): The game object.
-            list_of_words (list): The list of words from the command.
-            number_of_parameters (int): The number of expected parameters.
+            accused_name (str): the name of the accused character.
 
         Returns:
             bool: True if the command was executed successfully, False otherwise.
         """
-        l = len(list_of_words)
-        if l < 2:
-            command_word = list_of_words[0]
-            print(MSG1.format(command_word=command_word))
-            return False
-
         player = game.player
         room = player.current_room
-        accused_name = " ".join(list_of_words[1:])
         
         # Check if player is at the Police Station
         if room.name != "Commissariat":
-            print("\nVous devez aller au commissariat pour accuser quelqu'un.\n")
+            game.out.print("\nVous devez aller au commissariat pour accuser quelqu'un.\n")
             return False
         
         # Check if the Policier is in the room
         if "Policier" not in room.characters:
-            print("\nLe policier n'est pas ici.\n")
+            game.out.print("\nLe policier n'est pas ici.\n")
             return False
         
         # Record the accusation
@@ -625,8 +533,8 @@ class Actions:
         
         # Check win condition
         if game.win():
-            print(f"\nVous avez accusé {accused_name}.")
-            print("Le policier l'arrête immédiatement.\n")
+            game.out.print(f"\nVous avez accusé {accused_name}.")
+            game.out.print("Le policier l'arrête immédiatement.\n")
             # Activate Quest 8 and end the game
             quest8 = game.quest_manager.get_quest_by_title("Résoudre l'énigme")
             if quest8 and not quest8.is_completed:
@@ -634,150 +542,168 @@ class Actions:
             game.finished = True
         else:
             if accused_name.lower() == "durand":
-                print(f"\nVous avez accusé {accused_name}.")
-                print("Mais vous n'avez pas toutes les preuves nécessaires. Continuez l'enquête.\n")
+                game.out.print(f"\nVous avez accusé {accused_name}.")
+                game.out.print("Mais vous n'avez pas toutes les preuves nécessaires. Continuez l'enquête.\n")
             else:
-                print(f"\nVous avez accusé {accused_name}.")
-                print("Le policier vous regarde avec incrédulité.")
-                print("Les preuves ne correspondent pas à cette accusation.\n")
+                game.out.print(f"\nVous avez accusé {accused_name}.")
+                game.out.print("Le policier vous regarde avec incrédulité.")
+                game.out.print("Les preuves ne correspondent pas à cette accusation.\n")
         
         return True
 
-    def analyze(game, list_of_words, number_of_parameters):
+    def analyze(game, item_name):
         """
         Allow the player to analyze an item at the laboratory.
         Can only be done with the Scientifique at the Labo du commissariat.
 
         Parameters:
             game (Game): The game object.
-            list_of_words (list): The list of words from the command.
-            number_of_parameters (int): The number of expected parameters.
+            item_name (str): the name of the item.
 
         Returns:
             bool: True if the command was executed successfully, False otherwise.
         """
-        l = len(list_of_words)
-        if l != number_of_parameters + 1:
-            command_word = list_of_words[0]
-            print(MSG1.format(command_word=command_word))
-            return False
-
         player = game.player
         room = player.current_room
-        item_name = list_of_words[1]
         
         # Check if player is at the Laboratory
         if room.name != "Labo du commissariat":
-            print("\nVous devez aller au labo du commissariat pour analyser les objets.\n")
+            game.out.print("\nVous devez aller au labo du commissariat pour analyser les objets.\n")
             return False
         
         # Check if the Chimiste is in the room
         if "Chimiste" not in room.characters:
-            print("\nLe chimiste n'est pas ici.\n")
+            game.out.print("\nLe chimiste n'est pas ici.\n")
             return False
         
         # Check if the item is in player's inventory
         if item_name not in player.inventory:
-            print(f"\nVous n'avez pas l'objet '{item_name}' dans votre inventaire.\n")
+            game.out.print(f"\nVous n'avez pas l'objet '{item_name}' dans votre inventaire.\n")
             return False
         
         # Check if it's an item that needs to be analyzed
         if item_name not in game.required_items:
-            print(f"\nCet objet n'a pas besoin d'être analysé.\n")
+            game.out.print(f"\nCet objet n'a pas besoin d'être analysé.\n")
             return False
         
         # Mark the item as analyzed
         if item_name not in game.analyzed_items:
             game.analyzed_items.add(item_name)
-            print(f"\nVous avez analysé: {item_name}")
-            print(f"Objets analysés: {len(game.analyzed_items)}/{len(game.required_items)}\n")
+            game.out.print(f"\nVous avez analysé: {item_name}")
+            game.out.print(f"Objets analysés: {len(game.analyzed_items)}/{len(game.required_items)}\n")
             
             # Check if Quest 2 should be completed (all crime scene items analyzed)
-            crime_scene_items = {"couteau", "arme", "photos", "coffre"}
-            if crime_scene_items.issubset(game.analyzed_items):
+            if game.analyzed_items.has_all(CRIME_SCENE_ITEMS):
                 game.quest_manager.complete_quest("Faire analyser les objets au Labo", game.player)
             
             # Check if Quest 5 should be completed (letter analyzed)
             if item_name == "lettre":
                 game.quest_manager.complete_quest("Analyser les objets chez Lenoir", game.player)
         else:
-            print(f"\nCet objet a déjà été analysé.\n")
+            game.out.print(f"\nCet objet a déjà été analysé.\n")
         
         return True
 
-    def quests(game, list_of_words, number_of_parameters):
+    def quests(game):
         """
         Display the list of available quests and remaining time.
 
         Parameters:
             game (Game): The game object.
-            list_of_words (list): The list of words from the command.
-            number_of_parameters (int): The number of expected parameters.
 
         Returns:
             bool: True if the command was executed successfully, False otherwise.
         """
-        l = len(list_of_words)
-        if l != number_of_parameters + 1:
-            command_word = list_of_words[0]
-            print(MSG0.format(command_word=command_word))
-            return False
-        
+        # Display only: nothing to do when the output is discarded
+        if not game.out.enabled:
+            return True
+
         # Calculate remaining time
-        total_moves = 40
+        total_moves = game.max_displacements
         remaining_moves = total_moves - game.displacement_count
-        total_days = 4
-        remaining_days = (remaining_moves / total_moves) * total_days
-        
-        print("\n" + "="*60)
-        print("TEMPS IMPARTI POUR L'ENQUÊTE")
-        print("="*60)
-        print(f"Temps total disponible: {total_days} jours = {total_moves} déplacements")
-        print(f"Temps écoulé: {game.displacement_count}/{total_moves} déplacements")
-        print(f"Temps restant: {remaining_moves}/{total_moves} déplacements ≈ {remaining_days:.1f} jours")
-        print("="*60)
-        
-        print("\nQUÊTES ACTIVES/DISPONIBLES:\n")
-        
-        # Display chronological quests
-        for i, quest in enumerate(game.quest_manager.quests, 1):
-            if i <= 7:  # Chronological quests
-                if quest.is_completed:
-                    status = "(Finished)"
-                elif quest.is_active:
-                    status = "(In progress)"
-                else:
-                    status = "(Not started)"
-                print(f"{status} Quest {i}: {quest.title}")
-                print(f"   Description: {quest.description}")
-                if quest.objectives:
-                    print(f"   Objectifs: {', '.join(quest.objectives)}")
-                print()
-        
-        print("\nQUÊTES OPTIONNELLES (non-chronologiques):\n")
-        
-        # Display non-chronological quests
-        for i, quest in enumerate(game.quest_manager.quests, 1):
-            if i > 7:  # Non-chronological quests
+        total_days = total_moves / DAY_MOVES
+        remaining_days = remaining_moves / DAY_MOVES
+        
+        game.out.print("\n" + "="*60)
+        game.out.print("TEMPS IMPARTI POUR L'ENQUÊTE")
+        game.out.print("="*60)
+        game.out.print(f"Temps total disponible: {total_days:g} jours = {total_moves} déplacements")
+        game.out.print(f"Temps écoulé: {game.displacement_count}/{total_moves} déplacements")
+        game.out.print(f"Temps restant: {remaining_moves}/{total_moves} déplacements ≈ {remaining_days:.1f} jours")
+        game.out.print("="*60)
+        
+        game.out.print("\nQUÊTES ACTIVES/DISPONIBLES:\n")
+        
+        # Display the quests of the main storyline
+        main_quests = [quest for quest in game.quest_manager.quests if not quest.optional]
+        for i, quest in enumerate(main_quests, 1):
+            if quest.is_completed:
+                status = "(Finished)"
+            elif quest.is_active:
+                status = "(In progress)"
+            else:
+                status = "(Not started)"
+            game.out.print(f"{status} Quest {i}: {quest.title}")
+            game.out.print(f"   Description: {quest.description}")
+            if quest.objectives:
+                game.out.print(f"   Objectifs: {', '.join(quest.objectives)}")
+            game.out.print()
+        
+        game.out.print("\nQUÊTES OPTIONNELLES (non-chronologiques):\n")
+        
+        # Display optional quests
+        for quest in game.quest_manager.quests:
+            if quest.optional:
                 if quest.is_completed:
                     status = "(Finished)"
                 elif quest.is_active:
                     status = "(In progress)"
                 else:
                     status = "(Not started)"
-                print(f"{status} {quest.title}")
-                print(f"   Description: {quest.description}")
+                game.out.print(f"{status} {quest.title}")
+                game.out.print(f"   Description: {quest.description}")
                 if quest.objectives:
-                    print(f"   Objectifs: {', '.join(quest.objectives)}")
-                print()
+                    game.out.print(f"   Objectifs: {', '.join(quest.objectives)}")
+                game.out.print()
         
-        print("PROGRÈS D'ANALYSE:")
-        print(f"Objets analysés: {len(game.analyzed_items)}/{len(game.required_items)}")
+        game.out.print("PROGRÈS D'ANALYSE:")
+        game.out.print(f"Objets analysés: {len(game.analyzed_items)}/{len(game.required_items)}")
         if game.analyzed_items:
-            print(f"Analysés: {', '.join(game.analyzed_items)}")
+            game.out.print(f"Analysés: {', '.join(game.analyzed_items)}")
         missing = game.required_items - game.analyzed_items
         if missing:
-            print(f"Objets restants à analyser: {len(missing)}")
-        print("="*60 + "\n")
+            game.out.print(f"Objets restants à analyser: {len(missing)}")
+        game.out.print("="*60 + "\n")
         
-        return True
\ No newline at end of file
+        return True
+
+    def route(game, room_name):
+        """
+        Display the cheapest path (in displacements) to a room.
+
+        Parameters:
+            game (Game): The game object.
+            room_name (str): the name of the room.
+
+        Returns:
+            bool: True if the command was executed successfully, False otherwise.
+        """
+        # Accept the name without its case
+        name = game.routes.lookup(room_name)
+        if name is None:
+            game.out.print(f"\nIl n'y a pas de salle nommée '{room_name}'.\n")
+            return False
+        room_name = name
+
+        here = game.player.current_room.name
+        direction, cost = game.routes.route(here, room_name)
+        if direction is None:
+            if here == room_name:
+                game.out.print(f"\nVous êtes déjà ici : {room_name}.\n")
+            else:
+                game.out.print(f"\nAucun chemin ne mène à {room_name}.\n")
+            return True
+        moves = game.routes.distance(here, room_name)[1]
+        game.out.print(f"\nPour aller à {room_name} : go {direction}"
+                       f" ({cost} déplacement(s), {moves} pas).\n")
+        return True
@@ -0,0 +1,168 @@
+"""Vectorized batch simulation of the NPC random walks.
+
+File `batch.py`: advance the NPC walks of a very large number of
+independent sessions at once with NumPy. The room graph of a world is
+encoded as an adjacency array and the `allowed_rooms` of each NPC as a
+mask, and one step moves every session with a few array operations.
+
+The rules are those of `Game.update_characters` and `Character.walk`:
+only the mobile NPCs move; after each player command each has a
+`move_chance` (50%) to be due (the scheduler draws geometric delays, see
+`scheduler.py`), and a due NPC in an allowed room moves to a uniformly
+chosen allowed exit; when Durand enters the Commissariat a clue is dropped
+there (and his suspicion increases if the law forbids his presence).
+The random streams differ from `SessionRandom`, the probabilities do not.
+
+NumPy is an optional dependency, only needed by this module.
+
+Usage:
+    python batch.py [--sessions N] [--steps N] [--seed N]
+"""
+
+import argparse
+import time
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency
+    np = None
+
+import worlds
+
+# Name of the NPC whose moves drop clues (see Game.update_characters)
+MOBILE_NPC = "Durand"
+CLUE_ROOM = "Commissariat"
+
+
+class BatchWalk:
+    """
+    NPC walks of many sessions of the same world.
+
+    Attributes:
+        sessions (int): the number of sessions.
+        room_names (tuple): the name of each room index.
+        npc_names (list): the names of the mobile NPCs.
+        positions (ndarray): (sessions, NPCs) room index of each NPC.
+        suspicions (ndarray): (sessions,) suspicion score of Durand.
+        clues (ndarray): (sessions,) number of clues dropped.
+        clue_dropped (ndarray): (sessions,) True if a clue lies in the Commissariat.
+        steps (int): the number of steps played.
+    """
+
+    def __init__(self, world=None, sessions=100000, seed=None, law_allows_durand_commissariat=False):
+        """
+        Compile the world and place every NPC in its starting room.
+
+        Parameters:
+            world (WorldTemplate): the world (default: Crime a Montfleur).
+            sessions (int): the number of sessions to simulate.
+            seed (int): the seed of the NumPy generator.
+            law_allows_durand_commissariat (bool): see `Game`.
+        """
+        if np is None:
+            raise ImportError("batch.py nécessite NumPy (pip install numpy)")
+        world = world if world is not None else worlds.crime_a_montfleur()
+        self.sessions = sessions
+        self.rng = np.random.default_rng(seed)
+        self.law_allows_durand_commissariat = law_allows_durand_commissariat
+        self.room_names = tuple(name for name, _ in world.rooms)
+        self.clue_room = self.room_names.index(CLUE_ROOM) if CLUE_ROOM in self.room_names else -1
+
+        rooms = len(world.rooms)
+        degree = max((len(exits) for exits in world.exits), default=0) or 1
+        self.npc_names = []
+        tables = []
+        counts = []
+        chances = []
+        starts = []
+        for name, _, start, _, allowed, mobile, move_chance in world.characters:
+            if not mobile:
+                continue
+            allowed_mask = np.ones(rooms, dtype=bool)
+            if allowed is not None:
+                allowed_mask[:] = False
+                allowed_mask[list(allowed)] = True
+            # Allowed exits of each room, padded with -1. An NPC outside
+            # of its allowed rooms never draws, hence a count of 0.
+            table = np.full((rooms, degree), -1, dtype=np.int32)
+            count = np.zeros(rooms, dtype=np.int32)
+            for room, exits in enumerate(world.exits):
+                if not allowed_mask[room]:
+                    continue
+                targets = [target for _, target in exits if allowed_mask[target]]
+                table[room, :len(targets)] = targets
+                count[room] = len(targets)
+            self.npc_names.append(name)
+            tables.append(table)
+            counts.append(count)
+            chances.append(move_chance)
+            starts.append(start)
+        self.tables = tables
+        self.counts = counts
+        self.chances = chances
+        self.positions = np.tile(np.array(starts, dtype=np.int32), (sessions, 1))
+        self.suspicions = np.zeros(sessions, dtype=np.int32)
+        self.clues = np.zeros(sessions, dtype=np.int32)
+        self.clue_dropped = np.zeros(sessions, dtype=bool)
+        self.steps = 0
+
+    def step(self):
+        """Advance every NPC of every session by one player command."""
+        sessions = self.sessions
+        for npc, name in enumerate(self.npc_names):
+            position = self.positions[:, npc]
+            count = self.counts[npc][position]
+            # `move_chance` draw (50%): the chance of being due, as the geometric
+            # delays of the scheduler (see `Character.next_delay`)
+            moves = (self.rng.random(sessions) < self.chances[npc]) & (count > 0)
+            choice = (self.rng.random(sessions) * np.maximum(count, 1)).astype(np.int32)
+            target = self.tables[npc][position, choice]
+            moved = moves & (target != position)
+            position[moves] = target[moves]
+            if name == MOBILE_NPC and self.clue_room >= 0:
+                arrived = moved & (target == self.clue_room)
+                if not self.law_allows_durand_commissariat:
+                    self.suspicions += arrived
+                self.clues += arrived
+                self.clue_dropped |= arrived
+        self.steps += 1
+
+    def run(self, steps):
+        """Advance every session by `steps` player commands."""
+        for _ in range(steps):
+            self.step()
+
+    def occupancy(self, npc_name=MOBILE_NPC):
+        """
+        Return the share of sessions where an NPC is in each room.
+
+        Returns:
+            dict: the fraction of sessions per room name.
+        """
+        npc = self.npc_names.index(npc_name)
+        counts = np.bincount(self.positions[:, npc], minlength=len(self.room_names))
+        return {name: counts[index] / self.sessions for index, name in enumerate(self.room_names)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Marche aléatoire des PNJ, en lot (NumPy)")
+    parser.add_argument("--sessions", type=int, default=1000000)
+    parser.add_argument("--steps", type=int, default=40)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    start = time.perf_counter()
+    walk = BatchWalk(sessions=args.sessions, seed=args.seed)
+    walk.run(args.steps)
+    elapsed = time.perf_counter() - start
+    rate = args.sessions * args.steps / elapsed
+    print(f"{args.sessions} sessions x {args.steps} pas en {elapsed:.2f} s ({rate:.0f} pas-session/s)")
+    print(f"Position de {MOBILE_NPC}:")
+    for name, share in walk.occupancy().items():
+        if share:
+            print(f"  {name}: {share:.2%}")
+    print(f"Indice déposé au {CLUE_ROOM}: {walk.clue_dropped.mean():.2%} des sessions")
+    print(f"Suspicion moyenne: {walk.suspicions.mean():.3f}")
+
+
+if __name__ == "__main__":
+    main()
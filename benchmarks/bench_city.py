@@ -0,0 +1,106 @@
+"""Benchmark: per-command latency and memory as the city grows.
+
+Usage:
+    python benchmarks/bench_city.py [--sizes N [N ...]] [--commands N] [--move-chance P]
+
+For each size, generates a city (see `citygen.py`) and reports the time to
+compile its template, to create a game, the memory of one game (measured
+with `tracemalloc`), and the mean latency of each kind of command played
+with `process_command` and `check_end`, which include the NPC update of
+each command (also reported alone). `typo` is a route to a misspelled room
+name: its correction uses the indexes built with the template, so its cost
+is in the compile time, not in the latency. The number of walking NPCs grows with
+the city, so the update grows with `--move-chance`; apart from it, a latency
+that grows with the size is an O(rooms) cost on a hot path.
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import citygen
+import worlds
+from game import Game
+from output import NullSink
+
+DIRECTIONS = ("go E", "go S", "go O", "go N", "go U", "go D")
+
+
+def command_mix(game, room_names, count):
+    """Return the commands of each kind to play, by kind."""
+    items = [item.name for item, _ in game.world.items]
+    return {
+        "go": [DIRECTIONS[i % len(DIRECTIONS)] for i in range(count)],
+        "look": ["look"] * count,
+        "take": [f"take {items[i % len(items)]}" for i in range(count)],
+        "quests": ["quests"] * count,
+        "route": [f"route {room_names[i % len(room_names)]}" for i in range(count)],
+        "typo": [f"route {misspelled(room_names[i % len(room_names)])}" for i in range(count)],
+    }
+
+
+def misspelled(name):
+    """Return a room name with two typos (case and two swapped characters)."""
+    return name[:-2].lower() + name[-1] + name[-2]
+
+
+def update(game, count):
+    """Return the mean time of one NPC update, in microseconds."""
+    start = time.perf_counter()
+    for _ in range(count):
+        game.update_characters()
+    return (time.perf_counter() - start) / count * 1e6
+
+
+def play(game, commands):
+    """Return the mean latency of a list of commands, in microseconds."""
+    start = time.perf_counter()
+    for command in commands:
+        game.process_command(command)
+        game.check_end()
+    return (time.perf_counter() - start) / len(commands) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--commands", type=int, default=500)
+    parser.add_argument("--move-chance", type=float, default=citygen.PASSERBY_CHANCE)
+    args = parser.parse_args()
+    kinds = ("update", "go", "look", "take", "quests", "route", "typo")
+    print(f"{'rooms':>8} {'compile s':>9} {'create ms':>9} {'game MB':>8} "
+          + " ".join(f"{kind + ' us':>9}" for kind in kinds))
+    for size in args.sizes:
+        spec = citygen.generate(size, 1, args.move_chance)
+        start = time.perf_counter()
+        template = worlds.WorldTemplate.from_spec(spec, f"ville-{size}")
+        compiled = time.perf_counter() - start
+        del spec
+        Game.create("bench", template, NullSink(), seed=1)  # shared tables of the world
+
+        start = time.perf_counter()
+        game = Game.create("bench", template, NullSink(), seed=1)
+        created = (time.perf_counter() - start) * 1e3
+        del game
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        game = Game.create("bench", template, NullSink(), seed=1)
+        memory = (tracemalloc.get_traced_memory()[0] - before) / 1e6
+        tracemalloc.stop()
+
+        # Far rooms: each route is a new source row once the player moves
+        names = [name for name, _ in template.rooms[::max(1, size // 50)]]
+        game.max_displacements = float("inf")
+        latencies = [update(game, args.commands)]
+        for kind, commands in command_mix(game, names, args.commands).items():
+            latencies.append(play(game, commands))
+        print(f"{size:>8} {compiled:>9.2f} {created:>9.1f} {memory:>8.1f} "
+              + " ".join(f"{latency:>9.1f}" for latency in latencies))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Benchmark: typo-tolerant lookups as the vocabulary grows.
+
+Usage:
+    python benchmarks/bench_matcher.py [--repeat N]
+
+Builds a `FuzzyIndex` of N random names for growing N and reports the build
+time and the mean time of an exact lookup, of a lookup with one typo and of
+a lookup matching nothing.
+"""
+
+import argparse
+import os
+import random
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from matcher import FuzzyIndex
+
+
+def random_names(count, rng):
+    names = set()
+    while len(names) < count:
+        names.add("".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(4, 12))))
+    return sorted(names)
+
+
+def typo(name, rng):
+    i = rng.randrange(len(name))
+    return name[:i] + rng.choice(string.ascii_lowercase) + name[i + 1:]
+
+
+def mean_time(index, words):
+    start = time.perf_counter()
+    for word in words:
+        index.lookup(word)
+    return (time.perf_counter() - start) / len(words) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+    rng = random.Random(0)
+    print(f"{'words':>7} {'build s':>8} {'exact us':>9} {'typo us':>8} {'miss us':>8}")
+    for count in (100, 1000, 10000, 50000):
+        names = random_names(count, rng)
+        start = time.perf_counter()
+        index = FuzzyIndex(names)
+        build = time.perf_counter() - start
+        sample = [rng.choice(names) for _ in range(args.repeat)]
+        exact = mean_time(index, sample)
+        typos = mean_time(index, [typo(name, rng) for name in sample])
+        misses = mean_time(index, ["zz" + name[2:] + "qq" for name in sample])
+        print(f"{count:>7} {build:>8.2f} {exact:>9.1f} {typos:>8.1f} {misses:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
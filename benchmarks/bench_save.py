@@ -0,0 +1,84 @@
+"""Benchmark: binary save size and save/load latency per session.
+
+Usage:
+    python benchmarks/bench_save.py [--repeat N]
+
+Plays the optimal winning plan (see `solver.py`) and, at the start, middle
+and end of the game, reports the size of the saved game, the mean time of
+`save.dump` and `save.load`, and for comparison the size of a pickle of the
+same state (`saved_state`: what `save.dump` writes, as Python objects; the
+game itself holds the compiled dispatcher, whose handlers cannot be pickled).
+"""
+
+import argparse
+import os
+import pickle
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import save
+import solver
+from game import Game
+from output import NullSink
+
+
+def game_after(commands):
+    """Return a game where the commands have been played."""
+    game = Game.create("bench", out=NullSink(), seed=1)
+    for command in commands:
+        game.process_command(command)
+        game.check_end()
+    return game
+
+
+def saved_state(game):
+    """Return the state written by `save.dump`, as Python objects."""
+    manager = game.quest_manager
+    return {
+        "seed": game.seed, "rng": game.rng.getstate(), "finished": game.finished,
+        "law": game.law_allows_durand_commissariat, "displacements": game.displacement_count,
+        "world": game.world.id, "player": game.player.name, "accused": game.accused,
+        "room": game.player.current_room.name,
+        "history": [room.name for room in game.player.history],
+        "inventory": game.player.inventory,
+        "rooms": {room.name: room.inventory for room in game.rooms},
+        "npcs": {npc.name: (room.name, npc._msg_index) for room in game.rooms for npc in room.characters.values()},
+        "tick": game.tick, "scheduler": game.scheduler.entries(),
+        "quests": [(quest.is_active, quest.is_completed, quest.completed_objectives, quest.counters)
+                   for quest in manager.quests],
+        "active": [quest.title for quest in manager.active_quests], "counters": manager.counters,
+        "sets": [set(bitset) for bitset in (game.analyzed_items, game.collected_items,
+                                            game.visited_crime_scene_rooms, game.flags, game.required_items)],
+        "suspicions": game.suspicions, "clues": game.clues,
+    }
+
+
+def mean_time(function, repeat):
+    """Return the mean time of one call, in microseconds."""
+    function()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+    plan = solver.solve().commands
+    out = NullSink()
+    print(f"{'point':<8} {'bytes':>6} {'pickle':>7} {'dump us':>8} {'load us':>8}")
+    for label, count in (("start", 0), ("middle", len(plan) // 2), ("end", len(plan))):
+        game = game_after(plan[:count])
+        data = save.dump(game)
+        pickled = len(pickle.dumps(saved_state(game), pickle.HIGHEST_PROTOCOL))
+        dump_time = mean_time(lambda: save.dump(game), args.repeat)
+        load_time = mean_time(lambda: save.load(data, out), args.repeat)
+        print(f"{label:<8} {len(data):>6} {pickled:>7} {dump_time:>8.1f} {load_time:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
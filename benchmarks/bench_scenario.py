@@ -0,0 +1,61 @@
+"""Benchmark: loading the "Crime a Montfleur" scenario at startup.
+
+Usage:
+    python benchmarks/bench_scenario.py [--repeat N]
+
+Compares, per start of a process:
+    spec     compiling the world from a spec already in memory (the former
+             Python dict of `worlds.py`, before the scenario files)
+    parse    reading, checking and compiling the JSON scenario file
+    cache    reading the compiled scenario from its cache file
+and the mean time of `Game.create` once the world is loaded.
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import scenario
+import worlds
+from game import Game
+from output import NullSink
+
+
+def mean_time(function, repeat):
+    """Return the mean time of one call, in microseconds."""
+    function()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=500)
+    args = parser.parse_args()
+    path = os.path.join(worlds.SCENARIO_DIR, "crime_a_montfleur.json")
+    cache_dir = tempfile.mkdtemp()
+    with open(path, encoding="utf-8") as file:
+        spec = json.load(file)
+
+    results = [
+        ("spec", mean_time(lambda: worlds.WorldTemplate.from_spec(spec, "crime_a_montfleur"), args.repeat)),
+        ("parse", mean_time(lambda: scenario.load(path, use_cache=False), args.repeat)),
+        ("cache", mean_time(lambda: scenario.load(path, cache_dir), args.repeat)),
+    ]
+    for label, value in results:
+        print(f"{label:<6} {value:>8.1f} us")
+    world = scenario.load(path, cache_dir)
+    out = NullSink()
+    create = mean_time(lambda: Game.create("bench", world, out, seed=1), args.repeat)
+    print(f"Game.create {create:.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Benchmark: NPC updates with thousands of mobile NPCs.
+
+Usage:
+    python benchmarks/bench_scheduler.py [--ticks N] [--chance P]
+
+Builds a world of a 100-room ring holding N mobile NPCs that move with
+probability P after each command, and reports the mean time of one
+`Game.update_characters` (scheduled: only the due NPCs act) against asking
+every NPC in turn (one `move_chance` draw per NPC and per command, then
+`Character.walk`),
+with the expected number of NPCs due at each tick.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import worlds
+from game import Game
+from output import NullSink
+
+ROOMS = 100
+
+
+def ring_world(npcs, chance):
+    """Return a ring of rooms with `npcs` mobile NPCs spread over it."""
+    rooms = [{"name": f"Salle {i}", "description": "une salle",
+              "exits": {"E": f"Salle {(i + 1) % ROOMS}", "O": f"Salle {(i - 1) % ROOMS}"}}
+             for i in range(ROOMS)]
+    characters = [{"name": "Durand", "description": "un voisin", "room": "Salle 0"}]
+    characters += [{"name": f"PNJ {i}", "description": "un passant", "room": f"Salle {i % ROOMS}",
+                    "mobile": True, "move_chance": chance} for i in range(npcs)]
+    spec = {"name": "Anneau", "start": "Salle 0", "rooms": rooms, "characters": characters,
+            "rules": {"required_items": []}}
+    return worlds.WorldTemplate.from_spec(spec, f"ring-{npcs}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--ticks", type=int, default=2000)
+    parser.add_argument("--chance", type=float, default=0.01)
+    args = parser.parse_args()
+    print(f"{'NPCs':>6} {'scheduled us':>13} {'polled us':>10} {'due/tick':>9}")
+    for npcs in (10, 100, 1000, 10000):
+        game = Game.create("bench", ring_world(npcs, args.chance), NullSink(), seed=1)
+        start = time.perf_counter()
+        for _ in range(args.ticks):
+            game.update_characters()
+        scheduled = (time.perf_counter() - start) / args.ticks * 1e6
+
+        polled_ticks = max(1, args.ticks // 10)
+        start = time.perf_counter()
+        for _ in range(polled_ticks):
+            for npc in game.mobile_characters:
+                if game.rng.random() < npc.move_chance:
+                    npc.walk(game.rng)
+        polled = (time.perf_counter() - start) / polled_ticks * 1e6
+        print(f"{npcs:>6} {scheduled:>13.1f} {polled:>10.1f} {npcs * args.chance:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
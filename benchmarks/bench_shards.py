@@ -0,0 +1,54 @@
+"""Benchmark: command throughput of the sharded session pool.
+
+Usage:
+    python benchmarks/bench_shards.py [--sessions N] [--rounds N] [--workers 1 2 4 ...]
+
+For each pool size, opens the sessions, then sends one command to every
+session per round (one batch per worker) and reports commands per second.
+The default pool sizes are 1, 2, 4 and the number of cores.
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from shards import ShardPool, OPEN, SEND
+
+# Free moves (Grenier) and observations: the games never end
+COMMANDS = ["look", "go U", "look", "go D", "check", "history"]
+
+
+def measure(workers, sessions, rounds):
+    """Return the commands per second of a pool with `workers` processes."""
+    pool = ShardPool(workers)
+    try:
+        pool.execute([pool.request(OPEN, session_id, "bench") for session_id in range(sessions)])
+        start = time.perf_counter()
+        for round_number in range(rounds):
+            command = COMMANDS[round_number % len(COMMANDS)]
+            pool.execute([pool.request(SEND, session_id, command) for session_id in range(sessions)])
+        elapsed = time.perf_counter() - start
+    finally:
+        pool.close()
+    return sessions * rounds / elapsed
+
+
+def main():
+    cores = multiprocessing.cpu_count()
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=2000)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--workers", type=int, nargs="+", default=sorted({1, 2, 4, cores}))
+    args = parser.parse_args()
+    print(f"{cores} core(s), {args.sessions} sessions, {args.rounds} rounds")
+    for workers in args.workers:
+        rate = measure(workers, args.sessions, args.rounds)
+        print(f"{workers:3d} worker(s): {rate:10.0f} commands/s")
+
+
+if __name__ == "__main__":
+    main()
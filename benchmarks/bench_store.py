@@ -0,0 +1,66 @@
+"""Benchmark: parking and rehydrating idle sessions.
+
+Usage:
+    python benchmarks/bench_store.py [--sessions N] [--live N]
+
+Creates N games, each after a few commands of the optimal plan (see
+`solver.py`), in a `SessionCache` keeping only `--live` of them in memory,
+then touches every game once in a random order. Reports the mean time of a
+park and of a rehydration, the size of the store file, and its size on disk
+(free slots of the sparse file take no space).
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import save
+import solver
+from game import Game
+from output import NullSink
+from store import GAME_MEMORY, SessionCache, SessionStore
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=20000)
+    parser.add_argument("--live", type=int, default=1000)
+    args = parser.parse_args()
+    plan = solver.solve().commands
+    out = NullSink()
+    path = os.path.join(tempfile.mkdtemp(), "parked.tba")
+    cache = SessionCache(SessionStore(path, capacity=1024), args.live * GAME_MEMORY,
+                         load=lambda data: save.load(data, out))
+
+    start = time.perf_counter()
+    for session_id in range(args.sessions):
+        game = Game.create(f"joueur{session_id}", out=out, seed=session_id)
+        for command in plan[:session_id % len(plan)]:
+            game.process_command(command)
+        cache.add(session_id, game)
+    create_time = time.perf_counter() - start
+    parked = len(cache.store)
+
+    order = list(range(args.sessions))
+    random.Random(0).shuffle(order)
+    start = time.perf_counter()
+    for session_id in order:
+        cache.get(session_id)
+    touch_time = time.perf_counter() - start
+    cache.store.flush()
+
+    print(f"sessions {args.sessions}, live {len(cache.live)}, parked {len(cache.store)}")
+    print(f"create + park: {create_time / args.sessions * 1e6:.1f} us per session ({parked} parked)")
+    print(f"rehydrate + park: {touch_time / args.sessions * 1e6:.1f} us per touched session")
+    print(f"store: {cache.store.capacity} slots, {os.path.getsize(path) // 1024} KiB, "
+          f"{os.stat(path).st_blocks * 512 // 1024} KiB on disk")
+    cache.store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,336 @@
+"""Benchmark suite of the engine hot paths, saved as JSON.
+
+Usage:
+    python benchmarks/bench_suite.py [--output FILE] [--compare FILE] [--filter TEXT ...]
+
+Times each case of `CASES` (world build, each kind of command, NPC updates
+for growing NPC counts, room quest checks for growing numbers of active
+quests, room rendering) and prints the median time of one call. The timings
+are made stable by fixed seeds, a fresh state for each round (the same
+calls do the same work), a garbage collector paused while timing, calls
+grouped into rounds of at least `--min-time` seconds, and the median over
+`--rounds` rounds.
+
+With `--output`, the results are written as JSON with the commit, the
+Python version and the machine, to compare two commits:
+
+    git checkout OLD && python benchmarks/bench_suite.py --output old.json
+    git checkout NEW && python benchmarks/bench_suite.py --compare old.json
+
+`--compare` plays the same number of calls per round as the saved run,
+prints the ratio of each case to the saved result and exits with status 1
+if a case is slower by more than `--threshold`. The default threshold
+allows for the noise of a shared machine; lower it on a quiet one.
+
+The other scripts of `benchmarks/` are then run once with small sizes
+(`SCRIPTS`), so that a script broken by a change of the engine is noticed;
+the suite exits with status 1 if one fails. `--no-scripts` skips them.
+
+Only the standard library and the game are used: the suite runs offline.
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import citygen
+import worlds
+from game import Game
+from item import Item
+from output import NullSink
+from quest import Quest, QuestManager
+
+# Cases by name: each builds its state and returns the function to time
+CASES = {}
+
+# Small arguments of the other benchmark scripts (the scripts not listed run
+# with their defaults)
+SCRIPTS = {
+    "bench_city.py": ["--sizes", "100", "--commands", "20"],
+    "bench_matcher.py": ["--repeat", "5"],
+    "bench_save.py": ["--repeat", "5"],
+    "bench_scenario.py": ["--repeat", "5"],
+    "bench_scheduler.py": ["--ticks", "20"],
+    "bench_shards.py": ["--sessions", "20", "--rounds", "2", "--workers", "1"],
+    "bench_store.py": ["--sessions", "200", "--live", "20"],
+    "bench_world.py": ["--sessions", "20"],
+}
+
+
+def case(name):
+    """Register a case factory under a name."""
+    def register(factory):
+        CASES[name] = factory
+        return factory
+    return register
+
+
+def new_game(world=None):
+    game = Game.create("bench", world, NullSink(), seed=1)
+    # Commands are timed in a loop: the game must not end
+    game.max_displacements = float("inf")
+    return game
+
+
+def commands(lines, room=None):
+    """Return a case playing a cycle of commands in the Crime a Montfleur world."""
+    def factory():
+        game = new_game()
+        if room is not None:
+            game.player.current_room = next(r for r in game.rooms if r.name == room)
+        state = {"next": 0}
+
+        def run():
+            game.process_command(lines[state["next"]])
+            state["next"] = (state["next"] + 1) % len(lines)
+        return run
+    return factory
+
+
+@case("setup.world_compile")
+def world_compile():
+    with open(os.path.join(worlds.SCENARIO_DIR, "crime_a_montfleur.json"), encoding="utf-8") as file:
+        spec = json.load(file)
+    return lambda: worlds.WorldTemplate.from_spec(spec, "crime_a_montfleur")
+
+
+@case("setup.game_create")
+def game_create():
+    world = worlds.crime_a_montfleur()
+    return lambda: Game.create("bench", world, NullSink(), seed=1)
+
+
+@case("setup.game_create_city_10000")
+def game_create_city():
+    world = worlds.WorldTemplate.from_spec(citygen.generate(10000, 1), "ville-10000")
+    new_game(world)
+    return lambda: Game.create("bench", world, NullSink(), seed=1)
+
+
+CASES["command.go"] = commands(["go U", "go D"])
+CASES["command.back"] = commands(["go U", "back"])
+CASES["command.look"] = commands(["look"])
+CASES["command.take_drop"] = commands(["take couteau", "drop couteau"])
+CASES["command.talk"] = commands(["talk Lenoir"], "Maison de Madame Lenoir")
+CASES["command.examine"] = commands(["take couteau", "examine couteau", "drop couteau"])
+CASES["command.check"] = commands(["check"])
+CASES["command.history"] = commands(["history"])
+CASES["command.quests"] = commands(["quests"])
+CASES["command.help"] = commands(["help"])
+CASES["command.route"] = commands(["route Commissariat", "route Morgue"])
+CASES["command.typo"] = commands(["loook", "tkae couteau", "drop couteau"])
+CASES["command.unknown"] = commands(["danser"])
+
+
+def npc_update(count):
+    """Return a case updating `count` walking NPCs in a city of 1000 rooms."""
+    def factory():
+        spec = citygen.generate(1000, 1)
+        names = [room["name"] for room in spec["rooms"]]
+        spec["characters"] = spec["characters"][:1] + [
+            {"name": f"Passant {i}", "description": "un passant", "room": names[i % len(names)],
+             "mobile": True, "move_chance": citygen.PASSERBY_CHANCE}
+            for i in range(count)]
+        game = new_game(worlds.WorldTemplate.from_spec(spec, f"passants-{count}"))
+        return game.update_characters
+    return factory
+
+
+def room_check(count):
+    """Return a case checking a visited room against `count` active quests."""
+    def factory():
+        manager = QuestManager(out=NullSink())
+        for i in range(count):
+            manager.add_quest(Quest(f"Quête {i}", "Visiter", [f"Visiter Salle {i}", f"Parler {i}"]))
+            manager.activate_quest(f"Quête {i}")
+        return lambda: manager.check_room_objectives("Couloir")
+    return factory
+
+
+for npcs in (10, 100, 1000, 10000):
+    CASES[f"npc.update_{npcs}"] = npc_update(npcs)
+for active in (1, 10, 100, 1000):
+    CASES[f"quests.check_room_{active}"] = room_check(active)
+
+
+@case("render.long_description")
+def long_description():
+    room = new_game().player.current_room
+    return room.get_long_description
+
+
+@case("render.inventory_20")
+def inventory():
+    room = new_game().player.current_room
+    for i in range(20):
+        room.inventory[f"objet_{i}"] = Item(f"objet_{i}", "un objet", 1)
+    return room.get_inventory
+
+
+def calibrate(factory, min_time):
+    """Return the number of calls of a case lasting at least `min_time`."""
+    number = 1
+    while True:
+        function = factory()
+        start = time.perf_counter()
+        for _ in range(number):
+            function()
+        if time.perf_counter() - start >= min_time:
+            return number
+        number *= 2
+
+
+def measure(factory, rounds, min_time, number=None):
+    """
+    Time a case.
+
+    Parameters:
+        factory (callable): the case, returning the function to time.
+        rounds (int): the number of rounds.
+        min_time (float): the minimal duration of a round, in seconds.
+        number (int): the number of calls of a round (default: calibrated
+            with `min_time`).
+
+    Returns:
+        dict: the median, minimum and maximum time of one call over the
+        rounds (microseconds), and the number of calls of a round.
+    """
+    if number is None:
+        number = calibrate(factory, min_time)
+    timings = []
+    enabled = gc.isenabled()
+    try:
+        for _ in range(rounds):
+            function = factory()
+            gc.collect()
+            gc.disable()
+            start = time.perf_counter()
+            for _ in range(number):
+                function()
+            timings.append((time.perf_counter() - start) / number * 1e6)
+            gc.enable()
+    finally:
+        if enabled:
+            gc.enable()
+        else:
+            gc.disable()
+    return {"median_us": statistics.median(timings), "min_us": min(timings), "max_us": max(timings),
+            "rounds": rounds, "number": number}
+
+
+def environment():
+    """Return the commit and the machine of the run."""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], cwd=ROOT, capture_output=True, text=True,
+                                check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "date": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def compare(results, baseline, threshold):
+    """
+    Print the ratio of each case to a saved run.
+
+    Returns:
+        list: the names of the cases slower than the baseline by more than
+        `threshold` (a fraction).
+    """
+    slower = []
+    print(f"\n{'case':<32} {'old us':>10} {'new us':>10} {'ratio':>7}")
+    for name, result in results.items():
+        old = baseline.get(name)
+        if old is None:
+            print(f"{name:<32} {'-':>10} {result['median_us']:>10.2f}")
+            continue
+        ratio = result["median_us"] / old["median_us"]
+        mark = ""
+        if ratio > 1 + threshold:
+            mark = "  slower"
+            slower.append(name)
+        elif ratio < 1 - threshold:
+            mark = "  faster"
+        print(f"{name:<32} {old['median_us']:>10.2f} {result['median_us']:>10.2f} {ratio:>7.2f}{mark}")
+    return slower
+
+
+def run_scripts():
+    """
+    Run each other benchmark script once with small sizes.
+
+    Returns:
+        list: the names of the scripts that failed.
+    """
+    directory = os.path.join(ROOT, "benchmarks")
+    names = sorted(name for name in os.listdir(directory)
+                   if name.startswith("bench_") and name.endswith(".py") and name != os.path.basename(__file__))
+    failed = []
+    print()
+    for name in names:
+        result = subprocess.run([sys.executable, os.path.join(directory, name)] + SCRIPTS.get(name, []),
+                                cwd=ROOT, capture_output=True, text=True)
+        print(f"{name:<32} {'ok' if result.returncode == 0 else 'FAILED'}")
+        if result.returncode != 0:
+            print(result.stderr.strip())
+            failed.append(name)
+    return failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="JSON file of a previous run to compare with")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="slowdown reported as a regression (default: 0.25)")
+    parser.add_argument("--filter", nargs="+", default=[], help="only the cases containing one of these texts")
+    parser.add_argument("--rounds", type=int, default=15)
+    parser.add_argument("--min-time", type=float, default=0.02, help="minimal duration of a round, in seconds")
+    parser.add_argument("--list", action="store_true", help="list the cases and exit")
+    parser.add_argument("--no-scripts", action="store_true", help="do not run the other benchmark scripts")
+    args = parser.parse_args()
+    names = [name for name in CASES if not args.filter or any(text in name for text in args.filter)]
+    if args.list:
+        print("\n".join(names))
+        return
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as file:
+            baseline = json.load(file)["results"]
+
+    results = {}
+    for name in names:
+        number = baseline[name]["number"] if baseline is not None and name in baseline else None
+        results[name] = measure(CASES[name], args.rounds, args.min_time, number)
+        result = results[name]
+        print(f"{name:<32} {result['median_us']:>10.2f} us  (min {result['min_us']:.2f}, x{result['number']})")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump({"environment": environment(), "results": results}, file, indent=2, sort_keys=True)
+            file.write("\n")
+    slower = baseline is not None and compare(results, baseline, args.threshold)
+    failed = not args.no_scripts and run_scripts()
+    if slower or failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Benchmark: session creation time and per-session memory.
+
+Usage:
+    python benchmarks/bench_world.py [--sessions N]
+
+Builds N games with `Game.create` and reports the mean creation time and
+the memory retained by one session (measured with `tracemalloc`).
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from game import Game
+
+
+def create_sessions(count):
+    """Create `count` games, discarding their output."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return [Game.create("bench") for _ in range(count)]
+
+
+def measure_creation(count):
+    """Return the mean creation time of one session, in microseconds."""
+    create_sessions(10)  # warm-up: the world template is compiled once
+    start = time.perf_counter()
+    create_sessions(count)
+    return (time.perf_counter() - start) / count * 1e6
+
+
+def measure_memory(count):
+    """Return the memory retained by one session, in bytes."""
+    create_sessions(10)
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    sessions = create_sessions(count)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del sessions
+    return (after - before) / count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=2000)
+    args = parser.parse_args()
+    print(f"session creation: {measure_creation(args.sessions):8.1f} us/session")
+    print(f"session memory:   {measure_memory(args.sessions):8.0f} bytes/session")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,242 @@
+"""Integer bitsets of names.
+
+File `bitset.py`: the evidence and progress sets of a game (analyzed
+items, collected items, visited rooms, flags...) are stored as integers over
+an interned name space: each name of a world gets a bit. Comparisons and
+inclusions are single integer operations, and the whole progress of a
+session fits in a few integers (see `Game.progress_snapshot`).
+
+A `BitSet` keeps the interface of a Python set of strings (`add`, `in`,
+iteration, `==`, `issubset`, `-`...), so the code reading the sets is
+unchanged. `has_all` and `equals` compare with a tuple of names whose mask
+is cached by the interner, for the checks done after every command.
+
+The interner of a world template is closed: every name a game may store
+(rooms, items, flags, clues) gets its bit when the template is compiled,
+so the bits are the same in every game and every process, and a name
+unknown to the world raises `UnknownNameError` instead of growing the
+interner shared by all the games. Reading never fails: no set holds an
+unknown name, so `in`, `has_all` and `equals` answer False for it.
+
+Example:
+    >>> names = Interner(["clé", "coffre", "lettre"])
+    >>> found = BitSet(names, ["lettre"])
+    >>> found.add("clé")
+    >>> sorted(found), found.bits
+    (['clé', 'lettre'], 5)
+    >>> found.has_all(("clé", "lettre")), found == {"clé", "lettre"}
+    (True, True)
+    >>> found.add("arme")
+    >>> names.bit("arme"), len(found)
+    (3, 3)
+    >>> closed = Interner(["clé"], closed=True)
+    >>> BitSet(closed, ["clé"]).has_all(("clé", "arme"))
+    False
+    >>> BitSet(closed).add("arme")
+    Traceback (most recent call last):
+    ...
+    bitset.UnknownNameError: Nom inconnu: arme
+"""
+
+from collections.abc import MutableSet, Set
+
+
+class UnknownNameError(ValueError):
+    """Raised when a closed interner is asked for a name it does not hold."""
+
+
+class Interner:
+    """
+    Bit numbers of the names of a world, shared by all its games.
+
+    New names get the next bit on first use, unless the interner is closed
+    (see the module documentation).
+
+    Attributes:
+        names (list): the name of each bit.
+        bits (dict): the bit number of each name.
+        masks (dict): the cached masks of name tuples.
+        decoded (dict): the cached names of the most recent bit values.
+        base (int): the number of names given at creation; their bits are
+            the same in every process, unlike the names interned later.
+        closed (bool): True if no name can be added after creation.
+    """
+
+    # Bound of the decoding cache (cleared when full)
+    DECODED_MAX = 4096
+
+    def __init__(self, names=(), closed=False):
+        self.names = []
+        self.bits = {}
+        self.masks = {}
+        self.decoded = {}
+        self.closed = False
+        for name in names:
+            self.bit(name)
+        self.base = len(self.names)
+        self.closed = closed
+
+    def bit(self, name):
+        """
+        Return the bit number of a name, interning it if needed.
+
+        Raises:
+            UnknownNameError: if the name is new and the interner is closed.
+        """
+        bit = self.bits.get(name)
+        if bit is None:
+            if self.closed:
+                raise UnknownNameError(f"Nom inconnu: {name}")
+            bit = self.bits[name] = len(self.names)
+            self.names.append(name)
+        return bit
+
+    def mask(self, names):
+        """
+        Return the mask of a tuple of names (cached), or None if a name is
+        unknown to a closed interner.
+        """
+        if names in self.masks:
+            return self.masks[names]
+        mask = 0
+        for name in names:
+            if self.closed and name not in self.bits:
+                mask = None
+                break
+            mask |= 1 << self.bit(name)
+        self.masks[names] = mask
+        return mask
+
+    def decode(self, bits):
+        """Return the names of the bits set in an integer, by bit number."""
+        names = self.decoded.get(bits)
+        if names is None:
+            if len(self.decoded) >= self.DECODED_MAX:
+                self.decoded.clear()
+            names = []
+            value = bits
+            while value:
+                low = value & -value
+                names.append(self.names[low.bit_length() - 1])
+                value ^= low
+            names = self.decoded[bits] = tuple(names)
+        return names
+
+
+class BitSet(MutableSet):
+    """
+    Mutable set of names stored as an integer.
+
+    Attributes:
+        interner (Interner): the name space of the set.
+        bits (int): the bits of the names in the set.
+    """
+
+    __slots__ = ("interner", "bits")
+
+    def __init__(self, interner, names=(), bits=0):
+        self.interner = interner
+        self.bits = bits
+        for name in names:
+            self.bits |= 1 << interner.bit(name)
+
+    def _from_iterable(self, names):
+        return BitSet(self.interner, names)
+
+    def _bits_of(self, other):
+        """Return the bits of another set, or None if it has no bits here."""
+        if isinstance(other, BitSet) and other.interner is self.interner:
+            return other.bits
+        return None
+
+    def __contains__(self, name):
+        bit = self.interner.bits.get(name)
+        return bit is not None and self.bits >> bit & 1 == 1
+
+    def __iter__(self):
+        return iter(self.interner.decode(self.bits))
+
+    def __len__(self):
+        return self.bits.bit_count()
+
+    def __repr__(self):
+        return f"BitSet({set(self)!r})"
+
+    def add(self, name):
+        self.bits |= 1 << self.interner.bit(name)
+
+    def discard(self, name):
+        bit = self.interner.bits.get(name)
+        if bit is not None:
+            self.bits &= ~(1 << bit)
+
+    def clear(self):
+        self.bits = 0
+
+    def update(self, names):
+        for name in names:
+            self.add(name)
+
+    def copy(self):
+        return BitSet(self.interner, bits=self.bits)
+
+    def has_all(self, names):
+        """Return True if the set holds every name of a tuple."""
+        mask = self.interner.mask(names)
+        return mask is not None and self.bits & mask == mask
+
+    def equals(self, names):
+        """Return True if the set holds exactly the names of a tuple."""
+        mask = self.interner.mask(names)
+        return mask is not None and self.bits == mask
+
+    def __eq__(self, other):
+        if type(other) is BitSet and other.interner is self.interner:
+            return self.bits == other.bits
+        if isinstance(other, Set):
+            return len(self) == len(other) and all(name in other for name in self)
+        return NotImplemented
+
+    def __ne__(self, other):
+        if type(other) is BitSet and other.interner is self.interner:
+            return self.bits != other.bits
+        equal = self.__eq__(other)
+        return equal if equal is NotImplemented else not equal
+
+    __hash__ = None
+
+    def __le__(self, other):
+        bits = self._bits_of(other)
+        if bits is not None:
+            return self.bits & ~bits == 0
+        return super().__le__(other)
+
+    def __ge__(self, other):
+        bits = self._bits_of(other)
+        if bits is not None:
+            return bits & ~self.bits == 0
+        return super().__ge__(other)
+
+    def issubset(self, other):
+        return self <= other if isinstance(other, Set) else self <= set(other)
+
+    def issuperset(self, other):
+        return self >= other if isinstance(other, Set) else self >= set(other)
+
+    def __and__(self, other):
+        bits = self._bits_of(other)
+        if bits is not None:
+            return BitSet(self.interner, bits=self.bits & bits)
+        return super().__and__(other)
+
+    def __or__(self, other):
+        bits = self._bits_of(other)
+        if bits is not None:
+            return BitSet(self.interner, bits=self.bits | bits)
+        return super().__or__(other)
+
+    def __sub__(self, other):
+        bits = self._bits_of(other)
+        if bits is not None:
+            return BitSet(self.interner, bits=self.bits & ~bits)
+        return super().__sub__(other)
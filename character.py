@@ -3,6 +3,10 @@
 import random
 
 import game
+from scheduler import geometric_delay
+
+# Probability that a mobile NPC moves after a player command
+MOVE_CHANCE = 0.5
 
 class Character:
     """
@@ -13,9 +17,11 @@ class Character:
         description (str): The description of the character
         current_room (Room): The current room of the character
         msgs (list): The list of messages the character can say
+        mobile (bool): True if the character walks between rooms
+        move_chance (float): The probability to move after each player command
     """
     
-    def __init__(self, name, description, current_room, msgs):
+    def __init__(self, name, description, current_room, msgs, mobile=False, move_chance=MOVE_CHANCE):
         """
         Initialize a Character.
         
@@ -24,6 +30,10 @@ class Character:
                 description (str): The description of the character
                 current_room (Room): The current room of the character
                 msgs (list): The list of messages the character can say
+                mobile (bool): True if the character walks between rooms
+                    (see `Game.mobile_characters`)
+                move_chance (float): The probability to move after each
+                    player command
         """
         self.name = name
         self.description = description
@@ -33,6 +43,8 @@ class Character:
         # Optional list of rooms (Room objects) where this NPC is allowed to go.
         # None means no restrictions (can go anywhere).
         self.allowed_rooms = None
+        self.mobile = mobile
+        self.move_chance = move_chance
     
     def __str__(self):
         """
@@ -56,39 +68,59 @@ class Character:
         self._msg_index = (self._msg_index + 1) % len(self.msgs)
         return f"\n{self.name} : {msg}\n"
     
-    def move(self):
+    def next_delay(self, rng):
+        """
+        Draw the number of player commands until the next move of the NPC
+        (see `scheduler.py`).
+
+            Parameters:
+                rng (SessionRandom): the random generator of the game
+
+            Returns:
+            int: the delay, or None if the NPC never moves
         """
-        The NPC has a 50% chance to move to an adjacent room.
+        if not self.mobile:
+            return None
+        return geometric_delay(rng, self.move_chance)
+
+    def walk(self, rng=None):
+        """
+        Move the NPC to an adjacent room, chosen at random.
+
+        The games call it when the NPC is due (see `Game.update_characters`),
+        the chance to move being drawn by the scheduler.
+
+            Parameters:
+                rng (SessionRandom): the random generator of the game
+                    (default: the `random` module)
 
             Returns:
             bool: True if the NPC moved, False otherwise
         """
-        # Only allow movement for the 'Durand' NPC
-        if self.name != "Durand":
-            return False
+        if rng is None:
+            rng = random
 
-        # If an authorization list is defined, only attempt the random draw
-        # (50% chance) if the NPC is in an authorized room.
+        # If an authorization list is defined, the NPC only moves
+        # if it is in an authorized room.
         if self.allowed_rooms is not None and self.current_room not in self.allowed_rooms:
             return False
 
-        if random.choice([True, False]):
-            exits = [room for room in self.current_room.exits.values() if room is not None]
-            # If an authorization list is defined, only keep authorized exits.
-            # If no authorized exit is present, the NPC does not move.
-            if self.allowed_rooms is not None:
-                allowed_set = set(self.allowed_rooms)
-                allowed_exits = [r for r in exits if r in allowed_set]
-                if allowed_exits:
-                    exits = allowed_exits
-                else:
-                    return False
-            if exits:
-                new_room = random.choice(exits)
-                if game.DEBUG:
-                    print(f"DEBUG: {self.name} moves to {new_room.name}")
-                self.current_room.characters.pop(self.name, None)
-                self.current_room = new_room
-                self.current_room.characters[self.name] = self
-                return True
+        exits = [room for room in self.current_room.exits.values() if room is not None]
+        # If an authorization list is defined, only keep authorized exits.
+        # If no authorized exit is present, the NPC does not move.
+        if self.allowed_rooms is not None:
+            allowed_set = set(self.allowed_rooms)
+            allowed_exits = [r for r in exits if r in allowed_set]
+            if allowed_exits:
+                exits = allowed_exits
+            else:
+                return False
+        if exits:
+            new_room = rng.choice(exits)
+            if game.DEBUG:
+                print(f"DEBUG: {self.name} moves to {new_room.name}")
+            self.current_room.characters.pop(self.name, None)
+            self.current_room = new_room
+            self.current_room.characters[self.name] = self
+            return True
         return False
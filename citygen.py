@@ -0,0 +1,153 @@
+"""Procedural city generator.
+
+File `citygen.py`: build the spec of a large city (see `worlds.py` and the
+scenario files of `scenarios/`) to exercise the engine at scale. The city is
+a grid of street corners linked by N/S/E/O exits, where some corners lead
+upstairs (U) to a building floor. Objects, static NPCs and walking NPCs are
+spread over it at random; Durand walks around the first corners, and a few
+quests ask to visit random rooms.
+
+The generation is reproducible: the same size and seed give the same city.
+Compiling the spec also indexes its names for the typo-tolerant commands
+(see `matcher.py`): the cost is paid once with the template, or offline
+when the city is written as a scenario file and compiled into the scenario
+cache, never by a command.
+
+Usage:
+    python citygen.py --rooms N [--seed N] [--move-chance P] [--output FILE]
+
+Without `--output`, a summary of the city is printed; with it, the spec is
+written as a scenario file (loadable with `scenario.load`).
+
+Example:
+    >>> import worlds
+    >>> spec = generate(1000, seed=1)
+    >>> len(spec["rooms"]), spec["start"], spec["rules"]["culprit"]
+    (1000, 'Rue 0 n°0', 'Durand')
+    >>> template = worlds.WorldTemplate.from_spec(spec, "ville-1000")
+    >>> len(template.rooms), len(template.items) > 0, len(template.characters) > 0
+    (1000, True, True)
+"""
+
+import argparse
+import json
+import math
+import random
+
+# Share of the corners with a building floor (U/D exits)
+FLOOR_RATIO = 0.1
+# Objects, NPCs and quests per room
+ITEM_RATIO = 0.2
+NPC_RATIO = 0.05
+# Share of the NPCs that walk, and their chance to move after a command
+# (Durand keeps the default chance of `Character`)
+MOBILE_RATIO = 0.2
+PASSERBY_CHANCE = 0.02
+QUESTS = 5
+# Objects to analyze to win
+REQUIRED_ITEMS = 6
+
+ITEM_NAMES = ("carnet", "clé", "lettre", "photo", "gant", "ticket", "montre", "journal", "bague", "flacon")
+NPC_NAMES = ("Passant", "Voisin", "Commerçant", "Facteur", "Livreur", "Touriste", "Gardien", "Serveur")
+
+
+def corner_name(x, y):
+    return f"Rue {y} n°{x}"
+
+
+def generate(rooms, seed=0, move_chance=PASSERBY_CHANCE):
+    """
+    Build the spec of a city.
+
+    Parameters:
+        rooms (int): the number of rooms (at least 10).
+        seed (int): the seed of the generation.
+        move_chance (float): the chance of the walking NPCs (other than
+            Durand) to move after each command.
+
+    Returns:
+        dict: the world spec, with its rules.
+    """
+    if rooms < 10:
+        raise ValueError(f"Ville trop petite: {rooms} salles")
+    rng = random.Random(seed)
+    floors = int(rooms * FLOOR_RATIO)
+    corners = rooms - floors
+    width = math.ceil(math.sqrt(corners))
+
+    room_specs = []
+    for i in range(corners):
+        y, x = divmod(i, width)
+        exits = {}
+        if y > 0:
+            exits["N"] = corner_name(x, y - 1)
+        if i + width < corners:
+            exits["S"] = corner_name(x, y + 1)
+        if x + 1 < width and i + 1 < corners:
+            exits["E"] = corner_name(x + 1, y)
+        if x > 0:
+            exits["O"] = corner_name(x - 1, y)
+        room_specs.append({"name": corner_name(x, y), "description": f"un carrefour de la rue {y}",
+                           "exits": exits})
+    for i, corner in enumerate(rng.sample(range(corners), floors)):
+        floor = f"Immeuble {i}"
+        room_specs[corner]["exits"]["U"] = floor
+        room_specs.append({"name": floor, "description": "un appartement au premier étage",
+                           "exits": {"D": room_specs[corner]["name"]}})
+    names = [room["name"] for room in room_specs]
+
+    items = [{"name": f"{ITEM_NAMES[i % len(ITEM_NAMES)]}_{i}", "description": "un objet égaré",
+              "weight": rng.randint(1, 5), "room": rng.choice(names)}
+             for i in range(max(REQUIRED_ITEMS, int(rooms * ITEM_RATIO)))]
+
+    start_block = names[:min(corners, 4)]
+    characters = [{"name": "Durand", "description": "un voisin nerveux", "room": start_block[0],
+                   "msgs": ["Je n'ai rien vu !"], "allowed_rooms": start_block, "mobile": True}]
+    for i in range(int(rooms * NPC_RATIO)):
+        npc = {"name": f"{NPC_NAMES[i % len(NPC_NAMES)]} {i}", "description": "un habitant du quartier",
+               "room": rng.choice(names), "msgs": ["Bonjour.", "Belle journée."]}
+        if rng.random() < MOBILE_RATIO:
+            npc["mobile"] = True
+            npc["move_chance"] = move_chance
+        characters.append(npc)
+
+    quests = [{"title": f"Ronde {i}", "description": "Faire le tour du quartier",
+               "objectives": [f"Visiter {name}" for name in rng.sample(names, 3)],
+               "reward": "Le quartier est calme", "active": i == 0,
+               "requires": [f"Ronde {i - 1}"] if i else []}
+              for i in range(QUESTS)]
+
+    return {
+        "name": f"Ville de {rooms} salles",
+        "start": names[0],
+        "rules": {
+            "culprit": "Durand",
+            "required_items": [item["name"] for item in items[:REQUIRED_ITEMS]],
+            "max_displacements": 4 * width,
+        },
+        "rooms": room_specs,
+        "items": items,
+        "characters": characters,
+        "quests": quests,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Générer une grande ville")
+    parser.add_argument("--rooms", type=int, default=1000, help="nombre de salles")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--move-chance", type=float, default=PASSERBY_CHANCE,
+                        help="chance des passants de se déplacer après chaque commande")
+    parser.add_argument("--output", help="fichier de scénario à écrire (JSON)")
+    args = parser.parse_args()
+    spec = generate(args.rooms, args.seed, args.move_chance)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(spec, file, ensure_ascii=False)
+    mobile = sum(1 for npc in spec["characters"] if npc.get("mobile"))
+    print(f"{spec['name']}: {len(spec['rooms'])} salles, {len(spec['items'])} objets, "
+          f"{len(spec['characters'])} personnages dont {mobile} mobiles, {len(spec['quests'])} quêtes")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,30 +1,139 @@
 """
-Classe `Command`.
+Classes `Command` et `Dispatcher`.
 
-Cette classe représente une commande du jeu composée d'un mot-clé, d'une aide, d'une action callable
-et du nombre de paramètres attendus.
+`Command` représente une commande du jeu composée d'un mot-clé, d'une aide, d'une action callable
+et de la signature de ses paramètres. `Dispatcher` compile la table des commandes : chaque ligne
+est découpée une seule fois, les paramètres sont vérifiés et corrigés (voir `matcher.py`) selon la
+signature, puis l'action est appelée directement avec ses paramètres.
+
+Signatures:
+    NO_ARGUMENT: aucun paramètre (`look`).
+    ONE_WORD: un seul mot (`go N`).
+    REST_OF_LINE: un nom fait de tous les mots restants (`talk Médecin légiste`).
+    X_ON_Y: deux mots séparés par `on` (`use clé on coffre`).
 
 Attributs:
     command_word (str): Le mot de la commande.
     help_string (str): La chaîne d'aide affichée.
-    action (callable): La fonction appelée pour exécuter la commande.
-    number_of_parameters (int): Le nombre de paramètres attendus.
+    action (callable): La fonction appelée pour exécuter la commande, avec la partie et les paramètres.
+    signature (int): La forme des paramètres attendus.
+    argument (str): Le type des paramètres pour la correction des fautes (voir `matcher.py`), ou None.
+    number_of_parameters (int): Le nombre de paramètres attendus (0 ou 1).
 
 Exemple:
-    >>> from actions import go
-    >>> command = Command("go", "Permet de se déplacer dans une direction.", go, 1)
-    >>> command.command_word
-    'go'
+    >>> from actions import Actions
+    >>> command = Command("go", " <direction> : se déplacer", Actions.go, ONE_WORD, "direction")
+    >>> command.command_word, command.number_of_parameters
+    ('go', 1)
 """
 
+from actions import MSG0, MSG1
+
+# Signatures of the commands
+NO_ARGUMENT = 0
+ONE_WORD = 1
+REST_OF_LINE = 2
+X_ON_Y = 3
+
+# Word separating the two parameters of an X_ON_Y command
+SEPARATOR = "on"
+
+
 class Command:
-    def __init__(self, command_word, help_string, action, number_of_parameters):
+    def __init__(self, command_word, help_string, action, signature=NO_ARGUMENT, argument=None):
         self.command_word = command_word
         self.help_string = help_string
         self.action = action
-        self.number_of_parameters = number_of_parameters
+        self.signature = signature
+        self.argument = argument
+        self.number_of_parameters = 0 if signature == NO_ARGUMENT else 1
 
     def __str__(self):
         return self.command_word + self.help_string
 
 
+class Dispatcher:
+    """
+    Command table compiled into one handler per command word.
+
+    A handler checks the shape of the words, prints the usage error of the
+    signature (`MSG0`, `MSG1` or the usage line), corrects the parameters
+    with the matcher of the game and calls the action.
+
+    Attributes:
+        handlers (dict): the handler of each command word.
+    """
+
+    def __init__(self, commands):
+        """
+        Parameters:
+            commands (dict): the commands indexed by their command word.
+        """
+        self.handlers = {word: self.compile(command) for word, command in commands.items()}
+
+    @staticmethod
+    def compile(command):
+        """Return the handler `handler(game, words)` of a command."""
+        action = command.action
+        kind = command.argument
+        signature = command.signature
+        if signature == NO_ARGUMENT:
+            error = MSG0.format(command_word=command.command_word)
+
+            def handler(game, words):
+                if len(words) != 1:
+                    game.out.print(error)
+                    return False
+                return action(game)
+
+        elif signature == ONE_WORD:
+            error = MSG1.format(command_word=command.command_word)
+
+            def handler(game, words):
+                if len(words) != 2:
+                    game.out.print(error)
+                    return False
+                return action(game, game.matcher.argument(kind, words[1]))
+
+        elif signature == REST_OF_LINE:
+            error = MSG1.format(command_word=command.command_word)
+
+            def handler(game, words):
+                if len(words) < 2:
+                    game.out.print(error)
+                    return False
+                return action(game, game.matcher.argument(kind, " ".join(words[1:])))
+
+        elif signature == X_ON_Y:
+            error = f"\nUtilisation: {command.command_word}{command.help_string.split(' : ')[0]}\n"
+
+            def handler(game, words):
+                if len(words) < 4 or words[2].lower() != SEPARATOR:
+                    game.out.print(error)
+                    return False
+                matcher = game.matcher
+                return action(game, matcher.argument(kind, words[1]), matcher.argument(kind, words[3]))
+
+        else:
+            raise ValueError(f"Signature inconnue: {signature}")
+        return handler
+
+    def dispatch(self, game, command_string):
+        """
+        Execute a command line.
+
+        Parameters:
+            game (Game): the game, whose matcher corrects the words.
+            command_string (str): the line typed by the player (not blank).
+
+        Returns:
+            bool: True if the command word is known (whether or not the
+            action succeeded), False otherwise.
+        """
+        words = command_string.split()
+        words[0] = game.matcher.command(words[0])
+        handler = self.handlers.get(words[0])
+        if handler is None:
+            return False
+        handler(game, words)
+        return True
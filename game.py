@@ -1,27 +1,106 @@
 """Main game class.
 
-File `game.py`: main organization of the game, initialization of rooms,
-commands, objects, and characters.
+File `game.py`: main organization of the game, initialization of the
+commands and the player. The rooms, objects, characters and quests are
+built by the world (see `worlds.py`).
 """
 
 # Import modules
-from room import Room
 from player import Player
-from command import Command
-from actions import Actions
+from command import Command, Dispatcher, ONE_WORD, REST_OF_LINE, X_ON_Y
+from actions import Actions, CRIME_SCENE_ROOMS, CRIME_SCENE_ITEMS, DAY_MOVES
 from item import Item
-from quest import Quest
-import character
+from output import OutputSink
+from bitset import BitSet, Interner
+from rng import SessionRandom, new_seed
+from scheduler import Scheduler
+import matcher
+import routes
+import worlds
 
 DEBUG = False
 
+def build_commands():
+    """
+    Declare the commands of the game.
+
+    Returns:
+        dict: the commands indexed by their command word.
+    """
+    commands = {}
+    help = Command("help", " : afficher cette aide", Actions.help)
+    commands["help"] = help
+    quit = Command("quit", " : quitter le jeu", Actions.quit)
+    commands["quit"] = quit
+    go = Command("go", " <direction> : se déplacer dans une direction cardinale (N, E, S, O)", Actions.go,
+                 ONE_WORD, matcher.DIRECTION)
+    commands["go"] = go
+    back = Command("back", " : revenir à la pièce précédente", Actions.back)
+    commands["back"] = back
+    history = Command("history", " : afficher l'historique des pièces visitées", Actions.history)
+    commands["history"] = history
+    look = Command("look", " : observer l'environnement", Actions.look)
+    commands["look"] = look
+    take = Command("take", " <objet> : prendre un objet", Actions.take, ONE_WORD, matcher.ITEM)
+    commands["take"] = take
+    drop = Command("drop", " <objet> : déposer un objet", Actions.drop, ONE_WORD, matcher.ITEM)
+    commands["drop"] = drop
+    check = Command("check", " : vérifier l'inventaire", Actions.check)
+    commands["check"] = check
+    talk = Command("talk", " <name> : parler à un personnage", Actions.talk, REST_OF_LINE, matcher.CHARACTER)
+    commands["talk"] = talk
+    examine = Command("examine", " <objet> : examiner un objet (indice)", Actions.examine, ONE_WORD, matcher.ITEM)
+    commands["examine"] = examine
+    use = Command("use", " <objet1> on <objet2> : utiliser un objet sur un autre", Actions.use, X_ON_Y, matcher.ITEM)
+    commands["use"] = use
+    accuse = Command("accuse", " <name> : accuser un personnage du crime", Actions.accuse,
+                     REST_OF_LINE, matcher.CHARACTER)
+    commands["accuse"] = accuse
+    analyze = Command("analyze", " <item> : analyser un objet au labo", Actions.analyze, ONE_WORD, matcher.ITEM)
+    commands["analyze"] = analyze
+    quests = Command("quests", " : afficher vos quêtes disponibles et le temps restant", Actions.quests)
+    commands["quests"] = quests
+    route = Command("route", " <salle> : chemin le plus économe en déplacements vers une salle", Actions.route,
+                    REST_OF_LINE, matcher.ROOM)
+    commands["route"] = route
+    # Note: 'wait' command removed — NPCs advance automatically
+    # after each player command (old structure restored).
+    return commands
+
+
+# Command table shared by every game (commands are never modified)
+COMMANDS = build_commands()
+# The command table compiled into handlers (see command.py)
+DISPATCHER = Dispatcher(COMMANDS)
+
+
 class Game:
 
     # Constructor
-    def __init__(self):
+    def __init__(self, world=None, out=None, seed=None):
+        # World template: callable filling the rooms and quests of the game
+        self.world = world if world is not None else worlds.crime_a_montfleur()
+        # Output sink receiving all the text of the game (see output.py)
+        self.out = out if out is not None else OutputSink()
+        # Random generator of the session (NPC moves), reproducible from its seed
+        self.seed = seed if seed is not None else new_seed()
+        self.rng = SessionRandom(self.seed)
         self.finished = False
         self.rooms = []
+        # NPCs with a movement behavior, the only ones updated after each command
+        self.mobile_characters = []
+        # Number of NPC updates played, and tick of the next move of each
+        # mobile NPC (see scheduler.py)
+        self.tick = 0
+        self.scheduler = Scheduler()
+        # Cheapest routes between the rooms (see routes.py)
+        self.routes = None
+        # Typo-tolerant reading of the commands (see matcher.py)
+        self.matcher = None
+        # Write-ahead journal of the commands (see journal.py)
+        self.journal = None
         self.commands = {}
+        self.dispatcher = None
         self.player = None
         self.history = []
         # Game rule: if False, Durand is not allowed to be at the Police Station
@@ -33,250 +112,123 @@ class Game:
         self.resolution_methods = 2
         # Quest management
         from quest import Quest, QuestManager
-        self.quest_manager = QuestManager()
+        self.quest_manager = QuestManager(out=self.out)
         # Displacement counter (excluding certain rooms)
         self.displacement_count = 0
+        # Evidence and progress sets, stored as bitsets over the names of the world
+        names = getattr(self.world, "names", None)
+        self.names = names if names is not None else Interner()
+        # Rules of the world: culprit, items to analyze, time limit
+        rules = getattr(self.world, "rules", worlds.DEFAULT_RULES)
+        self.culprit = rules["culprit"]
+        self.max_displacements = rules["max_displacements"]
         # Analyzed items
-        self.analyzed_items = set()
+        self.analyzed_items = BitSet(self.names)
         # Items to analyze: clé, photos, coffre, couteau, arme, lettre
-        self.required_items = {"clé", "photos", "coffre", "couteau", "arme", "lettre"}
+        self.required_items = BitSet(self.names, rules["required_items"])
         # Accused person
         self.accused = None
         # Track visited crime scene rooms for Quest 1
-        self.visited_crime_scene_rooms = set()
+        self.visited_crime_scene_rooms = BitSet(self.names)
         # Track collected items for Quest 1
-        self.collected_items = set()
+        self.collected_items = BitSet(self.names)
         # Flags for quest rewards and special events
-        self.flags = set()
+        self.flags = BitSet(self.names)
     
-    # Game setup
-    def setup(self):
-
-        # Declare commands
-        help = Command("help", " : afficher cette aide", Actions.help, 0)
-        self.commands["help"] = help
-        quit = Command("quit", " : quitter le jeu", Actions.quit, 0)
-        self.commands["quit"] = quit
-        go = Command("go", " <direction> : se déplacer dans une direction cardinale (N, E, S, O)", Actions.go, 1)
-        self.commands["go"] = go
-        back = Command("back", " : revenir à la pièce précédente", Actions.back, 0)
-        self.commands["back"] = back
-        history = Command("history", " : afficher l'historique des pièces visitées", Actions.history, 0)
-        self.commands["history"] = history
-        look = Command("look", " : observer l'environnement", Actions.look, 0)
-        self.commands["look"] = look
-        take = Command("take", " <objet> : prendre un objet", Actions.take, 1)
-        self.commands["take"] = take
-        drop = Command("drop", " <objet> : déposer un objet", Actions.drop, 1)
-        self.commands["drop"] = drop
-        check = Command("check", " : vérifier l'inventaire", Actions.check, 0)
-        self.commands["check"] = check
-        talk = Command("talk", " <name> : parler à un personnage", Actions.talk, 1)
-        self.commands["talk"] = talk
-        examine = Command("examine", " <objet> : examiner un objet (indice)", Actions.examine, 1)
-        self.commands["examine"] = examine
-        use = Command("use", " <objet1> on <objet2> : utiliser un objet sur un autre", Actions.use, 1)
-        self.commands["use"] = use
-        accuse = Command("accuse", " <name> : accuser un personnage du crime", Actions.accuse, 1)
-        self.commands["accuse"] = accuse
-        analyze = Command("analyze", " <item> : analyser un objet au labo", Actions.analyze, 1)
-        self.commands["analyze"] = analyze
-        quests = Command("quests", " : afficher vos quêtes disponibles et le temps restant", Actions.quests, 0)
-        self.commands["quests"] = quests
-        # Note: 'wait' command removed — NPCs advance automatically
-        # after each player command (old structure restored).
-        
-        # Create rooms
-        Rue_Montfleur = Room("Rue de Montfleur", "dans la rue de Montfleur. Il y a des accès vers les maisons voisines et des traces de pneus.")
-        self.rooms.append(Rue_Montfleur)
-
-        Maison_crime = Room("Maison du crime", "dans la maison du crime. Il y a des traces de lutte et une atmosphère pesante.")
-        self.rooms.append(Maison_crime)
+    @classmethod
+    def create(cls, player_name, world=None, out=None, seed=None):
+        """
+        Build a ready-to-play game without reading from the terminal.
 
-        Durand = Room("Maison de Durand", "dans la maison de Durand. Il y a une clé suspecte et des vêtements tachés.")
-        self.rooms.append(Durand)
+        Parameters:
+            player_name (str): the name of the player.
+            world (WorldTemplate): the world (default: Crime a Montfleur).
+            out (OutputSink): the output sink (default: buffered terminal).
+            seed (int): the seed of the NPC moves (default: random).
 
-        Lenoir = Room("Maison de Madame Lenoir", "dans la maison de Madame Lenoir. Il y a une lettre mystérieuse et une fenêtre donnant sur la rue.")
-        self.rooms.append(Lenoir)
+        Returns:
+            Game: the game, set up and waiting for commands.
+        """
+        game = cls(world, out, seed)
+        game.setup(player_name)
+        return game
 
-        Café = Room("Café du Marchand", "Vous êtes dans le café du Marchand. Il y a des rumeurs qui circulent et un carnet d’habitudes des voisins.")
-        self.rooms.append(Café)
+    # Game setup
+    def setup(self, player_name=None):
+        """
+        Declare the commands, build the world and place the player.
 
-        Commissariat = Room("Commissariat", "dans le commissariat. Il y a un policier prêt à analyser les preuves.")
-        self.rooms.append(Commissariat)
+        Parameters:
+            player_name (str): the name of the player. When None, the name
+                is asked on the terminal.
+        """
+        if player_name is None:
+            player_name = input("\nEntrez votre nom: ")
+
+        # Declare commands (set `dispatcher = Dispatcher(commands)` after changing them)
+        self.commands = dict(COMMANDS)
+        self.dispatcher = DISPATCHER
+
+        # Create rooms, objects, characters and quests
+        start_room = self.world(self)
+        self.mobile_characters = [npc for room in self.rooms for npc in room.characters.values() if npc.mobile]
+        self.scheduler.clear()
+        for index, npc in enumerate(self.mobile_characters):
+            self.schedule_character(index)
+        if isinstance(self.world, worlds.WorldTemplate):
+            self.routes = routes.for_world(self.world)
+            self.matcher = matcher.for_world(self.world, self.commands)
+        else:
+            self.routes = routes.RouteTable.from_rooms(self.rooms)
+            self.matcher = matcher.CommandMatcher.from_rooms(self.rooms, self.commands)
 
-        Parc = Room("Parc de Montfleur", "dans le parc de Montfleur. Il y a un témoin qui dit avoir vu une silhouette.")
-        self.rooms.append(Parc)
- 
-        Bibliotheque = Room("Bibliothèque", "dans la bibliothèque. Il y a des archives poussiéreuses et des livres anciens.")
-        self.rooms.append(Bibliotheque)
- 
-        Grenier = Room("Grenier", "dans le grenier de la maison du crime. Il y a des vieilles photos et une malle poussiéreuse.")
-        self.rooms.append(Grenier)
- 
-        Cave = Room("Cave", "dans la cave de la maison du crime. Il y a des cartons humides et un coffre verrouillé.")
-        self.rooms.append(Cave)
- 
-        Jardin = Room("Jardin", "dans le jardin de la maison du crime. Il y a des buissons épais et une arme dissimulée.")
-        self.rooms.append(Jardin)
+        # Initialize player and starting room
+        self.player = Player(player_name, self.out)
+        self.player.current_room = start_room
+        self.player.history.append(self.player.current_room)
 
-        Morgue = Room("Morgue de Montfleur","dans la morgue de Montfleur. L’air est glacial, des corps reposent sous des draps blancs, et une odeur de formol flotte.")
-        self.rooms.append(Morgue)
-        
-        Labo = Room("Labo du commissariat", "dans le laboratoire de la police. Des équipements d'analyse et des résultats de tests sont visibles sur les tables.")
-        self.rooms.append(Labo)
-        
+    def set_output(self, out):
+        """
+        Send the text of the game to another output sink.
 
-        # Création des sorties entre salles
-        Rue_Montfleur.exits = {"E": Maison_crime, "N": Durand, "S": Lenoir, "O": Café}
-        Maison_crime.exits = {"O": Rue_Montfleur, "U": Grenier, "D": Cave, "E": Jardin}
-        Durand.exits = {"S": Rue_Montfleur}
-        Lenoir.exits = {"N": Rue_Montfleur, "S": Parc}
-        Café.exits = {"E": Rue_Montfleur, "N": Commissariat}
-        Commissariat.exits = {"S": Café, "E": Morgue, "O": Labo}
-        Parc.exits = {"N": Lenoir, "E": Bibliotheque}
-        Bibliotheque.exits = {"O": Parc}
-        Grenier.exits = {"D": Maison_crime}
-        Cave.exits = {"U": Maison_crime}
-        Jardin.exits = {"O": Maison_crime}
-        Morgue.exits = {"O": Commissariat}
-        Labo.exits = {"E": Commissariat}
+        Parameters:
+            out (OutputSink): the new output sink.
+        """
+        self.out = out
+        self.quest_manager.out = out
+        for quest in self.quest_manager.quests:
+            quest.out = out
+        if self.player is not None:
+            self.player.out = out
+
+    def set_exit(self, room, direction, new_room):
+        """
+        Change an exit of a room during the game.
 
-        # Initialize player and starting room
-        self.player = Player(input("\nEntrez votre nom: "))
-        self.player.current_room = Maison_crime
-        self.player.history.append(self.player.current_room)
+        The route table of the game is updated incrementally.
 
-        # Create quests
-        quest1 = Quest("Inspecter la maison du crime", 
-                      "Inspecter toutes les pièces de la maison du crime (Grenier, Maison, Sous-Sol, Jardin) et trouvez des indices",
-                      ["Visiter le Grenier", "Visiter le Sous-Sol (Cave)", "Visiter le Jardin", "Récupérer les indices"],
-                      "Nouvelles pistes découvertes")
-        quest1.activate()
-        self.quest_manager.add_quest(quest1)
-
-        quest2 = Quest("Faire analyser les objets au Labo",
-                      "Faire analyser les objets trouvés à la maison du crime au Labo du commissariat",
-                      ["Visiter Labo du commissariat", "Parler au Chimiste", "Faire analyser chaque objet"],
-                      "Résultats d'analyse importants")
-        self.quest_manager.add_quest(quest2)
-
-        quest3 = Quest("Aller à la morgue",
-                      "Aller à la morgue pour parler au médecin légiste",
-                      ["Visiter Morgue", "Parler au Médecin légiste"],
-                      "Indices sur la cause du décès")
-        self.quest_manager.add_quest(quest3)
-
-        quest4 = Quest("Inspecter chez Mme Lenoir",
-                      "Inspectez la maison de Mme Lenoir et interrogez-la",
-                      ["Visiter Maison de Madame Lenoir", "Fouiller la maison", "Parler à Mme Lenoir"],
-                      "Découvertes chez Lenoir")
-        self.quest_manager.add_quest(quest4)
-
-        quest6 = Quest("Analyser les objets chez Lenoir",
-                      "Faire analyser les objets trouvés chez Lenoir au commissariat",
-                      ["Apporter les objets au commissariat", "Faire analyser la lettre", "Obtenir les résultats"],
-                      "Preuves contre le meurtrier")
-        self.quest_manager.add_quest(quest6)
-
-        quest7 = Quest("Inspecter chez Durand",
-                      "Inspectez chez Durand puis trouvez-le et interrogez-le",
-                      ["Visiter Maison de Durand", "Fouiller la maison", "Trouver Durand", "L'interroger"],
-                      "Aveux du meurtrier")
-        self.quest_manager.add_quest(quest7)
-
-        quest8 = Quest("Résoudre l'énigme",
-                      "Essayez de trouver des nouveaux indices sinon accusez celui que vous pensez être le meurtrier",
-                      ["Réunir tous les indices", "Analyser les preuves", "Accuser le coupable"],
-                      "Fin de l'enquête")
-        self.quest_manager.add_quest(quest8)
-
-        # Non-chronological quests
-        quest9 = Quest("Ouvrir le coffre",
-                      "Ouvrir le coffre avec la clé mystérieuse",
-                      ["Trouver la clé", "Récupérer le coffre", "Ouvrir le coffre"],
-                      "Secrets du coffre")
-        self.quest_manager.add_quest(quest9)
-
-        quest10 = Quest("Lire la lettre mystérieuse",
-                       "Ouvrir et lire la lettre mystérieuse",
-                       ["Trouver la lettre", "Récupérer la lettre", "Lire la lettre"],
-                       "Révélations de la lettre")
-        self.quest_manager.add_quest(quest10)
-
-        # Add objects to rooms (conforming to descriptions)
-        couteau = Item("couteau", "un couteau ensanglanté", 0.5)
-        Maison_crime.inventory["couteau"] = couteau
-
-        clé = Item("clé", "une clé suspecte", 0.2)
-        Durand.inventory["clé"] = clé
-
-        lettre = Item("lettre", "une lettre mystérieuse", 0.001)
-        Lenoir.inventory["lettre"] = lettre
-
-        coffre = Item("coffre", "un coffre verrouillé", 5)
-        Cave.inventory["coffre"] = coffre
-
-        photos = Item("photos", "des vieilles photos", 0.5)
-        Grenier.inventory["photos"] = photos
-
-        arme = Item("arme", "une arme dissimulée", 3)
-        Jardin.inventory["arme"] = arme
-
-        # Add useless clues
-        livre_ville = Item("livre_ville", "un livre décrivant l'histoire de la ville", 0)
-        Bibliotheque.inventory["livre_ville"] = livre_ville
-
-        # Setup characters (NPCs)
-        durand_pnj = character.Character("Durand", "un voisin nerveux", Durand,
-                               ["Je n'ai rien vu !", "Pourquoi me soupçonner ?", "Je vous ai déjà dit la vérité."])
-        # Define authorized rooms for Durand: his house, the street, the Crime House, and the Police Station
-        durand_pnj.allowed_rooms = [Durand, Rue_Montfleur, Maison_crime, Commissariat]
-        Durand.characters["Durand"] = durand_pnj
-
-        lenoir_pnj = character.Character("Lenoir", "une vieille dame mystérieuse", Lenoir,
-                               ["J'ai entendu un bruit...", "Je crois avoir vu une silhouette.", "Tout cela est étrange..."])
-        Lenoir.characters["Lenoir"] = lenoir_pnj
-
-        policier = character.Character("Policier", "un enquêteur du commissariat", Commissariat,
-                             ["Apportez-moi des preuves.", "Vous devez analyser ces 6 objets: clé, photos, coffre, couteau, arme, lettre.", "Une fois tous les objets analyses, vous pourrez identifier le coupable.", "La verite finira par eclater."])
-        Commissariat.characters["Policier"] = policier
-
-        # NPC at the morgue: medical examiner providing analysis and autopsies
-        medecin_legiste = character.Character("Médecin légiste", "un médecin légiste studieux", Morgue,
-                               [
-                                "Rapport préliminaire: sur la scène du crime j'ai observé une blessure pénétrante, du sang et un couteau trouvé sur place (voir 'couteau' dans la Maison du crime).",
-                                "Autopsie: la cause du décès semble être une plaie thoracique. L'angle et la profondeur indiquent une attaque rapprochée; peu de signes de défense.",
-                                "ELEMENTS A ANALYSER (6 OBJETS): clé ('clé'), photos ('photos'), coffre ('coffre'), couteau ('couteau'), arme ('arme'), lettre ('lettre'). Tous ces objets doivent être apportés au laboratoire pour analyse complète.",
-                                "Analyse circonstancielle: Plusieurs suspects ont une nervosité suspecte et se sont déplacés. Lenoir a entendu un bruit. Les indices montrent plusieurs pistes.",
-                                "Les preuves physiques et les temoignages doivent etre analyses soigneusement pour identifier le vrai coupable.",
-                                "Conclusion: la victime a ete attaquee sur place. Analysez tous les 6 objets au commissariat pour en savoir plus."
-                               ])
-        Morgue.characters["Médecin légiste"] = medecin_legiste
-
-        # NPC at the laboratory: scientist for analyzing evidence
-        chimiste = character.Character("Chimiste", "un chimiste du labo", Labo,
-                               [
-                                "Bienvenue au laboratoire! Vous devez analyser 6 objets essentiels: clé, photos, coffre, couteau, arme, et lettre.",
-                                "IMPORTANT: Vous n'avez pas besoin d'avoir tous les 6 objets en meme temps! Vous pouvez les analyser UN PAR UN.",
-                                "Assurez-vous que chaque objet est dans votre inventaire avant de l'analyser avec 'analyze <objet>'.",
-                                "Commande: analyze <objet> - et je confirmerai le resultat.",
-                                "J'ai tous les equipements necessaires pour tester ces preuves et reveler les indices.",
-                                "Une fois tous les objets analyses, les preuves vous permettront d'identifier le coupable.",
-                                "Allez interroger les suspects et deduisez qui a commis le crime!"
-                               ])
-        Labo.characters["Chimiste"] = chimiste
+        Parameters:
+            room (Room): the room of the exit.
+            direction (str): the direction of the exit.
+            new_room (Room): the destination, or None to close the exit.
+        """
+        if new_room is None:
+            room.exits.pop(direction, None)
+        else:
+            room.exits[direction] = new_room
+        self.routes = self.routes.with_exit(room.name, direction, new_room.name if new_room else None)
 
     def win(self):
         """
         Check if the player has won the game.
-        Win condition: Accuse Durand, have all items, analyzed all items, within 4 days (40 moves).
+        Win condition: accuse the culprit, have analyzed all the required items,
+        within the time limit (`max_displacements`).
         
         Returns:
             bool: True if the player has won, False otherwise.
         """
-        # Check if all required items are analyzed
-        if self.required_items != self.analyzed_items:
+        # Check if all required items are analyzed (bitsets: one integer comparison)
+        if self.required_items.bits != self.analyzed_items.bits:
             return False
         
         # Check if player accused someone
@@ -284,11 +236,11 @@ class Game:
             return False
         
         # Check if accused the right person (Durand)
-        if self.accused.lower() != "durand":
+        if self.accused.lower() != self.culprit.lower():
             return False
         
-        # Check if within time limit (40 moves)
-        if self.displacement_count > 40:
+        # Check if within time limit
+        if self.displacement_count > self.max_displacements:
             return False
         
         return True
@@ -296,30 +248,45 @@ class Game:
     def loose(self):
         """
         Check if the player has lost the game.
-        Lose condition: Accuse wrong person, missing items, not analyzed, or over 4 days.
+        Lose condition: accuse the wrong person, missing items, not analyzed, or
+        over the time limit.
         
         Returns:
             bool: True if the player has lost, False otherwise.
         """
         # Check if exceeded time limit
-        if self.displacement_count > 40:
+        if self.displacement_count > self.max_displacements:
             return True
         
         # Check if accused someone wrong
-        if self.accused is not None and self.accused.lower() != "durand":
+        if self.accused is not None and self.accused.lower() != self.culprit.lower():
             return True
         
         return False
     
+    def progress_snapshot(self):
+        """
+        Return the progress of the session as a tuple of integers.
+
+        Returns:
+            tuple: (room bit, inventory bits, analyzed bits, collected bits,
+            visited bits, flag bits, displacement count), over `self.names`.
+        """
+        names = self.names
+        inventory = 0
+        for item_name in self.player.inventory:
+            inventory |= 1 << names.bit(item_name)
+        return (names.bit(self.player.current_room.name), inventory, self.analyzed_items.bits,
+                self.collected_items.bits, self.visited_crime_scene_rooms.bits, self.flags.bits,
+                self.displacement_count)
+
     def check_quest1_completion(self):
         """
         Check if Quest 1 should be completed.
         Quest 1 is complete when player has visited all crime scene rooms and collected all items.
         """
-        required_rooms = {"Grenier", "Maison du crime", "Cave", "Jardin"}
-        required_items = {"photos", "couteau", "coffre", "arme"}
-        
-        if self.visited_crime_scene_rooms == required_rooms and self.collected_items == required_items:
+        if (self.visited_crime_scene_rooms.equals(CRIME_SCENE_ROOMS)
+                and self.collected_items.equals(CRIME_SCENE_ITEMS)):
             self.quest_manager.complete_quest("Inspecter la maison du crime", self.player)
 
     def play(self):
@@ -327,47 +294,60 @@ class Game:
         self.print_welcome()
         # Loop until the game is finished
         while not self.finished:
-            # Check loose condition
-            if self.loose():
-                print("\nVOUS AVEZ PERDU!")
-                if self.displacement_count > 40:
-                    print(f"Vous avez dépassé les 4 jours d'investigation ({self.displacement_count} déplacements).")
-                elif self.accused and self.accused.lower() != "durand":
-                    print(f"Vous avez accusé la mauvaise personne: {self.accused}")
-                else:
-                    print("Vous n'avez pas tous les indices ou vous ne les avez pas analysés.")
-                self.finished = True
+            # Check loose and win conditions
+            if self.check_end():
                 break
             
-            # Check win condition
-            if self.win():
-                print("\nVOUS AVEZ GAGNÉ!")
-                print(f"Vous avez résolu l'énigme en {self.displacement_count} déplacements!")
-                print("Durand a été arrêté et sera jugé pour ses crimes.")
-                self.finished = True
-                break
-            
-            # Get the command from the player
+            # Display the output of the previous command, then get the next one
+            self.out.flush()
             self.process_command(input("> "))    
+        self.out.flush()
         return None
 
-    # Process the command entered by the player
-    def process_command(self, command_string) -> None:
+    def check_end(self):
+        """
+        Check the loose and win conditions and announce the result.
+        Called before each player command.
 
-        # Split the command string into a list of words
-        list_of_words = command_string.split(" ")
+        Returns:
+            bool: True if the game is over, False otherwise.
+        """
+        # Check loose condition
+        if self.loose():
+            self.out.print("\nVOUS AVEZ PERDU!")
+            if self.displacement_count > self.max_displacements:
+                self.out.print(f"Vous avez dépassé les {self.max_displacements / DAY_MOVES:g} jours d'investigation "
+                               f"({self.displacement_count} déplacements).")
+            elif self.accused and self.accused.lower() != self.culprit.lower():
+                self.out.print(f"Vous avez accusé la mauvaise personne: {self.accused}")
+            else:
+                self.out.print("Vous n'avez pas tous les indices ou vous ne les avez pas analysés.")
+            self.finished = True
+            return True
+        
+        # Check win condition
+        if self.win():
+            self.out.print("\nVOUS AVEZ GAGNÉ!")
+            self.out.print(f"Vous avez résolu l'énigme en {self.displacement_count} déplacements!")
+            self.out.print(f"{self.culprit} a été arrêté et sera jugé pour ses crimes.")
+            self.finished = True
+            return True
+        return False
 
-        command_word = list_of_words[0]
+    # Process the command entered by the player
+    def process_command(self, command_string) -> None:
 
         if command_string.strip() == "":
             return
+        # Write-ahead: the command is journaled before it runs
+        if self.journal is not None:
+            self.journal.begin(self, command_string)
+        # Parse the words, correcting case, accents and typos, and run the action
         # If the command is not recognized, print an error message
-        if command_word not in self.commands.keys():
-            print(f"\nCommande non reconnue. Tapez 'help' pour voir la liste des commandes disponibles.\n")
-        # If the command is recognized, execute it
+        if not self.dispatcher.dispatch(self, command_string):
+            self.out.print(f"\nCommande non reconnue. Tapez 'help' pour voir la liste des commandes disponibles.\n")
+        # If the command is recognized, it has been executed
         else:
-            command = self.commands[command_word]
-            command.action(self, list_of_words, command.number_of_parameters)
             # Restore the old behavior: after each player command,
             # attempt to move NPCs and display their movements.
             # Do not call if the game is finished.
@@ -377,35 +357,43 @@ class Game:
                 except Exception:
                     # Do not break the game if the update crashes.
                     pass
+            if self.journal is not None:
+                self.journal.commit(self)
+
+    def schedule_character(self, index):
+        """
+        Draw the tick of the next move of a mobile NPC.
+
+        Parameters:
+            index (int): the index of the NPC in `mobile_characters`.
+        """
+        delay = self.mobile_characters[index].next_delay(self.rng)
+        if delay is not None:
+            self.scheduler.schedule(self.tick + delay, index)
 
     def update_characters(self):
         """
-        Attempt to move all NPCs and display notifications
-        if an NPC leaves or arrives in the player's room.
-        Call after execution of a player command.
+        Advance the NPCs by one tick: move the NPCs due at this tick and
+        display notifications if an NPC leaves or arrives in the player's
+        room. Call after execution of a player command.
+
+        Only the due NPCs are visited (see scheduler.py): the cost does not
+        depend on the number of rooms, of static NPCs or of idle NPCs.
         """
         moved_events = []  # tuples (character, old_room, new_room)
 
-        # Build a snapshot of all characters present at the start
-        all_characters = []
-        for room in self.rooms:
-            for character in list(room.characters.values()):
-                all_characters.append(character)
-
-        # Avoid processing the same object twice (for safety)
-        seen = set()
-        for character in all_characters:
-            if id(character) in seen:
-                continue
-            seen.add(id(character))
+        self.tick += 1
+        for index in self.scheduler.pop_due(self.tick):
+            character = self.mobile_characters[index]
             old_room = character.current_room
-            moved = character.move()
+            moved = character.walk(self.rng)
+            self.schedule_character(index)
             # Keep collecting events for later processing
             if moved and character.current_room is not old_room:
                 new_room = character.current_room
                 moved_events.append((character, old_room, new_room))
 
-        # Movements are logged in `Character.move()` via DEBUG.
+        # Movements are logged in `Character.walk()` via DEBUG.
         # We avoid sending additional text notifications here
         # so that player management/notification is done elsewhere.
         # Process movement events to produce clues/suspicion
@@ -441,53 +429,57 @@ class Game:
 
     # Print the welcome message
     def print_welcome(self):     
-        print(f"\nBienvenue {self.player.name} dans Crime a Montfleur !")
-        print("Entrez 'help' si vous avez besoin d'aide.\n")
+        # Display only: nothing to do when the output is discarded
+        if not self.out.enabled:
+            return
+
+        self.out.print(f"\nBienvenue {self.player.name} dans Crime a Montfleur !")
+        self.out.print("Entrez 'help' si vous avez besoin d'aide.\n")
 
     # Introduction scenario
-        print("Une nuit sombre vient de tomber sur Montfleur...")
-        print("Un crime mysterieux a ete commis dans une maison de la rue principale.")
-        print("Les voisins murmurent, les temoins hesitent, et les preuves semblent se cacher dans chaque recoin.")
-        print("Votre mission : explorer les lieux, interroger les habitants, et decouvrir la verite.\n")
+        self.out.print("Une nuit sombre vient de tomber sur Montfleur...")
+        self.out.print("Un crime mysterieux a ete commis dans une maison de la rue principale.")
+        self.out.print("Les voisins murmurent, les temoins hesitent, et les preuves semblent se cacher dans chaque recoin.")
+        self.out.print("Votre mission : explorer les lieux, interroger les habitants, et decouvrir la verite.\n")
         
         # Display time limit information
-        print("="*60)
-        print("CONDITIONS DE L'ENQUETE")
-        print("="*60)
-        print("Temps disponible: 4 jours = 40 deplacements")
-        print("(Les deplacements dans le Grenier, Jardin, Cave et Labo ne comptent pas)")
-        print()
-        print("Tapez 'quests' pour voir vos quetes et le temps restant")
-        print("="*60 + "\n")
+        self.out.print("="*60)
+        self.out.print("CONDITIONS DE L'ENQUETE")
+        self.out.print("="*60)
+        self.out.print(f"Temps disponible: {self.max_displacements / DAY_MOVES:g} jours = {self.max_displacements} deplacements")
+        self.out.print("(Les deplacements dans le Grenier, Jardin, Cave et Labo ne comptent pas)")
+        self.out.print()
+        self.out.print("Tapez 'quests' pour voir vos quetes et le temps restant")
+        self.out.print("="*60 + "\n")
         
         # Display important gameplay instructions
-        print("="*60)
-        print("INSTRUCTIONS IMPORTANTES")
-        print("="*60)
-        print("\n1. COLLECTER LES OBJETS:")
-        print("   - Utilisez: take <objet>")
-        print("   - Les objets DOIVENT etre dans votre inventaire pour etre analyses")
-        print("   - Verifiez votre inventaire avec: check")
+        self.out.print("="*60)
+        self.out.print("INSTRUCTIONS IMPORTANTES")
+        self.out.print("="*60)
+        self.out.print("\n1. COLLECTER LES OBJETS:")
+        self.out.print("   - Utilisez: take <objet>")
+        self.out.print("   - Les objets DOIVENT etre dans votre inventaire pour etre analyses")
+        self.out.print("   - Verifiez votre inventaire avec: check")
         
-        print("\n2. ANALYSER LES OBJETS (UN PAR UN):")
-        print("   - Vous n'avez PAS besoin d'avoir les 6 objets en meme temps")
-        print("   - Prenez un objet, allez au Labo, puis: analyze <objet>")
-        print("   - Le Chimiste confirmera l'analyse")
-        print("   - Repetez pour chaque objet, un par un")
+        self.out.print("\n2. ANALYSER LES OBJETS (UN PAR UN):")
+        self.out.print("   - Vous n'avez PAS besoin d'avoir les 6 objets en meme temps")
+        self.out.print("   - Prenez un objet, allez au Labo, puis: analyze <objet>")
+        self.out.print("   - Le Chimiste confirmera l'analyse")
+        self.out.print("   - Repetez pour chaque objet, un par un")
         
-        print("\n3. OBTENIR LES RESULTATS:")
-        print("   - Apres avoir analyse chaque objet: talk Chimiste")
-        print("   - Une fois tous les 6 objets analyses: accuser le coupable")
+        self.out.print("\n3. OBTENIR LES RESULTATS:")
+        self.out.print("   - Apres avoir analyse chaque objet: talk Chimiste")
+        self.out.print("   - Une fois tous les 6 objets analyses: accuser le coupable")
         
-        print("\n4. GAGNER LE JEU:")
-        print("   - Analyser et recuperer les resultats des 6 objets")
-        print("   - Decouvrir qui est le coupable")
-        print("   - L'accuser au Commissariat")
-        print("   - Tout faire en moins de 40 deplacements")
-        print("\n" + "="*60 + "\n")
+        self.out.print("\n4. GAGNER LE JEU:")
+        self.out.print("   - Analyser et recuperer les resultats des 6 objets")
+        self.out.print("   - Decouvrir qui est le coupable")
+        self.out.print("   - L'accuser au Commissariat")
+        self.out.print(f"   - Tout faire en moins de {self.max_displacements} deplacements")
+        self.out.print("\n" + "="*60 + "\n")
  
     # Description of the starting room
-        print(self.player.current_room.get_long_description())
+        self.out.print(self.player.current_room.get_long_description())
     
 
 def main():
@@ -0,0 +1,326 @@
+"""Write-ahead journal of a game.
+
+File `journal.py`: crash safety for long-running sessions. A `Journal`
+attached to a game (`game.journal`) is called by `Game.process_command`
+before and after each command: the command is appended before it runs
+(write-ahead), and once it has been accepted, a second record holds the
+resulting state delta (random state and displacement count), checked when
+the command is replayed. Every `snapshot_interval` commands, accepted or
+not, the journal is compacted before the next one is written: a full
+snapshot (see `save.py`) is written to a new file that atomically replaces
+the old one. `recover` loads the last
+snapshot and replays only the commands written after it, so the recovery
+time is bounded by the snapshot interval, not by the length of the session.
+A command written without its delta (rejected, or interrupted by a crash)
+is replayed as well: the replay is deterministic.
+
+File format: a sequence of records
+    type (1 byte), length (4 bytes), payload, CRC-32 of type and payload
+The first record is a snapshot, the others are commands and deltas. A
+record cut by a crash (short or with a wrong CRC) ends the journal and is
+dropped.
+
+Records reach the operating system as soon as they are written (they
+survive a crash of the process). With `fsync=True` they are also forced to
+the disk (they survive a crash of the machine), at the cost of one disk
+synchronization per command.
+
+Usage:
+    python journal.py JOURNAL [JOURNAL ...]
+
+One JSON line is printed per recovered session.
+"""
+
+import argparse
+import json
+import os
+import struct
+import zlib
+
+import save
+from output import NullSink, OutputSink
+
+SNAPSHOT = 1
+COMMAND = 2
+APPLIED = 3
+
+RECORD = struct.Struct("<BI")
+CRC = struct.Struct("<I")
+DELTA = struct.Struct("<QQ")
+
+
+class JournalError(ValueError):
+    """Raised when a journal cannot be recovered."""
+
+
+def encode_record(kind, payload):
+    """Return the bytes of one record."""
+    head = RECORD.pack(kind, len(payload))
+    return head + payload + CRC.pack(zlib.crc32(payload, zlib.crc32(head[:1])))
+
+
+def read_records(data):
+    """
+    Parse the records of a journal.
+
+    Returns:
+        tuple: (list of (type, payload), length of the valid part of the data).
+    """
+    records = []
+    offset = 0
+    while offset + RECORD.size <= len(data):
+        kind, size = RECORD.unpack_from(data, offset)
+        end = offset + RECORD.size + size + CRC.size
+        if end > len(data):
+            break
+        payload = data[offset + RECORD.size:end - CRC.size]
+        if CRC.unpack_from(data, end - CRC.size)[0] != zlib.crc32(payload, zlib.crc32(data[offset:offset + 1])):
+            break
+        records.append((kind, payload))
+        offset = end
+    return records, offset
+
+
+class Journal:
+    """
+    Append-only journal of one game.
+
+    Attributes:
+        path (str): the journal file.
+        snapshot_interval (int): the number of commands between snapshots.
+        fsync (bool): True to force every record to the disk.
+        pending (int): the commands written since the last snapshot.
+    """
+
+    def __init__(self, path, snapshot_interval=100, fsync=False):
+        self.path = path
+        self.snapshot_interval = snapshot_interval
+        self.fsync = fsync
+        self.pending = 0
+        self.file = None
+
+    @classmethod
+    def create(cls, path, game, snapshot_interval=100, fsync=False):
+        """
+        Start the journal of a game with a snapshot and attach it.
+
+        Returns:
+            Journal: the journal, also set as `game.journal`.
+        """
+        journal = cls(path, snapshot_interval, fsync)
+        journal.compact(game)
+        game.journal = journal
+        return journal
+
+    def write(self, data):
+        self.file.write(data)
+        if self.fsync:
+            os.fsync(self.file.fileno())
+
+    def begin(self, game, command_string):
+        """
+        Append a command about to run, after compacting the journal when due.
+
+        Every command counts, rejected ones included: a client sending lines
+        that are not commands does not grow the journal beyond the interval.
+        """
+        if self.pending >= self.snapshot_interval:
+            self.compact(game)
+        self.write(encode_record(COMMAND, command_string.encode("utf-8")))
+        self.pending += 1
+
+    def commit(self, game):
+        """Append the delta of the accepted command."""
+        self.write(encode_record(APPLIED, DELTA.pack(game.rng.getstate(), game.displacement_count)))
+
+    def compact(self, game):
+        """Replace the journal with a snapshot of the game (atomic rename)."""
+        temporary = self.path + ".tmp"
+        with open(temporary, "wb") as file:
+            file.write(encode_record(SNAPSHOT, save.dump(game)))
+            file.flush()
+            if self.fsync:
+                os.fsync(file.fileno())
+        if self.file is not None:
+            self.file.close()
+        os.replace(temporary, self.path)
+        self.file = open(self.path, "ab", buffering=0)
+        self.pending = 0
+
+    def close(self, remove=False):
+        """Close the journal file, and delete it if `remove` is True."""
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+        if remove and os.path.exists(self.path):
+            os.remove(self.path)
+
+
+class JournalDirectory:
+    """
+    Journals of the sessions of a server process, one file per session.
+
+    The file of a session is named after its id. The journal of a finished
+    game is deleted when its session closes; the others stay, so that the
+    game can be resumed later (`resume`), also after a restart of the
+    server (`recover_all`).
+
+    Attributes:
+        directory (str): the directory of the journal files.
+        snapshot_interval (int): the number of commands between snapshots.
+        fsync (bool): True to force every record to the disk.
+    """
+
+    def __init__(self, directory, snapshot_interval=100, fsync=False):
+        self.directory = directory
+        self.snapshot_interval = snapshot_interval
+        self.fsync = fsync
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, session_id):
+        """
+        Return the journal file of a session.
+
+        Raises:
+            JournalError: if the session id cannot be a file name.
+        """
+        name = str(session_id)
+        if not name or not all(c.isalnum() or c in "-_" for c in name):
+            raise JournalError(f"Identifiant de session invalide: {name!r}")
+        return os.path.join(self.directory, f"{name}.wal")
+
+    def attach(self, session_id, game):
+        """Start the journal of a new session."""
+        return Journal.create(self.path(session_id), game, self.snapshot_interval, self.fsync)
+
+    def detach(self, game):
+        """Close the journal of a session, deleting it if the game is finished."""
+        if game.journal is not None:
+            game.journal.close(remove=game.finished)
+            game.journal = None
+
+    def resume(self, session_id, out=None):
+        """
+        Rebuild the game of a session from its journal, to continue it.
+
+        Returns:
+            Game: the game with its journal attached, or None if the session
+            has no journal.
+
+        Raises:
+            JournalError: if the journal cannot be recovered.
+        """
+        path = self.path(session_id)
+        if not os.path.exists(path):
+            return None
+        return recover(path, out, True, self.snapshot_interval, self.fsync)
+
+    def recover_all(self):
+        """
+        Recover the journals left by a previous server, at startup.
+
+        Each journal is replayed and compacted into a single snapshot; the
+        journals of finished games are deleted, and those that cannot be
+        recovered are renamed with a `.bad` suffix.
+
+        Returns:
+            tuple: (ids of the sessions that can be resumed, paths of the
+            journals that could not be recovered).
+        """
+        resumable = []
+        failed = []
+        for name in sorted(os.listdir(self.directory)):
+            path = os.path.join(self.directory, name)
+            if name.endswith(".wal.tmp"):
+                # Snapshot interrupted before its rename: the journal is intact
+                os.remove(path)
+                continue
+            if not name.endswith(".wal"):
+                continue
+            try:
+                game = recover(path, NullSink(), True, self.snapshot_interval, self.fsync)
+            except Exception:
+                os.replace(path, path + ".bad")
+                failed.append(path)
+                continue
+            if game.finished:
+                game.journal.close(remove=True)
+                continue
+            game.journal.compact(game)
+            game.journal.close()
+            resumable.append(name[:-len(".wal")])
+        return resumable, failed
+
+
+def recover(path, out=None, resume=True, snapshot_interval=100, fsync=False):
+    """
+    Rebuild a game from its journal.
+
+    Parameters:
+        path (str): the journal file.
+        out (OutputSink): the output sink of the game (default: buffered).
+        resume (bool): if True, a torn last record is cut off and the
+            journal is attached to the game to continue writing.
+
+    Returns:
+        Game: the game in the state of its last journaled command.
+
+    Raises:
+        JournalError: if the journal has no snapshot or the replay diverges.
+    """
+    with open(path, "rb") as file:
+        data = file.read()
+    records, valid = read_records(data)
+    if not records or records[0][0] != SNAPSHOT:
+        raise JournalError(f"Journal sans instantané: {path}")
+    try:
+        game = save.load(records[0][1], NullSink())
+    except save.SaveError as error:
+        raise JournalError(f"Instantané illisible: {error}") from None
+    # The snapshot may precede the end-of-game check of its command
+    game.check_end()
+    replayed = False
+    pending = 0
+    for kind, payload in records[1:]:
+        if kind == COMMAND:
+            game.process_command(str(payload, "utf-8"))
+            game.check_end()
+            replayed = True
+            pending += 1
+        elif kind == APPLIED and replayed and len(payload) == DELTA.size:
+            state, displacements = DELTA.unpack(payload)
+            if game.rng.getstate() != state or game.displacement_count != displacements:
+                raise JournalError(f"La relecture diverge du journal: {path}")
+            replayed = False
+        else:
+            raise JournalError(f"Enregistrement inattendu: {kind}")
+    game.set_output(out if out is not None else OutputSink())
+    if resume:
+        if valid < len(data):
+            with open(path, "r+b") as file:
+                file.truncate(valid)
+        journal = Journal(path, snapshot_interval, fsync)
+        journal.file = open(path, "ab", buffering=0)
+        journal.pending = pending
+        game.journal = journal
+    return game
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Récupérer des parties depuis leur journal")
+    parser.add_argument("journals", nargs="+", help="fichiers journaux")
+    args = parser.parse_args()
+    for path in args.journals:
+        game = recover(path, resume=False)
+        print(json.dumps({
+            "journal": path,
+            "player": game.player.name,
+            "room": game.player.current_room.name,
+            "displacement_count": game.displacement_count,
+            "analyzed_items": sorted(game.analyzed_items),
+            "finished": game.finished,
+        }, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
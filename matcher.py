@@ -0,0 +1,294 @@
+"""Typo-tolerant reading of the commands.
+
+File `matcher.py`: the words typed by the player are matched against the
+vocabulary of the game (command words, directions, objects, characters and
+rooms) without regard to case, accents or extra spaces, and a word with a
+small typo is replaced by the only known word close to it (`analyse` ->
+`analyze`, `cle` -> `clé`, `Go n` -> `go N`).
+
+A `FuzzyIndex` maps every string obtained by deleting at most one
+character of a word to the words it comes from (a few entries per word,
+built with the index). Two words at one edit share one of these strings, so
+a lookup with one typo generates the deletions of the typed word and checks
+only the words they point to. A word at two edits that needs two deletions
+to meet the typed word is found by first correcting one edit of the typed
+word, with the characters of the vocabulary. The number of probes depends on the
+length of the typed word and on the alphabet, not on the size of the
+vocabulary, and no lookup builds anything. The indexes of the arguments of
+a world are built with its template (see `WorldTemplate.arguments`).
+
+Example:
+    >>> index = FuzzyIndex(["analyze", "accuse", "clé", "Médecin légiste"])
+    >>> index.lookup("analyse"), index.lookup("CLE"), index.lookup("medecin  legiste")
+    ('analyze', 'clé', 'Médecin légiste')
+    >>> index.lookup("xyz") is None
+    True
+"""
+
+import unicodedata
+import weakref
+
+# Kinds of command arguments (see `Command.argument`)
+DIRECTION = "direction"
+ITEM = "item"
+CHARACTER = "character"
+ROOM = "room"
+
+
+def normalize(text):
+    """
+    Return the comparison form of a text: lowercase, without accents and
+    with single spaces.
+
+    Example:
+        >>> normalize("  Médecin   LÉGISTE ")
+        'medecin legiste'
+    """
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return " ".join(stripped.split())
+
+
+def tokenize(command_string):
+    """Split a command line into words, ignoring repeated and trailing spaces."""
+    return command_string.split()
+
+
+def max_distance(word):
+    """Return the number of typos tolerated in a word of this length."""
+    if len(word) <= 3:
+        return 0
+    if len(word) <= 7:
+        return 1
+    return 2
+
+
+def edits(word, alphabet):
+    """
+    Return the strings at one edit of a word: deletions, swaps of two
+    neighbors, and substitutions and insertions of a character of `alphabet`.
+    """
+    splits = [(word[:i], word[i:]) for i in range(len(word) + 1)]
+    variants = {left + right[1:] for left, right in splits if right}
+    variants.update(left + right[1] + right[0] + right[2:] for left, right in splits if len(right) > 1)
+    variants.update(left + char + right[1:] for left, right in splits if right for char in alphabet)
+    variants.update(left + char + right for left, right in splits for char in alphabet)
+    return variants
+
+
+def deletions(word, distance):
+    """Return the strings obtained by deleting up to `distance` characters."""
+    variants = {word}
+    frontier = {word}
+    for _ in range(distance):
+        frontier = {variant[:i] + variant[i + 1:] for variant in frontier for i in range(len(variant))}
+        variants |= frontier
+    return variants
+
+
+def edit_distance(a, b, limit):
+    """
+    Return the edit distance of two strings (insertions, deletions,
+    substitutions and swaps of two neighbors), or `limit + 1` if it exceeds
+    `limit`.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = None
+    row = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(row[j] + 1, current[j - 1] + 1, row[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous[j - 2] + 1)
+        if min(current) > limit and min(row) > limit:
+            return limit + 1
+        previous, row = row, current
+    return row[-1]
+
+
+class FuzzyIndex:
+    """
+    Words found by their comparison form, with a few typos tolerated.
+
+    Attributes:
+        exact (dict): the word of each comparison form.
+        neighbors (dict): the comparison form, or the list of comparison
+            forms, of the words reached by each string at one deletion or
+            less.
+        alphabet (set): the characters of the comparison forms.
+    """
+
+    def __init__(self, words=()):
+        self.exact = {}
+        self.neighbors = {}
+        self.alphabet = set()
+        for word in words:
+            self.add(word)
+
+    def add(self, word):
+        key = normalize(word)
+        if key in self.exact:
+            return
+        self.exact[key] = word
+        self.alphabet.update(key)
+        neighbors = self.neighbors
+        for variant in deletions(key, 1):
+            # Most strings come from a single word, kept without a list
+            entry = neighbors.get(variant)
+            if entry is None:
+                neighbors[variant] = key
+            elif isinstance(entry, str):
+                neighbors[variant] = [entry, key]
+            else:
+                entry.append(key)
+
+    def probes(self, key, limit):
+        """Return the strings to look up for the words within `limit` edits of a key."""
+        # Words reached by deleting one character or none of them
+        probes = deletions(key, limit)
+        if limit < 2:
+            return probes
+        # Words with an inserted character: deleting it leaves a word at one edit
+        probes |= edits(key, self.alphabet)
+        # Words with a swap and another typo: fix the swap, then delete one character
+        for i in range(len(key) - 1):
+            swapped = key[:i] + key[i + 1] + key[i] + key[i + 2:]
+            probes.update(swapped[:j] + swapped[j + 1:] for j in range(len(swapped)))
+        # Words with two substitutions: fix the first one, delete the second one
+        for i in range(len(key) - 1):
+            for char in self.alphabet:
+                changed = key[:i] + char + key[i + 1:]
+                probes.update(changed[:j] + changed[j + 1:] for j in range(i + 1, len(key)))
+        return probes
+
+    def lookup(self, text):
+        """
+        Return the known word matching a text, or None if there is none or
+        several equally close.
+        """
+        key = normalize(text)
+        word = self.exact.get(key)
+        if word is not None:
+            return word
+        neighbors = self.neighbors
+        # The closest words first: the probes of two typos only if no word
+        # is at one edit, and a second word at the same distance ends it
+        for distance in range(1, max_distance(key) + 1):
+            found = None
+            seen = set()
+            for variant in self.probes(key, distance):
+                entry = neighbors.get(variant)
+                if entry is None:
+                    continue
+                for candidate in (entry,) if isinstance(entry, str) else entry:
+                    if candidate in seen:
+                        continue
+                    seen.add(candidate)
+                    # Both words must tolerate the typos (short words match exactly)
+                    candidate_limit = min(distance, max_distance(candidate))
+                    if edit_distance(key, candidate, candidate_limit) > candidate_limit:
+                        continue
+                    if found is not None:
+                        return None
+                    found = candidate
+            if found is not None:
+                return self.exact[found]
+        return None
+
+
+def argument_indexes(directions, items, characters, rooms):
+    """
+    Index the names of each kind of argument.
+
+    Parameters:
+        directions, items, characters, rooms (iterable): the names.
+
+    Returns:
+        dict: the `FuzzyIndex` of each kind of argument.
+    """
+    return {
+        DIRECTION: FuzzyIndex(directions),
+        ITEM: FuzzyIndex(items),
+        CHARACTER: FuzzyIndex(characters),
+        ROOM: FuzzyIndex(rooms),
+    }
+
+
+class CommandMatcher:
+    """
+    Correct the words of a command line against the vocabulary of a world.
+
+    Attributes:
+        commands (FuzzyIndex): the command words.
+        arguments (dict): the `FuzzyIndex` of each kind of argument.
+    """
+
+    def __init__(self, command_words, arguments):
+        self.commands = FuzzyIndex(command_words)
+        self.arguments = arguments
+
+    @classmethod
+    def from_world(cls, world, command_words):
+        """Build the matcher of a `WorldTemplate`, sharing its argument indexes."""
+        return cls(command_words, world.arguments)
+
+    @classmethod
+    def from_rooms(cls, rooms, command_words):
+        """Build the matcher of a world given by its rooms."""
+        directions = sorted({direction for room in rooms for direction in room.exits})
+        items = [name for room in rooms for name in room.inventory]
+        characters = [name for room in rooms for name in room.characters]
+        return cls(command_words, argument_indexes(directions, items, characters, [room.name for room in rooms]))
+
+    def command(self, word):
+        """Return the command word matching `word`, or `word` unchanged."""
+        match = self.commands.lookup(word)
+        return match if match is not None else word
+
+    def argument(self, kind, text):
+        """
+        Return the name of the given kind matching `text`, or `text`
+        unchanged (also when `kind` is None).
+
+        Words that match nothing are kept as typed, so the actions report
+        them as before.
+
+        Example:
+            >>> import worlds
+            >>> matcher = for_world(worlds.crime_a_montfleur(), ["go", "take"])
+            >>> matcher.command("Go"), matcher.argument(DIRECTION, "n"), matcher.argument(ITEM, "cofre")
+            ('go', 'N', 'coffre')
+            >>> matcher.argument(CHARACTER, "medecin legiste"), matcher.argument(ITEM, "indice")
+            ('Médecin légiste', 'indice')
+        """
+        if kind is None:
+            return text
+        match = self.arguments[kind].lookup(text)
+        return match if match is not None else text
+
+
+# Matchers of the world templates, by template and command words (dropped
+# with the template)
+_matchers = weakref.WeakKeyDictionary()
+
+
+def for_world(world, command_words):
+    """
+    Return the matcher of a world template, shared by all its games.
+
+    Parameters:
+        world (WorldTemplate): the world.
+        command_words (iterable): the command words of the games.
+
+    Returns:
+        CommandMatcher: the matcher, built on first use.
+    """
+    matchers = _matchers.setdefault(world, {})
+    command_words = tuple(command_words)
+    matcher = matchers.get(command_words)
+    if matcher is None:
+        matcher = matchers[command_words] = CommandMatcher.from_world(world, command_words)
+    return matcher
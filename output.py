@@ -0,0 +1,86 @@
+"""Output sinks.
+
+File `output.py`: where the text of the game goes. Every piece of text is
+sent to a sink with `out.print(...)` (same arguments as `print`) instead of
+being printed line by line.
+
+- `OutputSink` buffers the text of one command; `flush()` writes it to the
+  terminal in one call and `take()` returns it (used by the sessions).
+- `ConsoleSink` writes immediately, like `print` (default of the objects
+  used outside of a game).
+- `NullSink` discards everything. Its `enabled` attribute is False so that
+  callers can skip building expensive text.
+
+Example:
+    >>> out = OutputSink()
+    >>> out.print("Bonjour", "Montfleur")
+    >>> out.print("Sorties:", "N", "E", sep=" ", end="!\\n")
+    >>> out.take()
+    'Bonjour Montfleur\\nSorties: N E!\\n'
+    >>> out.take()
+    ''
+"""
+
+import sys
+
+
+class OutputSink:
+    """
+    Buffer the text of one command and write it at once.
+
+    Attributes:
+        enabled (bool): True if the text is used (False for `NullSink`).
+        stream: where `flush` writes (None: the current `sys.stdout`).
+    """
+
+    enabled = True
+
+    def __init__(self, stream=None):
+        self.stream = stream
+        self.parts = []
+
+    def print(self, *values, sep=" ", end="\n"):
+        """Add text to the buffer, with the same arguments as `print`."""
+        if len(values) == 1:
+            self.parts.append(f"{values[0]}{end}")
+        else:
+            self.parts.append(sep.join(map(str, values)) + end)
+
+    def take(self):
+        """Return the buffered text and empty the buffer."""
+        text = "".join(self.parts)
+        self.parts.clear()
+        return text
+
+    def flush(self):
+        """Write the buffered text to the stream in one call."""
+        if self.parts:
+            stream = self.stream if self.stream is not None else sys.stdout
+            stream.write(self.take())
+            stream.flush()
+
+
+class ConsoleSink(OutputSink):
+    """Write the text immediately to the current `sys.stdout`."""
+
+    def print(self, *values, sep=" ", end="\n"):
+        print(*values, sep=sep, end=end, file=self.stream if self.stream is not None else sys.stdout)
+
+
+class NullSink(OutputSink):
+    """Discard all the text (simulations and replays)."""
+
+    enabled = False
+
+    def print(self, *values, sep=" ", end="\n"):
+        pass
+
+    def take(self):
+        return ""
+
+    def flush(self):
+        pass
+
+
+# Sink of the objects created outside of a game
+CONSOLE = ConsoleSink()
@@ -1,12 +1,17 @@
+from output import CONSOLE
+
+
 # Define the Player class.
 class Player():
 
     # Define the constructor.
-    def __init__(self, name):
+    def __init__(self, name, out=None):
         self.name = name
         self.current_room = None
         self.history = []
         self.inventory = {}
+        # Output sink (see output.py), set by the game
+        self.out = out if out is not None else CONSOLE
     
     # Define the move method.
     def move(self, direction):
@@ -15,13 +20,14 @@ class Player():
 
         # If the next room is None, display an error message and return False.
         if next_room is None:
-            print("\nAucune porte dans cette direction !\n")
+            self.out.print("\nAucune porte dans cette direction !\n")
             return False
         
         # Set the current room to the next room.
         self.current_room = next_room
         self.history.append(self.current_room)
-        print(self.current_room.get_long_description())
+        if self.out.enabled:
+            self.out.print(self.current_room.get_long_description())
         return True
 
     def get_inventory(self):
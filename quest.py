@@ -1,5 +1,78 @@
 """ Define the Quest class"""
 
+from output import CONSOLE
+
+# Beginnings of the objectives completed by visiting a room, in the order they are tried
+ROOM_PREFIXES = ("Visiter ", "Explorer ", "Aller à ", "Entrer dans ", "Se rendre à ", "Accéder au ", "Accéder à ")
+
+# Objective kinds
+TEXT = "text"
+ROOM = "room"
+COUNTER = "counter"
+
+
+def room_objectives(room_name):
+    """Return the objective texts completed by visiting a room, in the order they are tried."""
+    return tuple(prefix + room_name for prefix in ROOM_PREFIXES)
+
+
+def action_objectives(action, target=None):
+    """Return the objective texts completed by an action, in the order they are tried."""
+    if target:
+        return (
+            f"{action} {target}",
+            f"{action} avec {target}",
+            f"{action} le {target}",
+            f"{action} la {target}"
+        )
+    return (action,)
+
+class Objective:
+    """
+    Structured form of an objective text, compiled once when the quest is built.
+
+    Attributes:
+        text (str): The objective as written in the quest.
+        kind (str): COUNTER if the text holds a number ("Se déplacer 10 fois"),
+            ROOM if it names a room to visit ("Visiter Cave"), TEXT otherwise.
+        target (str): The words before the number or the room name.
+        required (int): The count to reach, for a COUNTER objective.
+        silent (bool): True if completing it prints nothing (room visits).
+    """
+
+
+    def __init__(self, text, kind=TEXT, target=None, required=None):
+        self.text = text
+        self.kind = kind
+        self.target = target
+        self.required = required
+        self.silent = text.startswith("Visiter") or "Accéder" in text
+
+
+    @classmethod
+    def parse(cls, text):
+        """
+        Compile an objective text.
+
+        Examples:
+
+        >>> objective = Objective.parse("Se déplacer 10 fois")
+        >>> objective.kind, objective.target, objective.required
+        ('counter', 'Se déplacer', 10)
+        >>> objective = Objective.parse("Visiter Cave")
+        >>> objective.kind, objective.target, objective.silent
+        ('room', 'Cave', True)
+        """
+        words = text.split()
+        for i, word in enumerate(words):
+            if word.isdigit():
+                return cls(text, COUNTER, " ".join(words[:i]), int(word))
+        for prefix in ROOM_PREFIXES:
+            if text.startswith(prefix):
+                return cls(text, ROOM, text[len(prefix):])
+        return cls(text)
+
+
 class Quest:
     """
     This class represents a quest in the game. A quest has a title, description,
@@ -12,10 +85,17 @@ class Quest:
         is_completed (bool): Whether the quest is completed.
         is_active (bool): Whether the quest is currently active.
         reward (str): Optional reward for completing the quest.
+        requires (tuple): The titles of the quests to complete before this one is activated.
+        optional (bool): Whether the quest is off the main storyline.
+        waiting (int): The number of prerequisites not completed yet.
+        compiled (dict): The `Objective` of each objective text.
+        counter_objectives (dict): The COUNTER objectives whose text contains
+            each counter name, filled on first use of the name.
+        counters (dict): The last known value of each counter.
     """
 
 
-    def __init__(self, title, description, objectives=None, reward=None):
+    def __init__(self, title, description, objectives=None, reward=None, requires=(), optional=False):
         """
         Initialize a new quest.
         
@@ -24,6 +104,8 @@ class Quest:
             description (str): The description of the quest.
             objectives (list): List of objectives (default: empty list).
             reward (str): Optional reward description.
+            requires (tuple): Titles of the prerequisite quests.
+            optional (bool): Whether the quest is off the main storyline.
             
         Examples:
         
@@ -40,10 +122,18 @@ class Quest:
         self.title = title
         self.description = description
         self.objectives = objectives if objectives is not None else []
+        self.compiled = {text: Objective.parse(text) for text in self.objectives}
+        self.counter_objectives = {}
+        self.counters = {}
         self.completed_objectives = []
         self.is_completed = False
         self.is_active = False
         self.reward = reward
+        self.requires = tuple(requires)
+        self.optional = optional
+        self.waiting = len(self.requires)
+        # Output sink (see output.py), set by the quest manager
+        self.out = CONSOLE
 
 
     def activate(self):
@@ -57,15 +147,15 @@ class Quest:
         False
         >>> quest.activate()
         <BLANKLINE>
-        🗡️  Nouvelle quête activée: Adventure
-        📝 Go on an adventure
+        Nouvelle quête activée: Adventure
+        Go on an adventure
         <BLANKLINE>
         >>> quest.is_active
         True
         """
         self.is_active = True
-        print(f"\nNouvelle quête activée: {self.title}")
-        print(f"{self.description}\n")
+        self.out.print(f"\nNouvelle quête activée: {self.title}")
+        self.out.print(f"{self.description}\n")
 
 
     def complete_objective(self, objective, player=None):
@@ -83,7 +173,7 @@ class Quest:
         
         >>> quest = Quest("Hunt", "Hunt monsters", ["Kill 5 goblins", "Kill 3 orcs"])
         >>> quest.complete_objective("Kill 5 goblins")
-         Objectif accompli: Kill 5 goblins
+        Objectif accompli: Kill 5 goblins
         True
         >>> len(quest.completed_objectives)
         1
@@ -92,11 +182,12 @@ class Quest:
         >>> quest.complete_objective("Invalid objective")
         False
         """
-        if objective in self.objectives and objective not in self.completed_objectives:
+        compiled = self.compiled.get(objective)
+        if compiled is not None and objective not in self.completed_objectives:
             self.completed_objectives.append(objective)
             # Don't print for room visit objectives
-            if not (objective.startswith("Visiter") or "Accéder" in objective):
-                print(f"Objectif accompli: {objective}")
+            if not compiled.silent:
+                self.out.print(f"Objectif accompli: {objective}")
 
             # Check if all objectives are completed
             if len(self.completed_objectives) == len(self.objectives):
@@ -120,31 +211,37 @@ class Quest:
         False
         >>> quest.complete_quest() # doctest: +NORMALIZE_WHITESPACE
         <BLANKLINE>
+        ============================================================
         Quête terminée: Final Quest
+        ============================================================
+        <BLANKLINE>
+        INDICE REÇU: Trophy
+        <BLANKLINE>
+        Excellent, votre enquête avance ! Continuez !
         <BLANKLINE>
         >>> quest.is_completed
         True
         """
         if not self.is_completed:
             self.is_completed = True
-            print(f"\n{'='*60}")
-            print(f"Quête terminée: {self.title}")
-            print(f"{'='*60}")
+            self.out.print(f"\n{'='*60}")
+            self.out.print(f"Quête terminée: {self.title}")
+            self.out.print(f"{'='*60}")
             
             # Display reward/clue message
             if self.reward:
-                print(f"\nINDICE REÇU: {self.reward}\n")
+                self.out.print(f"\nINDICE REÇU: {self.reward}\n")
             
             # Display specific messages based on quest title
             if self.title == "Résoudre l'énigme":
-                print("Bravo vous avez résolu l'affaire; Vous êtes un grand détective !")
+                self.out.print("Bravo vous avez résolu l'affaire; Vous êtes un grand détective !")
             elif self.title == "Ouvrir le coffre":
-                print("Vous avez découvert des secrets importants!")
+                self.out.print("Vous avez découvert des secrets importants!")
             elif self.title == "Lire la lettre mystérieuse":
-                print("La lettre révèle des informations cruciales!")
+                self.out.print("La lettre révèle des informations cruciales!")
             else:
-                print("Excellent, votre enquête avance ! Continuez !")
-            print()
+                self.out.print("Excellent, votre enquête avance ! Continuez !")
+            self.out.print()
 
 
     def get_status(self):
@@ -158,19 +255,19 @@ class Quest:
         
         >>> quest = Quest("Collect", "Collect items", ["Get sword", "Get shield"])
         >>> quest.get_status()
-        ' Collect (Non activée)'
+        'Collect (Non activée)'
         >>> quest.activate()
         <BLANKLINE>
-          Nouvelle quête activée: Collect
-         Collect items
+        Nouvelle quête activée: Collect
+        Collect items
         <BLANKLINE>
         >>> quest.get_status()
-        ' Collect (0/2 objectifs)'
+        'Collect (0/2 objectifs)'
         >>> quest.complete_objective("Get sword")
-         Objectif accompli: Get sword
+        Objectif accompli: Get sword
         True
         >>> quest.get_status()
-        ' Collect (1/2 objectifs)'
+        'Collect (1/2 objectifs)'
         """
         if not self.is_active:
             return f"{self.title} (Non activée)"
@@ -187,7 +284,8 @@ class Quest:
         
         Args:
             current_counts (dict): Optional dictionary with current counter values 
-                                   (e.g., {"Se déplacer": 5})
+                                   (e.g., {"Se déplacer": 5}); by default, the
+                                   last values given to `check_counter_objective`.
         
         Returns:
             str: A formatted string with quest details.
@@ -201,6 +299,8 @@ class Quest:
         >>> "Progression: 5/10" in details
         True
         """
+        if current_counts is None:
+            current_counts = self.counters
         details = f"\nQuête: {self.title}\n"
         details += f" {self.description}\n"
 
@@ -227,34 +327,32 @@ class Quest:
         Returns:
             str: Formatted objective text with progress if applicable.
         """
-        if not current_counts:
-            return objective
+        compiled = self.compiled[objective]
+        if compiled.kind == COUNTER:
+            for counter_name, current_count in current_counts.items():
+                if counter_name in objective:
+                    return f"{objective} (Progression: {current_count}/{compiled.required})"
+        return objective
 
-        for counter_name, current_count in current_counts.items():
-            if counter_name not in objective:
-                continue
 
-            # Extract required count from objective
-            required = self._extract_number_from_text(objective)
-            if required is not None:
-                return f"{objective} (Progression: {current_count}/{required})"
+    def counting(self, counter_name):
+        """
+        Return the COUNTER objectives whose text contains a counter name.
 
-        return objective
+        Examples:
 
-    def _extract_number_from_text(self, text):
-        """
-        Extract the first number from a text string.
-        
-        Args:
-            text (str): The text to search.
-            
-        Returns:
-            int: The first number found, or None if no number exists.
+        >>> quest = Quest("Search", "Search the house", ["Trouver 3 indices", "Visiter Cave"])
+        >>> [objective.text for objective in quest.counting("indices")]
+        ['Trouver 3 indices']
+        >>> quest.counting("Visiter")
+        []
         """
-        for word in text.split():
-            if word.isdigit():
-                return int(word)
-        return None
+        objectives = self.counter_objectives.get(counter_name)
+        if objectives is None:
+            objectives = self.counter_objectives[counter_name] = [
+                objective for objective in self.compiled.values()
+                if objective.kind == COUNTER and counter_name in objective.text]
+        return objectives
 
 
     def check_room_objective(self, room_name, player=None):
@@ -272,25 +370,17 @@ class Quest:
         
         >>> quest = Quest("Explore", "Explore the castle", ["Visiter Castle"])
         >>> quest.check_room_objective("Castle")
-         Objectif accompli: Visiter Castle
         <BLANKLINE>
-         Quête terminée: Explore
+        ============================================================
+        Quête terminée: Explore
+        ============================================================
+        Excellent, votre enquête avance ! Continuez !
         <BLANKLINE>
         True
         >>> quest.check_room_objective("Tower")
         False
         """
-        room_objectives = [
-            f"Visiter {room_name}",
-            f"Explorer {room_name}",
-            f"Aller à {room_name}",
-            f"Entrer dans {room_name}",
-            f"Se rendre à {room_name}",
-            f"Accéder au {room_name}",
-            f"Accéder à {room_name}"
-        ]
-
-        for objective in room_objectives:
+        for objective in room_objectives(room_name):
             if self.complete_objective(objective, player):
                 return True
         return False
@@ -312,25 +402,18 @@ class Quest:
         
         >>> quest = Quest("Talk", "Have a conversation", ["parler avec garde"])
         >>> quest.check_action_objective("parler", "garde") # doctest: +NORMALIZE_WHITESPACE
-         Objectif accompli: parler avec garde
+        Objectif accompli: parler avec garde
         <BLANKLINE>
-         Quête terminée: Talk
+        ============================================================
+        Quête terminée: Talk
+        ============================================================
+        Excellent, votre enquête avance ! Continuez !
         <BLANKLINE>
         True
         >>> quest.check_action_objective("courir", "vite")
         False
         """
-        if target:
-            objective_variations = [
-                f"{action} {target}",
-                f"{action} avec {target}",
-                f"{action} le {target}",
-                f"{action} la {target}"
-            ]
-        else:
-            objective_variations = [action]
-
-        for objective in objective_variations:
+        for objective in action_objectives(action, target):
             if self.complete_objective(objective, player):
                 return True
         return False
@@ -341,7 +424,8 @@ class Quest:
         Check objectives that require counting (e.g., visit X rooms, collect Y items).
         
         Args:
-            counter_name (str): The name of what is being counted.
+            counter_name (str): The name of what is being counted, found
+                anywhere in the objective ("Marcher" or "fois" for "Marcher 5 fois").
             current_count (int): The current count.
             player: The player object (optional).
             
@@ -354,22 +438,20 @@ class Quest:
         >>> quest.check_counter_objective("Marcher", 3)
         False
         >>> quest.check_counter_objective("Marcher", 5) # doctest: +ELLIPSIS
-         Objectif accompli: Marcher 5 fois
+        Objectif accompli: Marcher 5 fois
         <BLANKLINE>
-         Quête terminée: Walker
+        ============================================================
+        Quête terminée: Walker
+        ============================================================
+        Excellent, votre enquête avance ! Continuez !
         <BLANKLINE>
         True
         """
-        for objective in self.objectives:
-            if counter_name in objective and objective not in self.completed_objectives:
-                # Extract number from objective (e.g., "Visiter 3 lieux" -> 3)
-                words = objective.split()
-                for word in words:
-                    if word.isdigit():
-                        required_count = int(word)
-                        if current_count >= required_count:
-                            self.complete_objective(objective, player)
-                            return True
+        self.counters[counter_name] = current_count
+        for objective in self.counting(counter_name):
+            if current_count >= objective.required and objective.text not in self.completed_objectives:
+                self.complete_objective(objective.text, player)
+                return True
         return False
 
 
@@ -381,14 +463,14 @@ class Quest:
         
         >>> quest = Quest("String Test", "Test __str__", ["Task 1"])
         >>> str(quest)
-        ' String Test (Non activée)'
+        'String Test (Non activée)'
         >>> quest.activate() # doctest: +NORMALIZE_WHITESPACE
         <BLANKLINE>
-          Nouvelle quête activée: String Test
-         Test __str__
+        Nouvelle quête activée: String Test
+        Test __str__
         <BLANKLINE>
         >>> str(quest)
-        ' String Test (0/1 objectifs)'
+        'String Test (0/1 objectifs)'
         """
         return self.get_status()
 
@@ -396,20 +478,38 @@ class Quest:
 class QuestManager:
     """
     This class manages all quests in the game.
+
+    The objectives are indexed by their text, so a game event (visiting a
+    room, an action, a completed objective) only looks at the quests that
+    have a matching objective, whatever the number of quests.
+
+    The quests declare their prerequisites (`Quest.requires`), which form a
+    DAG. Completing a quest through the manager decreases the `waiting`
+    counter of the quests that require it and activates those left with
+    none, so the work per completion only depends on its dependents.
     
     Attributes:
         quests (list): List of all quests in the game.
-        active_quests (list): List of currently active quests.
+        active_quests (list): List of currently active quests, in activation order.
         player: Reference to the player object.
+        objective_index (dict): The quests having each objective text.
+        counting (list): The quests having COUNTER objectives.
+        counter_index (dict): The quests having objectives on each counter,
+            filled on first use of the counter name.
+        counters (dict): The value of each counter increased with `increment_counter`.
+        titles (dict): The quests having each title.
+        dependents (dict): The quests requiring each quest title.
+        active (dict): The activation rank and quest of each active quest, by quest id.
     """
 
 
-    def __init__(self, player=None):
+    def __init__(self, player=None, out=None):
         """
         Initialize the quest manager.
         
         Args:
             player: The player object (optional, can be set later).
+            out: The output sink of the quests (default: the console).
             
         Examples:
         
@@ -420,8 +520,57 @@ class QuestManager:
         0
         """
         self.quests = []
-        self.active_quests = []
+        self.objective_index = {}
+        self.counting = []
+        self.counter_index = {}
+        self.counters = {}
+        self.titles = {}
+        self.dependents = {}
+        self.active = {}
+        self._rank = 0
         self.player = player
+        self.out = out if out is not None else CONSOLE
+
+
+    @property
+    def active_quests(self):
+        return [quest for _, quest in self.active.values()]
+
+
+    @active_quests.setter
+    def active_quests(self, quests):
+        self.active = {}
+        for quest in quests:
+            self._set_active(quest)
+
+
+    def _set_active(self, quest):
+        self._rank += 1
+        self.active[id(quest)] = (self._rank, quest)
+
+
+    def _set_inactive(self, quest):
+        self.active.pop(id(quest), None)
+
+
+    def _matches(self, objectives):
+        """
+        Find the objectives completed by an event in the active quests.
+
+        Args:
+            objectives (tuple): The objective texts of the event, in the order they are tried.
+
+        Returns:
+            list: (quest, objective) for each active quest having one of the
+            objectives not yet completed (the first one), in activation order.
+        """
+        found = {}
+        for objective in objectives:
+            for quest in self.objective_index.get(objective, ()):
+                entry = self.active.get(id(quest))
+                if entry is not None and id(quest) not in found and objective not in quest.completed_objectives:
+                    found[id(quest)] = (entry[0], quest, objective)
+        return [(quest, objective) for _, quest, objective in sorted(found.values(), key=lambda match: match[0])]
 
 
     def add_quest(self, quest):
@@ -441,7 +590,18 @@ class QuestManager:
         >>> manager.quests[0].title
         'Quest 1'
         """
+        quest.out = self.out
         self.quests.append(quest)
+        self.titles.setdefault(quest.title, []).append(quest)
+        for objective in quest.objectives:
+            quests = self.objective_index.setdefault(objective, [])
+            if not quests or quests[-1] is not quest:
+                quests.append(quest)
+        if any(objective.kind == COUNTER for objective in quest.compiled.values()):
+            self.counting.append(quest)
+            self.counter_index = {}
+        for required in quest.requires:
+            self.dependents.setdefault(required, []).append(quest)
 
 
     def activate_quest(self, quest_title):
@@ -461,8 +621,8 @@ class QuestManager:
         >>> manager.add_quest(quest)
         >>> manager.activate_quest("Epic Quest")
         <BLANKLINE>
-          Nouvelle quête activée: Epic Quest
-         An epic adventure
+        Nouvelle quête activée: Epic Quest
+        An epic adventure
         <BLANKLINE>
         True
         >>> len(manager.active_quests)
@@ -470,10 +630,10 @@ class QuestManager:
         >>> manager.activate_quest("Unknown Quest")
         False
         """
-        for quest in self.quests:
-            if quest.title == quest_title and not quest.is_active:
+        for quest in self.titles.get(quest_title, ()):
+            if not quest.is_active:
                 quest.activate()
-                self.active_quests.append(quest)
+                self._set_active(quest)
                 return True
         return False
 
@@ -495,28 +655,39 @@ class QuestManager:
         >>> manager.add_quest(quest)
         >>> manager.activate_quest("Manager Quest") # doctest: +NORMALIZE_WHITESPACE
         <BLANKLINE>
-          Nouvelle quête activée: Manager Quest
-         Test
+        Nouvelle quête activée: Manager Quest
+        Test
         <BLANKLINE>
         True
         >>> manager.complete_objective("Do something") # doctest: +NORMALIZE_WHITESPACE
-         Objectif accompli: Do something
+        Objectif accompli: Do something
         <BLANKLINE>
-         Quête terminée: Manager Quest
+        ============================================================
+        Quête terminée: Manager Quest
+        ============================================================
+        Excellent, votre enquête avance ! Continuez !
         <BLANKLINE>
         True
         >>> manager.complete_objective("Do nothing")
         False
         """
-        for quest in self.active_quests:
-            if quest.complete_objective(objective_text):
-                # Remove completed quests from active list
-                if quest.is_completed:
-                    self.active_quests.remove(quest)
-                    # Activate next chronological quest if applicable
-                    self.activate_next_chronological_quest(quest.title)
-                return True
-        return False
+        # The first active quest having the objective
+        first = None
+        for quest in self.objective_index.get(objective_text, ()):
+            entry = self.active.get(id(quest))
+            if entry is not None and objective_text not in quest.completed_objectives:
+                if first is None or entry[0] < first[0]:
+                    first = entry
+        if first is None:
+            return False
+        quest = first[1]
+        quest.complete_objective(objective_text)
+        # Remove completed quests from active list
+        if quest.is_completed:
+            self._set_inactive(quest)
+            # Activate the quests that were waiting for this one
+            self.release(quest)
+        return True
 
 
     def complete_quest(self, quest_title, player=None):
@@ -530,40 +701,55 @@ class QuestManager:
         Returns:
             bool: True if quest was found and completed, False otherwise.
         """
-        for quest in self.quests:
-            if quest.title == quest_title and not quest.is_completed:
+        for quest in self.titles.get(quest_title, ()):
+            if not quest.is_completed:
                 quest.complete_quest(player)
                 # Remove from active if it was active
-                if quest in self.active_quests:
-                    self.active_quests.remove(quest)
-                # Activate next chronological quest if applicable
-                self.activate_next_chronological_quest(quest.title)
+                self._set_inactive(quest)
+                # Activate the quests that were waiting for this one
+                self.release(quest)
                 return True
         return False
 
 
-    def activate_next_chronological_quest(self, completed_quest_title):
+    def release(self, quest):
         """
-        Activate the next chronological quest if the completed quest is part of the main storyline.
+        Count a completed quest in the quests requiring it and activate
+        those whose prerequisites are all completed.
         
         Args:
-            completed_quest_title (str): The title of the quest that was just completed.
-        """
-        quest_titles = [
-            "Inspecter la maison du crime",
-            "Faire analyser les objets au Labo",
-            "Aller à la morgue",
-            "Inspecter chez Mme Lenoir",
-            "Analyser les objets chez Lenoir",
-            "Inspecter chez Durand",
-            "Résoudre l'énigme"
-        ]
+            quest (Quest): The quest that was just completed.
+            
+        Examples:
         
-        if completed_quest_title in quest_titles:
-            index = quest_titles.index(completed_quest_title)
-            if index + 1 < len(quest_titles):
-                next_title = quest_titles[index + 1]
-                self.activate_quest(next_title)
+        >>> from output import NullSink
+        >>> manager = QuestManager(out=NullSink())
+        >>> first = Quest("First", "Start")
+        >>> second = Quest("Second", "Then", requires=("First",))
+        >>> last = Quest("Last", "End", requires=("First", "Second"))
+        >>> for quest in (first, second, last):
+        ...     manager.add_quest(quest)
+        >>> manager.complete_quest("First")
+        True
+        >>> [quest.title for quest in manager.active_quests], last.waiting
+        (['Second'], 1)
+        >>> manager.complete_quest("Second")
+        True
+        >>> [quest.title for quest in manager.active_quests]
+        ['Last']
+        """
+        for dependent in self.dependents.get(quest.title, ()):
+            dependent.waiting -= 1
+            if dependent.waiting == 0 and not dependent.is_active:
+                dependent.activate()
+                self._set_active(dependent)
+
+
+    def recount(self):
+        """Recompute the `waiting` counters from the completed quests (after a restore)."""
+        for quest in self.quests:
+            quest.waiting = sum(1 for required in quest.requires
+                                if not all(other.is_completed for other in self.titles.get(required, ())))
 
 
     def check_room_objectives(self, room_name):
@@ -580,22 +766,24 @@ class QuestManager:
         >>> manager.add_quest(quest)
         >>> manager.activate_quest("Visit Places") # doctest: +NORMALIZE_WHITESPACE
         <BLANKLINE>
-          Nouvelle quête activée: Visit Places
-         Visit rooms
+        Nouvelle quête activée: Visit Places
+        Visit rooms
         <BLANKLINE>
         True
         >>> manager.check_room_objectives("Library") # doctest: +NORMALIZE_WHITESPACE
-         Objectif accompli: Visiter Library
         <BLANKLINE>
-         Quête terminée: Visit Places
+        ============================================================
+        Quête terminée: Visit Places
+        ============================================================
+        Excellent, votre enquête avance ! Continuez !
         <BLANKLINE>
         >>> len(manager.active_quests)
         0
         """
-        for quest in self.active_quests[:]:  # Use slice to avoid modification during iteration
-            quest.check_room_objective(room_name, self.player)
+        for quest, objective in self._matches(room_objectives(room_name)):
+            quest.complete_objective(objective, self.player)
             if quest.is_completed:
-                self.active_quests.remove(quest)
+                self._set_inactive(quest)
 
 
     def check_action_objectives(self, action, target=None):
@@ -613,22 +801,25 @@ class QuestManager:
         >>> manager.add_quest(quest)
         >>> manager.activate_quest("Actions") # doctest: +NORMALIZE_WHITESPACE
         <BLANKLINE>
-          Nouvelle quête activée: Actions
-         Do actions
+        Nouvelle quête activée: Actions
+        Do actions
         <BLANKLINE>
         True
         >>> manager.check_action_objectives("parler", "roi") # doctest: +NORMALIZE_WHITESPACE
-         Objectif accompli: parler avec roi
+        Objectif accompli: parler avec roi
         <BLANKLINE>
-         Quête terminée: Actions
+        ============================================================
+        Quête terminée: Actions
+        ============================================================
+        Excellent, votre enquête avance ! Continuez !
         <BLANKLINE>
         >>> len(manager.active_quests)
         0
         """
-        for quest in self.active_quests[:]:
-            quest.check_action_objective(action, target, self.player)
+        for quest, objective in self._matches(action_objectives(action, target)):
+            quest.complete_objective(objective, self.player)
             if quest.is_completed:
-                self.active_quests.remove(quest)
+                self._set_inactive(quest)
 
 
     def check_counter_objectives(self, counter_name, current_count):
@@ -646,25 +837,55 @@ class QuestManager:
         >>> manager.add_quest(quest)
         >>> manager.activate_quest("Counter") # doctest: +NORMALIZE_WHITESPACE
         <BLANKLINE>
-         Nouvelle quête activée: Counter
-         Count things
+        Nouvelle quête activée: Counter
+        Count things
         <BLANKLINE>
         True
         >>> manager.check_counter_objectives("Compter", 2)
         >>> len(manager.active_quests)
         1
         >>> manager.check_counter_objectives("Compter", 3) # doctest: +NORMALIZE_WHITESPACE
-         Objectif accompli: Compter 3 fois
+        Objectif accompli: Compter 3 fois
         <BLANKLINE>
-         Quête terminée: Counter
+        ============================================================
+        Quête terminée: Counter
+        ============================================================
+        Excellent, votre enquête avance ! Continuez !
         <BLANKLINE>
         >>> len(manager.active_quests)
         0
         """
-        for quest in self.active_quests[:]:
+        candidates = self.counter_index.get(counter_name)
+        if candidates is None:
+            candidates = self.counter_index[counter_name] = [
+                quest for quest in self.counting if quest.counting(counter_name)]
+        quests = []
+        for quest in candidates:
+            entry = self.active.get(id(quest))
+            if entry is not None:
+                quests.append(entry)
+        quests.sort(key=lambda entry: entry[0])
+        for _, quest in quests:
             quest.check_counter_objective(counter_name, current_count, self.player)
             if quest.is_completed:
-                self.active_quests.remove(quest)
+                self._set_inactive(quest)
+
+
+    def increment_counter(self, counter_name, amount=1):
+        """
+        Increase a counter and check the objectives on it.
+
+        Args:
+            counter_name (str): The name of what is being counted.
+            amount (int): The increase.
+
+        Returns:
+            int: The new value of the counter.
+        """
+        count = self.counters.get(counter_name, 0) + amount
+        self.counters[counter_name] = count
+        self.check_counter_objectives(counter_name, count)
+        return count
 
 
     def get_active_quests(self):
@@ -683,8 +904,8 @@ class QuestManager:
         0
         >>> manager.activate_quest("Active Quest")
         <BLANKLINE>
-        🗡️  Nouvelle quête activée: Active Quest
-        📝 An active quest
+        Nouvelle quête activée: Active Quest
+        An active quest
         <BLANKLINE>
         True
         >>> len(manager.get_active_quests())
@@ -736,10 +957,8 @@ class QuestManager:
         >>> manager.get_quest_by_title("Unknown") is None
         True
         """
-        for quest in self.quests:
-            if quest.title == title:
-                return quest
-        return None
+        quests = self.titles.get(title)
+        return quests[0] if quests else None
 
 
     def show_quests(self):
@@ -757,18 +976,18 @@ class QuestManager:
         >>> manager.add_quest(quest)
         >>> manager.show_quests() # doctest: +NORMALIZE_WHITESPACE
         <BLANKLINE>
-        Liste des quêtes:
-         Display Quest (Non activée)
+         Liste des quêtes:
+          Display Quest (Non activée)
         <BLANKLINE>
         """
         if not self.quests:
-            print("\nAucune quête disponible.\n")
+            self.out.print("\nAucune quête disponible.\n")
             return
 
-        print("\n Liste des quêtes:")
+        self.out.print("\n Liste des quêtes:")
         for quest in self.quests:
-            print(f"  {quest.get_status()}")
-        print()
+            self.out.print(f"  {quest.get_status()}")
+        self.out.print()
 
 
     def show_quest_details(self, quest_title, current_counts=None):
@@ -786,11 +1005,11 @@ class QuestManager:
         >>> manager.add_quest(quest)
         >>> manager.show_quest_details("Detail Quest") # doctest: +NORMALIZE_WHITESPACE
         <BLANKLINE>
-         Quête: Detail Quest
+        Quête: Detail Quest
          Show details
         <BLANKLINE>
         Objectifs:
-         Task
+          [ ] Task
         <BLANKLINE>
         >>> manager.show_quest_details("Unknown")
         <BLANKLINE>
@@ -799,6 +1018,6 @@ class QuestManager:
         """
         quest = self.get_quest_by_title(quest_title)
         if quest:
-            print(quest.get_details(current_counts))
+            self.out.print(quest.get_details(current_counts))
         else:
-            print(f"\nQuête '{quest_title}' non trouvée.\n")
+            self.out.print(f"\nQuête '{quest_title}' non trouvée.\n")
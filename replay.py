@@ -0,0 +1,194 @@
+"""Transcript replay.
+
+File `replay.py`: replay recorded sessions through `Game.process_command`
+without terminal output, for regression checks and load tests.
+
+A transcript is a text file with one command per line. It may hold several
+sessions, each one starting with a header line:
+
+    # session <id> [seed=<seed>] [name=<player name>]
+
+The seed is the one of the random generator of the game (NPC moves): a
+session replayed with its seed ends in exactly the same state. Commands
+before the first header belong to an implicit session "1". Other
+lines starting with "#" and blank lines are ignored. The file is read line
+by line, so archives larger than memory can be replayed (".gz" files are
+decompressed on the fly).
+
+Usage:
+    python replay.py TRANSCRIPT [TRANSCRIPT ...]
+
+One JSON line is printed per session with its final state and wall time.
+"""
+
+import argparse
+import gzip
+import json
+import sys
+import time
+
+from game import Game
+from output import NullSink
+
+HEADER = "# session"
+
+
+class SessionReport:
+    """
+    Final state of a replayed session.
+
+    Attributes:
+        session_id (str): the id from the session header.
+        seed (int): the seed of the game.
+        commands (int): the number of commands executed.
+        displacement_count (int): the displacements of the player.
+        analyzed_items (list): the analyzed items, sorted.
+        accused (str): the accused person, or None.
+        quests_completed (list): the titles of the completed quests.
+        won (bool): True if the player has won.
+        lost (bool): True if the player has lost.
+        wall_time (float): the time spent in the session, in seconds.
+    """
+
+    def __init__(self, session_id, game, commands, wall_time):
+        self.session_id = session_id
+        self.seed = game.seed
+        self.commands = commands
+        self.displacement_count = game.displacement_count
+        self.analyzed_items = sorted(game.analyzed_items)
+        self.accused = game.accused
+        self.quests_completed = [quest.title for quest in game.quest_manager.quests if quest.is_completed]
+        self.won = game.win()
+        self.lost = game.loose()
+        self.wall_time = wall_time
+
+    def to_dict(self):
+        """Return the report as a dictionary (JSON serializable)."""
+        return dict(self.__dict__)
+
+
+def format_header(session_id, player_name, seed):
+    """
+    Return the header line of a session.
+
+    Example:
+        >>> format_header("42", "Jean Dupont", 7)
+        '# session 42 seed=7 name=Jean Dupont'
+    """
+    return f"{HEADER} {session_id} seed={seed} name={player_name}"
+
+
+def parse_header(line):
+    """
+    Parse a session header line.
+
+    The name, which may contain spaces, runs to the end of the line.
+
+    Returns:
+        tuple: (session id, dictionary of the key=value fields).
+
+    Example:
+        >>> parse_header("# session 42 seed=7 name=Jean Dupont")
+        ('42', {'seed': '7', 'name': 'Jean Dupont'})
+    """
+    text = line[len(HEADER):].strip()
+    name = None
+    if " name=" in f" {text}":
+        text, _, name = f" {text}".partition(" name=")
+    words = text.split()
+    session_id = words[0] if words else ""
+    fields = dict(word.split("=", 1) for word in words[1:] if "=" in word)
+    if name is not None:
+        fields["name"] = name
+    return session_id, fields
+
+
+class Replayer:
+    """
+    Replay the sessions of a transcript one after the other.
+
+    Attributes:
+        world (WorldTemplate): the world of the games (None: default).
+    """
+
+    def __init__(self, world=None):
+        self.world = world
+        self.out = NullSink()
+
+    def start(self, fields):
+        """Create the game of a new session from its header fields."""
+        seed = int(fields["seed"]) if "seed" in fields else None
+        return Game.create(fields.get("name", "replay"), self.world, self.out, seed)
+
+    def replay(self, lines):
+        """
+        Replay the sessions of a transcript.
+
+        Parameters:
+            lines (iterable): the lines of the transcript.
+
+        Yields:
+            SessionReport: the report of each session, as soon as it ends.
+        """
+        session_id, fields = "1", {}
+        game = None
+        commands = 0
+        elapsed = 0.0
+        for line in lines:
+            line = line.rstrip("\r\n")
+            if line.startswith("#"):
+                if line.startswith(HEADER):
+                    if game is not None:
+                        yield SessionReport(session_id, game, commands, elapsed)
+                    session_id, fields = parse_header(line)
+                    start = time.perf_counter()
+                    game = self.start(fields)
+                    commands = 0
+                    elapsed = time.perf_counter() - start
+                continue
+            if not line.strip():
+                continue
+            if game is None:
+                start = time.perf_counter()
+                game = self.start(fields)
+                elapsed = time.perf_counter() - start
+            if game.finished:
+                continue
+            start = time.perf_counter()
+            game.process_command(line)
+            game.check_end()
+            elapsed += time.perf_counter() - start
+            commands += 1
+        if game is not None:
+            yield SessionReport(session_id, game, commands, elapsed)
+
+
+def open_transcript(path):
+    """Open a transcript for streaming ("-" is the standard input)."""
+    if path == "-":
+        return sys.stdin
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8")
+    return open(path, "r", encoding="utf-8", buffering=1 << 20)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rejouer des transcriptions de parties")
+    parser.add_argument("transcripts", nargs="+", help="fichiers de commandes ('-' : entrée standard)")
+    args = parser.parse_args()
+    replayer = Replayer()
+    sessions = 0
+    commands = 0
+    start = time.perf_counter()
+    for path in args.transcripts:
+        with open_transcript(path) as lines:
+            for report in replayer.replay(lines):
+                sessions += 1
+                commands += report.commands
+                print(json.dumps(report.to_dict(), ensure_ascii=False))
+    elapsed = time.perf_counter() - start
+    print(f"{sessions} session(s), {commands} commande(s) en {elapsed:.3f} s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Random generator of a session.
+
+File `rng.py`: each game owns a `SessionRandom` seeded at creation, so the
+NPC moves of a session do not depend on other sessions and a session can be
+replayed exactly from its seed. The generator is SplitMix64: its whole state
+is one 64-bit integer.
+
+Example:
+    >>> a = SessionRandom(42)
+    >>> b = SessionRandom(42)
+    >>> [a.choice("NESO") for _ in range(8)] == [b.choice("NESO") for _ in range(8)]
+    True
+    >>> state = a.getstate()
+    >>> x = a.random()
+    >>> a.setstate(state)
+    >>> a.random() == x
+    True
+"""
+
+import random
+
+MASK64 = (1 << 64) - 1
+
+
+def new_seed():
+    """Return a fresh random seed for a session."""
+    return random.getrandbits(64)
+
+
+class SessionRandom:
+    """
+    Small-state random generator (SplitMix64).
+
+    Attributes:
+        state (int): the 64-bit state of the generator.
+    """
+
+    def __init__(self, seed=None):
+        self.state = 0
+        self.seed(seed)
+
+    def seed(self, seed=None):
+        """Reset the generator (None: a fresh random seed)."""
+        self.state = (new_seed() if seed is None else seed) & MASK64
+
+    def getstate(self):
+        return self.state
+
+    def setstate(self, state):
+        self.state = state
+
+    def next64(self):
+        """Return the next 64 random bits."""
+        self.state = state = (self.state + 0x9E3779B97F4A7C15) & MASK64
+        z = ((state ^ (state >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+        z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & MASK64
+        return z ^ (z >> 31)
+
+    def random(self):
+        """Return a float in [0, 1)."""
+        return (self.next64() >> 11) * (1.0 / (1 << 53))
+
+    def randbelow(self, n):
+        """Return an integer in [0, n), without bias."""
+        bits = n.bit_length()
+        value = self.next64() >> (64 - bits)
+        while value >= n:
+            value = self.next64() >> (64 - bits)
+        return value
+
+    def choice(self, seq):
+        """Return a random element of a non-empty sequence."""
+        if not seq:
+            raise IndexError("Cannot choose from an empty sequence")
+        return seq[self.randbelow(len(seq))]
@@ -0,0 +1,232 @@
+"""Displacement-weighted shortest paths.
+
+File `routes.py`: cheapest routes between the rooms of a world. A move
+costs one displacement, except moves into or out of the free rooms (see
+`Actions.go`), so the hop count is not the real cost: paths are ordered by
+displacements, then by number of moves.
+
+A `RouteTable` keeps, for each source room, the cost of the cheapest path
+to every room and the first direction to take (next-hop pointer). Rows are
+computed on first use (`precompute()` fills the whole table) and shared by
+all the games of a world, so a lookup is a dictionary access. When the exits
+of a game change (`Game.set_exit`), `with_exit` returns an updated copy: a
+new or cheaper exit is relaxed into the existing rows, and only the rows
+whose paths may use a removed exit are computed again.
+
+Example:
+    >>> import worlds
+    >>> table = for_world(worlds.crime_a_montfleur())
+    >>> table.route("Maison du crime", "Commissariat")
+    ('O', 3)
+    >>> table.path("Maison du crime", "Labo du commissariat")
+    ['O', 'O', 'N', 'O']
+    >>> table.route("Maison du crime", "Grenier")
+    ('U', 0)
+"""
+
+import heapq
+import weakref
+
+from actions import FREE_ROOMS
+
+INFINITY = float("inf")
+
+
+def step_cost(old_room_name, new_room_name):
+    """Return the displacement cost of a move (see `Actions.go`)."""
+    if old_room_name in FREE_ROOMS or new_room_name in FREE_ROOMS:
+        return 0
+    return 1
+
+
+class RouteTable:
+    """
+    Cheapest paths between the rooms of a world.
+
+    Attributes:
+        names (tuple): the name of each room index.
+        index (dict): the index of each room name.
+        folded (dict): the room name of each lowercase name (the first room
+            when several names differ only by case).
+        exits (list): for each room, the (direction, room index) pairs.
+        rows (dict): for each computed source index, a tuple
+            (costs, hops, first directions) of lists indexed by target.
+    """
+
+    def __init__(self, names, exits):
+        self.names = tuple(names)
+        self.index = {name: i for i, name in enumerate(self.names)}
+        self.folded = {}
+        for name in self.names:
+            self.folded.setdefault(name.lower(), name)
+        self.exits = [list(room_exits) for room_exits in exits]
+        self.rows = {}
+
+    @classmethod
+    def from_world(cls, world):
+        """Build the table of a `WorldTemplate`."""
+        return cls((name for name, _ in world.rooms), world.exits)
+
+    @classmethod
+    def from_rooms(cls, rooms):
+        """Build the table of a list of `Room` objects."""
+        index = {id(room): i for i, room in enumerate(rooms)}
+        exits = [[(direction, index[id(target)]) for direction, target in room.exits.items()
+                  if target is not None and id(target) in index]
+                 for room in rooms]
+        return cls((room.name for room in rooms), exits)
+
+    def lookup(self, name):
+        """
+        Return the room name matching a name given in any case.
+
+        Returns:
+            str: the room name, or None if there is no such room.
+        """
+        if name in self.index:
+            return name
+        return self.folded.get(name.lower())
+
+    def row(self, source):
+        """Return the row of a source index, computing it if needed."""
+        row = self.rows.get(source)
+        if row is None:
+            row = self.rows[source] = self.search(source)
+        return row
+
+    def search(self, source):
+        """
+        Compute the cheapest paths from one room (Dijkstra).
+
+        Returns:
+            tuple: (costs, hops, first directions), lists indexed by target.
+        """
+        size = len(self.names)
+        costs = [INFINITY] * size
+        hops = [0] * size
+        first = [None] * size
+        costs[source] = 0
+        queue = [(0, 0, source)]
+        while queue:
+            cost, hop, room = heapq.heappop(queue)
+            if (cost, hop) > (costs[room], hops[room]):
+                continue
+            for direction, target in self.exits[room]:
+                key = (cost + step_cost(self.names[room], self.names[target]), hop + 1)
+                if key < (costs[target], hops[target]):
+                    costs[target], hops[target] = key
+                    first[target] = first[room] if room != source else direction
+                    heapq.heappush(queue, (key[0], key[1], target))
+        return costs, hops, first
+
+    def precompute(self):
+        """Compute the rows of every source (all pairs)."""
+        for source in range(len(self.names)):
+            self.row(source)
+        return self
+
+    def route(self, source_name, target_name):
+        """
+        Return the first direction and the displacements of a cheapest path.
+
+        Returns:
+            tuple: (direction, displacements); the direction is None if the
+            target is reached, the cost is infinite if it is unreachable.
+        """
+        target = self.index[target_name]
+        costs, _, first = self.row(self.index[source_name])
+        return first[target], costs[target]
+
+    def distance(self, source_name, target_name):
+        """Return (displacements, moves) of a cheapest path."""
+        target = self.index[target_name]
+        costs, hops, _ = self.row(self.index[source_name])
+        return costs[target], hops[target]
+
+    def path(self, source_name, target_name):
+        """
+        Return the directions of a cheapest path.
+
+        Returns:
+            list: the directions to follow, or None if the target is unreachable.
+        """
+        source = self.index[source_name]
+        target = self.index[target_name]
+        if self.row(source)[0][target] == INFINITY:
+            return None
+        directions = []
+        while source != target:
+            direction = self.row(source)[2][target]
+            directions.append(direction)
+            source = next(room for name, room in self.exits[source] if name == direction)
+        return directions
+
+    def with_exit(self, room_name, direction, target_name):
+        """
+        Return a copy of the table where an exit has been changed.
+
+        Parameters:
+            room_name (str): the room of the exit.
+            direction (str): the direction of the exit.
+            target_name (str): the new destination, or None to remove the exit.
+
+        Returns:
+            RouteTable: the updated table (this table is left unchanged).
+        """
+        room = self.index[room_name]
+        table = RouteTable(self.names, self.exits)
+        old = [target for name, target in self.exits[room] if name == direction]
+        table.exits[room] = [(name, target) for name, target in self.exits[room] if name != direction]
+        new = self.index[target_name] if target_name is not None else None
+        if new is not None:
+            table.exits[room].append((direction, new))
+
+        # Rows whose paths may use the old exit are dropped, the others kept
+        for source, row in self.rows.items():
+            if old and self.uses_edge(row, room, old[0]):
+                continue
+            table.rows[source] = row
+        if new is not None:
+            table.relax(room, direction, new)
+        return table
+
+    def uses_edge(self, row, room, target):
+        """Return True if a cheapest path of a row may go through an edge."""
+        costs, hops, _ = row
+        if costs[room] == INFINITY:
+            return False
+        cost = step_cost(self.names[room], self.names[target])
+        return (costs[room] + cost, hops[room] + 1) == (costs[target], hops[target])
+
+    def relax(self, room, direction, new):
+        """Improve the computed rows with a new edge (room -> new)."""
+        cost = step_cost(self.names[room], self.names[new])
+        for source, (costs, hops, first) in list(self.rows.items()):
+            if costs[room] == INFINITY:
+                continue
+            head = direction if source == room else first[room]
+            via_costs, via_hops, _ = self.row(new)
+            costs, hops, first = list(costs), list(hops), list(first)
+            for target, via_cost in enumerate(via_costs):
+                key = (costs[room] + cost + via_cost, hops[room] + 1 + via_hops[target])
+                if key < (costs[target], hops[target]):
+                    costs[target], hops[target] = key
+                    first[target] = head
+            self.rows[source] = (costs, hops, first)
+
+
+# Route tables of the world templates, by template (dropped with it)
+_tables = weakref.WeakKeyDictionary()
+
+
+def for_world(world):
+    """
+    Return the route table of a world template, shared by all its games.
+
+    Returns:
+        RouteTable: the table, whose rows are computed on first use.
+    """
+    table = _tables.get(world)
+    if table is None:
+        table = _tables[world] = RouteTable.from_world(world)
+    return table
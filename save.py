@@ -0,0 +1,386 @@
+"""Compact binary save of a game.
+
+File `save.py`: `dump(game)` encodes the state of a game into a few hundred
+bytes and `load(data)` rebuilds a game ready to continue. Everything that
+the world template already holds (descriptions, dialogues, objectives,
+objects) is referenced by index, and the world itself by its template id
+(see `worlds.get_template`): only what changes during a game is written.
+
+Layout (little-endian), after the header `TBAS` + version:
+    seed, random state, status flags, displacements
+    template id, player name, accused (length-prefixed UTF-8)
+    player room, room history, player inventory
+    inventory of each room
+    room and message index of each NPC of the template
+    NPC tick, next move tick of each scheduled NPC (see `scheduler.py`)
+    state, completed objectives and counters of each quest, active quests,
+    counters of the quest manager
+    analyzed, collected, visited, flags and required bitsets
+    suspicions, clues, exits (only if changed with `Game.set_exit`)
+
+Counts, indexes, lengths, ticks and scores are variable-length integers
+(LEB128: 7 bits per byte, the high bit set on every byte but the last;
+signed values are zigzag-encoded), so they have no upper bound and small
+values take one byte. Objects of the template are written as their index
+plus one; objects created during the game (clues left by Durand) are
+written in full after a 0. Bitsets store the bits of the names of the
+template, which hold every name a game may use (see `bitset.py`).
+
+Example:
+    >>> from output import NullSink
+    >>> game = Game.create("Ana", out=NullSink(), seed=3)
+    >>> for command in ["go U", "take photos", "go D"]:
+    ...     game.process_command(command)
+    >>> copy = load(dump(game), NullSink())
+    >>> copy.player.current_room.name, sorted(copy.player.inventory), copy.rng.getstate() == game.rng.getstate()
+    ('Maison du crime', ['photos'], True)
+"""
+
+import struct
+import weakref
+
+import routes
+import worlds
+from game import Game
+from item import Item
+from output import NullSink, OutputSink
+
+MAGIC = b"TBAS"
+VERSION = 3
+
+HEADER = struct.Struct("<4sB")
+STATE = struct.Struct("<QQB")
+INLINE_ITEM = 0
+WEIGHT = struct.Struct("<d")
+# Longest variable-length integer accepted (70 bits)
+VARINT_MAX_BYTES = 10
+
+# Status flags
+FINISHED = 1
+LAW_ALLOWS = 2
+ACCUSED = 4
+EXITS = 8
+
+# Quest states
+ACTIVE = 1
+COMPLETED = 2
+
+
+class SaveError(ValueError):
+    """Raised when a saved game cannot be read."""
+
+
+# Index of each object of a template, by template (dropped with it)
+_item_indexes = weakref.WeakKeyDictionary()
+
+
+def item_indexes(template):
+    """Return the index of each shared object of a template, by object id."""
+    indexes = _item_indexes.get(template)
+    if indexes is None:
+        indexes = _item_indexes[template] = {id(item): i for i, (item, _) in enumerate(template.items)}
+    return indexes
+
+
+class Writer:
+    """Append binary fields to a buffer."""
+
+    def __init__(self):
+        self.parts = []
+
+    def uint(self, value):
+        """Write a non-negative integer as a varint."""
+        if value < 0:
+            raise SaveError(f"Entier négatif: {value}")
+        data = bytearray()
+        while value > 0x7F:
+            data.append(value & 0x7F | 0x80)
+            value >>= 7
+        data.append(value)
+        self.parts.append(bytes(data))
+
+    def sint(self, value):
+        """Write a signed integer as a zigzag varint."""
+        self.uint(value * 2 if value >= 0 else -value * 2 - 1)
+
+    def uints(self, values):
+        self.uint(len(values))
+        for value in values:
+            self.uint(value)
+
+    def text(self, value):
+        data = value.encode("utf-8")
+        self.uint(len(data))
+        self.parts.append(data)
+
+    def bits(self, bitset):
+        data = bitset.bits.to_bytes((bitset.bits.bit_length() + 7) // 8, "little")
+        self.uint(len(data))
+        self.parts.append(data)
+
+    def items(self, inventory, indexes):
+        self.uint(len(inventory))
+        for item in inventory.values():
+            index = indexes.get(id(item))
+            if index is None:
+                self.uint(INLINE_ITEM)
+                self.text(item.name)
+                self.text(item.description)
+                self.parts.append(WEIGHT.pack(item.weight))
+            else:
+                self.uint(index + 1)
+
+    def getvalue(self):
+        return b"".join(self.parts)
+
+
+class Reader:
+    """Read binary fields from a buffer."""
+
+    def __init__(self, data):
+        self.data = memoryview(data)
+        self.offset = 0
+
+    def unpack(self, layout):
+        values = layout.unpack_from(self.data, self.offset)
+        self.offset += layout.size
+        return values
+
+    def uint(self):
+        value = 0
+        for shift in range(0, 7 * VARINT_MAX_BYTES, 7):
+            if self.offset >= len(self.data):
+                raise SaveError("Sauvegarde tronquée")
+            byte = self.data[self.offset]
+            self.offset += 1
+            value |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                return value
+        raise SaveError("Sauvegarde corrompue: entier trop long")
+
+    def sint(self):
+        value = self.uint()
+        return value >> 1 if value & 1 == 0 else -(value >> 1) - 1
+
+    def uints(self):
+        return [self.uint() for _ in range(self.uint())]
+
+    def chunk(self, size):
+        end = self.offset + size
+        if end > len(self.data):
+            raise SaveError("Sauvegarde tronquée")
+        value = self.data[self.offset:end]
+        self.offset = end
+        return value
+
+    def text(self):
+        return str(self.chunk(self.uint()), "utf-8")
+
+    def bits(self, bitset):
+        bits = int.from_bytes(self.chunk(self.uint()), "little")
+        if bits >> len(bitset.interner.names):
+            raise SaveError("Sauvegarde corrompue: nom inconnu du monde")
+        bitset.bits = bits
+
+    def items(self, template):
+        inventory = {}
+        for _ in range(self.uint()):
+            index = self.uint()
+            if index == INLINE_ITEM:
+                name = self.text()
+                description = self.text()
+                item = Item(name, description, self.unpack(WEIGHT)[0])
+            else:
+                item = template.items[index - 1][0]
+            inventory[item.name] = item
+        return inventory
+
+
+def dump(game):
+    """
+    Encode the state of a game.
+
+    Parameters:
+        game (Game): a game built from a registered `WorldTemplate`.
+
+    Returns:
+        bytes: the saved game.
+    """
+    template = game.world
+    if getattr(template, "id", None) is None:
+        raise SaveError("Seuls les mondes enregistrés peuvent être sauvegardés")
+    indexes = item_indexes(template)
+    room_index = {id(room): i for i, room in enumerate(game.rooms)}
+    player = game.player
+    exits_changed = game.routes is not routes.for_world(template)
+    status = ((FINISHED if game.finished else 0) | (LAW_ALLOWS if game.law_allows_durand_commissariat else 0)
+              | (ACCUSED if game.accused is not None else 0) | (EXITS if exits_changed else 0))
+
+    out = Writer()
+    out.parts.append(HEADER.pack(MAGIC, VERSION))
+    out.parts.append(STATE.pack(game.seed, game.rng.getstate(), status))
+    out.uint(game.displacement_count)
+    out.text(template.id)
+    out.text(player.name)
+    if game.accused is not None:
+        out.text(game.accused)
+
+    out.uint(room_index[id(player.current_room)])
+    out.uints([room_index[id(room)] for room in player.history])
+    out.items(player.inventory, indexes)
+    for room in game.rooms:
+        out.items(room.inventory, indexes)
+
+    positions = {}
+    for i, room in enumerate(game.rooms):
+        for name, npc in room.characters.items():
+            positions[name] = (i, npc)
+    for name, *_ in template.characters:
+        i, npc = positions[name]
+        out.uint(i)
+        out.uint(npc._msg_index)
+    out.uint(game.tick)
+    entries = game.scheduler.entries()
+    out.uint(len(entries))
+    for tick, index in entries:
+        out.uint(tick)
+        out.uint(index)
+
+    manager = game.quest_manager
+    for quest in manager.quests:
+        out.uint((ACTIVE if quest.is_active else 0) | (COMPLETED if quest.is_completed else 0))
+        out.uints([quest.objectives.index(objective) for objective in quest.completed_objectives])
+        counters(out, quest.counters)
+    quest_index = {id(quest): i for i, quest in enumerate(manager.quests)}
+    out.uints([quest_index[id(quest)] for quest in manager.active_quests])
+    counters(out, manager.counters)
+
+    for bitset in (game.analyzed_items, game.collected_items, game.visited_crime_scene_rooms,
+                   game.flags, game.required_items):
+        out.bits(bitset)
+    counters(out, game.suspicions)
+    out.uint(len(game.clues))
+    for clue in game.clues:
+        out.text(clue)
+    if exits_changed:
+        for room in game.rooms:
+            out.uint(len(room.exits))
+            for direction, target in room.exits.items():
+                out.text(direction)
+                out.uint(room_index[id(target)])
+    return out.getvalue()
+
+
+def counters(out, values):
+    """Write a dict of integers by name."""
+    out.uint(len(values))
+    for name, value in values.items():
+        out.text(name)
+        out.sint(value)
+
+
+def read_counters(reader):
+    """Read a dict written by `counters`."""
+    values = {}
+    for _ in range(reader.uint()):
+        name = reader.text()
+        values[name] = reader.sint()
+    return values
+
+
+def load(data, out=None):
+    """
+    Rebuild a game from its saved state.
+
+    Parameters:
+        data (bytes): the output of `dump`.
+        out (OutputSink): the output sink of the game (default: buffered).
+
+    Returns:
+        Game: the game, ready to receive the next command.
+
+    Raises:
+        SaveError: if the data is not a saved game of this version, is
+            corrupted or references an unknown world.
+    """
+    reader = Reader(data)
+    try:
+        magic, version = reader.unpack(HEADER)
+    except struct.error:
+        raise SaveError("Sauvegarde tronquée") from None
+    if magic != MAGIC or version != VERSION:
+        raise SaveError("Format de sauvegarde inconnu")
+    try:
+        game = read_game(reader, out)
+    except (struct.error, IndexError, KeyError, UnicodeDecodeError) as error:
+        raise SaveError(f"Sauvegarde corrompue: {error}") from None
+    if reader.offset != len(reader.data):
+        raise SaveError("Sauvegarde corrompue: données en trop")
+    return game
+
+
+def read_game(reader, out):
+    seed, state, status = reader.unpack(STATE)
+    displacements = reader.uint()
+    template = worlds.get_template(reader.text())
+    player_name = reader.text()
+    # Built silently: the texts of the setup (quest activation) are not replayed
+    game = Game(template, NullSink(), seed)
+    game.setup(player_name)
+    game.set_output(out if out is not None else OutputSink())
+    game.rng.setstate(state)
+    game.displacement_count = displacements
+    game.finished = bool(status & FINISHED)
+    game.law_allows_durand_commissariat = bool(status & LAW_ALLOWS)
+    if status & ACCUSED:
+        game.accused = reader.text()
+
+    rooms = game.rooms
+    player = game.player
+    player.current_room = rooms[reader.uint()]
+    player.history = [rooms[i] for i in reader.uints()]
+    player.inventory = reader.items(template)
+    for room in rooms:
+        room.inventory = reader.items(template)
+
+    for name, _, start, *_ in template.characters:
+        npc = rooms[start].characters.pop(name)
+        room = rooms[reader.uint()]
+        npc._msg_index = reader.uint()
+        if npc._msg_index >= max(len(npc.msgs), 1):
+            raise SaveError("Sauvegarde corrompue: message inconnu")
+        npc.current_room = room
+        room.characters[name] = npc
+    game.tick = reader.uint()
+    game.scheduler.clear()
+    for _ in range(reader.uint()):
+        tick = reader.uint()
+        index = reader.uint()
+        if index >= len(game.mobile_characters):
+            raise SaveError("Sauvegarde corrompue: PNJ inconnu")
+        game.scheduler.schedule(tick, index)
+
+    manager = game.quest_manager
+    for quest in manager.quests:
+        quest_status = reader.uint()
+        quest.is_active = bool(quest_status & ACTIVE)
+        quest.is_completed = bool(quest_status & COMPLETED)
+        quest.completed_objectives = [quest.objectives[i] for i in reader.uints()]
+        quest.counters = read_counters(reader)
+    manager.active_quests = [manager.quests[i] for i in reader.uints()]
+    manager.counters = read_counters(reader)
+    manager.recount()
+
+    for bitset in (game.analyzed_items, game.collected_items, game.visited_crime_scene_rooms,
+                   game.flags, game.required_items):
+        reader.bits(bitset)
+    game.suspicions = read_counters(reader)
+    game.clues = [reader.text() for _ in range(reader.uint())]
+    if status & EXITS:
+        for room in rooms:
+            room.exits = {}
+            for _ in range(reader.uint()):
+                direction = reader.text()
+                room.exits[direction] = rooms[reader.uint()]
+        game.routes = routes.RouteTable.from_rooms(rooms)
+    return game
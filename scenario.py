@@ -0,0 +1,225 @@
+"""Scenario files.
+
+File `scenario.py`: a scenario is a JSON file describing a world (rooms,
+exits, objects, characters with their allowed rooms and whether they walk,
+quests and the rules of the game, see `scenarios/crime_a_montfleur.json`).
+`load` checks its structure, compiles it into a `WorldTemplate` (see
+`worlds.py`) and stores the compiled template in a cache file named after
+the hash of the scenario file, so the next starts skip the parsing and the
+checks as long as the file is unchanged. The cache files are pickles, and
+loading a pickle can run code: they are only read from a directory that
+belongs to the current user and that no one else can write to.
+
+Usage:
+    python scenario.py SCENARIO [SCENARIO ...]
+
+Checks and compiles each scenario, and prints a summary of it.
+
+Example:
+    >>> template = load(os.path.join(worlds.SCENARIO_DIR, "crime_a_montfleur.json"))
+    >>> template.id, template.rules["culprit"], len(template.rooms)
+    ('crime_a_montfleur', 'Durand', 13)
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import pickle
+import stat
+
+import worlds
+
+# Version of the compiled form: change it when `WorldTemplate` changes, so
+# that the old cache files are not used
+COMPILED_VERSION = 5
+
+# Directory of the compiled scenarios (default: next to the scenario files)
+CACHE_DIR = "__cache__"
+
+# Fields of a scenario: name -> (type, required)
+FIELDS = {
+    "name": (str, True),
+    "start": (str, True),
+    "rules": (dict, False),
+    "rooms": (list, True),
+    "items": (list, False),
+    "characters": (list, False),
+    "quests": (list, False),
+}
+ROOM_FIELDS = {"name": (str, True), "description": (str, True), "exits": (dict, False)}
+ITEM_FIELDS = {"name": (str, True), "description": (str, True), "weight": ((int, float), True),
+               "room": (str, True)}
+CHARACTER_FIELDS = {"name": (str, True), "description": (str, True), "room": (str, True),
+                    "msgs": (list, False), "allowed_rooms": (list, False), "mobile": (bool, False),
+                    "move_chance": ((int, float), False)}
+QUEST_FIELDS = {"title": (str, True), "description": (str, True), "objectives": (list, False),
+                "reward": (str, False), "active": (bool, False), "requires": (list, False),
+                "optional": (bool, False)}
+RULE_FIELDS = {"culprit": (str, False), "required_items": (list, False), "max_displacements": (int, False)}
+
+
+class ScenarioError(ValueError):
+    """Raised when a scenario file is invalid."""
+
+
+def check_fields(value, fields, where):
+    """Check the type of the fields of a JSON object and reject unknown ones."""
+    if not isinstance(value, dict):
+        raise ScenarioError(f"{where}: objet attendu")
+    for name, (kind, required) in fields.items():
+        if name not in value:
+            if required:
+                raise ScenarioError(f"{where}: champ manquant '{name}'")
+        elif not isinstance(value[name], kind) or isinstance(value[name], bool) and kind is not bool:
+            raise ScenarioError(f"{where}: type invalide pour '{name}'")
+    for name in value:
+        if name not in fields:
+            raise ScenarioError(f"{where}: champ inconnu '{name}'")
+
+
+def validate(spec):
+    """
+    Check the structure of a scenario.
+
+    The references between rooms, objects, characters and quests are checked
+    when the spec is compiled (`WorldTemplate.from_spec`).
+
+    Raises:
+        ScenarioError: if a field is missing, unknown or of the wrong type.
+    """
+    check_fields(spec, FIELDS, "scénario")
+    for room in spec["rooms"]:
+        check_fields(room, ROOM_FIELDS, "salle")
+        for direction, target in room.get("exits", {}).items():
+            if not isinstance(target, str):
+                raise ScenarioError(f"salle {room['name']}: sortie {direction} invalide")
+    for item in spec.get("items", []):
+        check_fields(item, ITEM_FIELDS, "objet")
+    for npc in spec.get("characters", []):
+        check_fields(npc, CHARACTER_FIELDS, "personnage")
+    for quest in spec.get("quests", []):
+        check_fields(quest, QUEST_FIELDS, "quête")
+    check_fields(spec.get("rules", {}), RULE_FIELDS, "règles")
+
+
+def compile_file(path, data):
+    """Parse, check and compile the content of a scenario file."""
+    template_id = os.path.splitext(os.path.basename(path))[0]
+    try:
+        spec = json.loads(data)
+        validate(spec)
+        return worlds.WorldTemplate.from_spec(spec, template_id)
+    except ScenarioError as error:
+        raise ScenarioError(f"{path}: {error}") from None
+    except ValueError as error:
+        # JSON syntax errors and invalid references
+        raise ScenarioError(f"{path}: {error}") from None
+
+
+def cache_path(path, data, cache_dir=None):
+    """Return the cache file of a scenario content."""
+    if cache_dir is None:
+        cache_dir = os.path.join(os.path.dirname(os.path.abspath(path)), CACHE_DIR)
+    digest = hashlib.blake2b(data, digest_size=16).hexdigest()
+    name = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(cache_dir, f"{name}-{COMPILED_VERSION}-{digest}.pickle")
+
+
+def private_directory(directory):
+    """
+    Create the cache directory if needed, and check that only the current
+    user can write to it.
+
+    A directory of the user with too wide permissions is restricted to the
+    user; a symbolic link or a directory of another user is refused.
+
+    Returns:
+        bool: True if the directory can hold the cache.
+    """
+    try:
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        status = os.lstat(directory)
+        if not stat.S_ISDIR(status.st_mode):
+            return False
+        if not hasattr(os, "getuid"):
+            # No owners to check (Windows)
+            return True
+        if status.st_uid != os.getuid():
+            return False
+        if status.st_mode & 0o077:
+            os.chmod(directory, 0o700)
+    except OSError:
+        return False
+    return True
+
+
+def read_cache(compiled):
+    """
+    Return the template of a cache file, or None if it is missing, is not
+    the user's own file or cannot be loaded (truncated, stale or corrupt).
+    """
+    try:
+        with open(compiled, "rb") as file:
+            if hasattr(os, "getuid") and os.fstat(file.fileno()).st_uid != os.getuid():
+                return None
+            template = pickle.load(file)
+    except Exception:
+        # Any error of a bad file: the scenario is compiled again
+        return None
+    return template if isinstance(template, worlds.WorldTemplate) else None
+
+
+def load(path, cache_dir=None, use_cache=True):
+    """
+    Load a scenario file, from its compiled cache when it is up to date.
+
+    Parameters:
+        path (str): the scenario file; its name without extension is the
+            id of the template.
+        cache_dir (str): the directory of the compiled files (default:
+            `__cache__` next to the scenario).
+        use_cache (bool): if False, always parse and compile the file.
+            The cache is also skipped when its directory is not private
+            to the user (see `private_directory`).
+
+    Returns:
+        WorldTemplate: the compiled world.
+
+    Raises:
+        ScenarioError: if the scenario is invalid.
+    """
+    with open(path, "rb") as file:
+        data = file.read()
+    if not use_cache:
+        return compile_file(path, data)
+    compiled = cache_path(path, data, cache_dir)
+    if not private_directory(os.path.dirname(compiled)):
+        return compile_file(path, data)
+    template = read_cache(compiled)
+    if template is not None:
+        return template
+    template = compile_file(path, data)
+    try:
+        temporary = f"{compiled}.{os.getpid()}.tmp"
+        with open(temporary, "wb") as file:
+            pickle.dump(template, file, pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary, compiled)
+    except OSError:
+        # Read-only directory: the scenario is compiled again next time
+        pass
+    return template
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vérifier et compiler des scénarios")
+    parser.add_argument("scenarios", nargs="+", help="fichiers de scénario (JSON)")
+    args = parser.parse_args()
+    for path in args.scenarios:
+        template = load(path)
+        print(f"{path}: {template.name}, {len(template.rooms)} salles, {len(template.items)} objets, "
+              f"{len(template.characters)} personnages, {len(template.quests)} quêtes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Scheduler of the NPC actions.
+
+File `scheduler.py`: instead of asking every NPC after each command whether
+it acts, each mobile NPC draws the tick of its next action and waits in a
+heap. A tick is one NPC update (one accepted command, see
+`Game.update_characters`); an update pops only the NPCs due at that tick,
+so idle NPCs cost nothing and the cost of a tick is proportional to the
+actions it runs (plus a logarithm of the number of waiting NPCs).
+
+An NPC acting with probability `p` at each tick waits a geometric number of
+ticks between two actions (`geometric_delay`): the times of its actions
+follow the same law as with one draw per tick, with one draw per action.
+
+Example:
+    >>> scheduler = Scheduler()
+    >>> scheduler.schedule(3, 1)
+    >>> scheduler.schedule(1, 0)
+    >>> scheduler.schedule(3, 0)
+    >>> scheduler.pop_due(2), scheduler.pop_due(3), len(scheduler)
+    ([0], [0, 1], 0)
+"""
+
+import heapq
+import math
+
+
+def geometric_delay(rng, chance):
+    """
+    Return the number of ticks until the next success of a trial of
+    probability `chance` made at each tick (at least 1).
+
+    Parameters:
+        rng (SessionRandom): the random generator of the game.
+        chance (float): the probability of success at each tick.
+
+    Returns:
+        int: the delay in ticks, or None if `chance` is not positive.
+
+    Example:
+        >>> from rng import SessionRandom
+        >>> rng = SessionRandom(1)
+        >>> geometric_delay(rng, 1.0), geometric_delay(rng, 0)
+        (1, None)
+        >>> delays = [geometric_delay(rng, 0.5) for _ in range(20000)]
+        >>> min(delays), round(sum(delays) / len(delays), 1)
+        (1, 2.0)
+    """
+    if chance <= 0:
+        return None
+    if chance >= 1:
+        return 1
+    # Inversion of the distribution function: P(delay > k) = (1 - chance) ** k
+    return 1 + int(math.log(1.0 - rng.random()) / math.log(1.0 - chance))
+
+
+class Scheduler:
+    """
+    Heap of the next action tick of each NPC.
+
+    NPCs are identified by their index in `Game.mobile_characters`; NPCs
+    due at the same tick act in the order of their index.
+
+    Attributes:
+        heap (list): (tick, NPC index) pairs, in heap order.
+    """
+
+    def __init__(self):
+        self.heap = []
+
+    def __len__(self):
+        return len(self.heap)
+
+    def schedule(self, tick, index):
+        """Plan the next action of an NPC."""
+        heapq.heappush(self.heap, (tick, index))
+
+    def pop_due(self, tick):
+        """Remove and return the indexes of the NPCs due at or before `tick`."""
+        heap = self.heap
+        due = []
+        while heap and heap[0][0] <= tick:
+            due.append(heapq.heappop(heap)[1])
+        return due
+
+    def entries(self):
+        """Return the planned (tick, NPC index) pairs, sorted."""
+        return sorted(self.heap)
+
+    def clear(self):
+        self.heap = []
@@ -0,0 +1,372 @@
+"""Multi-session game server.
+
+File `server.py`: an asyncio TCP server where one event loop hosts many
+games. The protocol is line based (UTF-8): the server asks for the player
+name, sends the introduction, then answers each command line with the text
+produced by `Game.process_command`, followed by the prompt "> ".
+
+A slow client cannot stall the loop: writes wait for the transport buffer
+to drain (backpressure) for at most `write_timeout` seconds, and a client
+that sends nothing during `idle_timeout` seconds is disconnected.
+
+With `--workers N`, the games are spread over N worker processes (see
+`shards.py`) instead of living in the server process.
+
+With `--journal DIR`, every command is written to a per-session journal
+(see `journal.py`) so that the games can be recovered after a crash: the
+journals left in DIR are recovered at startup.
+
+With `--park FILE`, only the games fitting in `--memory-budget` megabytes
+stay in memory; the least recently used ones are parked in a memory-mapped
+store (see `store.py`) and restored on their next command. The store is
+kept across restarts: the live games are parked when the server stops.
+
+When the games can outlive their connection (with `--journal` or
+`--park`), the introduction gives the player a resume code; a player who
+answers "reprendre CODE" instead of a name gets back to that game, after a
+disconnection or a restart of the server. A game is forgotten once
+finished.
+
+Usage:
+    python server.py [--host HOST] [--port PORT] [--idle-timeout SECONDS]
+                     [--workers N] [--journal DIR] [--snapshot-interval N]
+                     [--park FILE] [--memory-budget MB]
+"""
+
+import argparse
+import asyncio
+import logging
+import re
+import secrets
+
+import save
+from journal import JournalDirectory
+from output import OutputSink
+from session import GameSession
+from store import SessionCache, SessionStore, StoreError
+from shards import ShardPool, ShardedSessions
+
+PROMPT = "> "
+INTERNAL_ERROR = "\nErreur interne du serveur, la partie est interrompue.\n"
+# Answer to the name prompt to get back to a game
+RESUME = "reprendre"
+SESSION_ID = re.compile(r"[0-9a-f]{16}")
+
+logger = logging.getLogger(__name__)
+
+
+class LocalSessions:
+    """
+    Sessions hosted in the server process.
+
+    Attributes:
+        world (WorldTemplate): the world of the new games (None: default).
+        sessions (dict): the `GameSession` of each session id.
+        journals (JournalDirectory): the journals of the sessions (None: no journal).
+        cache (SessionCache): where the sessions live instead of `sessions`
+            when idle games are parked (None: every game stays in memory).
+        resumable (bool): True if a game outlives its connection (see `resume`).
+    """
+
+    def __init__(self, world=None, journals=None, cache=None):
+        self.world = world
+        self.sessions = {}
+        self.journals = journals
+        self.cache = cache
+        self.resumable = journals is not None or cache is not None
+
+    async def open(self, session_id, player_name):
+        """Create a game for the session and return its introduction."""
+        session = GameSession(player_name, self.world)
+        if self.cache is not None:
+            self.cache.add(session_id, session)
+        else:
+            self.sessions[session_id] = session
+        if self.journals is not None:
+            self.journals.attach(session_id, session.game)
+        return session.intro
+
+    async def send(self, session_id, command_string):
+        """Execute a command and return (output, finished)."""
+        if self.cache is not None:
+            session = self.cache.get(session_id)
+        else:
+            session = self.sessions[session_id]
+        result = session.send(command_string)
+        if result.finished and self.cache is not None:
+            # Forget the game now: when its client leaves, it would be loaded
+            # back from the store (evicting a live game) only to be dropped
+            self.cache.remove(session_id)
+            if self.journals is not None:
+                self.journals.detach(session.game)
+        return result.output, result.finished
+
+    async def resume(self, session_id):
+        """
+        Get back to the game of a session whose client left.
+
+        Returns:
+            str: the text shown to the player, or None if the session is unknown.
+        """
+        if self.cache is not None:
+            try:
+                return self.cache.get(session_id).resume()
+            except KeyError:
+                return None
+        session = self.sessions.get(session_id)
+        if session is None and self.journals is not None:
+            game = self.journals.resume(session_id, OutputSink())
+            if game is not None:
+                session = self.sessions[session_id] = GameSession.from_game(game)
+        return session.resume() if session is not None else None
+
+    async def close(self, session_id):
+        """
+        The client of the session left: forget its game if it is finished.
+
+        An unfinished game stays in the cache (parked when it is the least
+        recently used) or in its journal, to be resumed. A finished game has
+        already left the cache (see `send`).
+        """
+        if self.cache is not None:
+            return
+        session = self.sessions.pop(session_id, None)
+        if session is not None and self.journals is not None:
+            self.journals.detach(session.game)
+
+    def __len__(self):
+        return len(self.cache) if self.cache is not None else len(self.sessions)
+
+
+def parking_cache(path, memory_budget):
+    """
+    Return a cache of sessions parking the idle games in a store file.
+
+    The games parked by a previous server stay in the file, to be resumed
+    with their session id.
+
+    Parameters:
+        path (str): the store file.
+        memory_budget (int): the memory allowed for live games, in bytes.
+
+    Raises:
+        StoreError: if the file is not a store of this version.
+    """
+    return SessionCache(SessionStore(path), memory_budget,
+                        dump=lambda session: save.dump(session.game),
+                        load=lambda data: GameSession.from_game(save.load(data)))
+
+
+class GameServer:
+    """
+    Asyncio TCP server hosting one game per connection.
+
+    Attributes:
+        host (str): the address to listen on.
+        port (int): the port to listen on (0: any free port).
+        backend: where the games live (see `LocalSessions`).
+        idle_timeout (float): seconds without a command before disconnecting.
+        write_timeout (float): seconds a client may take to read our output.
+        max_line (int): the maximal length of a command line, in bytes.
+        max_sessions (int): the maximal number of connected clients.
+        backlog (int): the number of pending connections the system queues.
+    """
+
+    def __init__(self, host="127.0.0.1", port=8765, backend=None, idle_timeout=300.0,
+                 write_timeout=10.0, max_line=1024, max_sessions=10000, backlog=1024):
+        self.host = host
+        self.port = port
+        self.backend = backend if backend is not None else LocalSessions()
+        self.idle_timeout = idle_timeout
+        self.write_timeout = write_timeout
+        self.max_line = max_line
+        self.max_sessions = max_sessions
+        self.backlog = backlog
+        self.server = None
+        # Sessions with a connected client
+        self.connected = set()
+
+    async def start(self):
+        """Start listening. `port` is updated if it was 0."""
+        self.server = await asyncio.start_server(self.handle_client, self.host, self.port,
+                                                 limit=self.max_line, backlog=self.backlog)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self):
+        """Start listening and serve until cancelled."""
+        if self.server is None:
+            await self.start()
+        async with self.server:
+            await self.server.serve_forever()
+
+    async def close(self):
+        """Stop listening and wait for the server to close."""
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+
+    async def write(self, writer, text):
+        """
+        Send text to a client, waiting for its buffer to drain.
+
+        Raises:
+            asyncio.TimeoutError: if the client does not read in time.
+        """
+        writer.write(text.encode("utf-8"))
+        await asyncio.wait_for(writer.drain(), self.write_timeout)
+
+    async def read_line(self, reader):
+        """
+        Read one line from a client.
+
+        Returns:
+            str: the line without its end of line, or None if the client
+            left, was idle for too long or sent a line that is too long.
+        """
+        try:
+            data = await asyncio.wait_for(reader.readline(), self.idle_timeout)
+        except (asyncio.TimeoutError, ValueError, ConnectionError):
+            return None
+        if not data:
+            return None
+        return data.decode("utf-8", errors="replace").rstrip("\r\n")
+
+    async def attach(self, player_name):
+        """
+        Open the game asked by the answer to the name prompt.
+
+        Returns:
+            tuple: (session id, text to send), or (None, error message).
+        """
+        words = player_name.split()
+        if len(words) == 2 and words[0].lower() == RESUME and getattr(self.backend, "resumable", False):
+            session_id = words[1].lower()
+            if not SESSION_ID.fullmatch(session_id):
+                return None, "\nCode de reprise invalide.\n"
+            if session_id in self.connected:
+                return None, "\nCette partie est déjà jouée sur une autre connexion.\n"
+            self.connected.add(session_id)
+            try:
+                text = await self.backend.resume(session_id)
+            except BaseException:
+                self.connected.discard(session_id)
+                raise
+            if text is None:
+                self.connected.discard(session_id)
+                return None, "\nAucune partie à reprendre avec ce code.\n"
+            return session_id, text
+        session_id = secrets.token_hex(8)
+        self.connected.add(session_id)
+        try:
+            text = await self.backend.open(session_id, player_name)
+        except BaseException:
+            self.connected.discard(session_id)
+            raise
+        if getattr(self.backend, "resumable", False):
+            text += (f"\nCode de reprise de cette partie : {session_id}\n"
+                     f"(répondez '{RESUME} {session_id}' à la place de votre nom pour la continuer plus tard)\n")
+        return session_id, text
+
+    async def handle_client(self, reader, writer):
+        """Play one game with a connected client."""
+        session_id = None
+        try:
+            if len(self.connected) >= self.max_sessions:
+                await self.write(writer, "\nServeur complet, réessayez plus tard.\n")
+                return
+            await self.write(writer, "\nEntrez votre nom: ")
+            player_name = await self.read_line(reader)
+            if player_name is None:
+                return
+            session_id, text = await self.attach(player_name)
+            if session_id is None:
+                await self.write(writer, text)
+                return
+            await self.write(writer, text + PROMPT)
+            while True:
+                command_string = await self.read_line(reader)
+                if command_string is None:
+                    return
+                output, finished = await self.backend.send(session_id, command_string)
+                if finished:
+                    await self.write(writer, output)
+                    return
+                await self.write(writer, output + PROMPT)
+        except (asyncio.TimeoutError, ConnectionError):
+            pass
+        except Exception:
+            # A bug in a game or a backend ends this session only
+            logger.exception("Erreur de la session %s", session_id)
+            try:
+                await self.write(writer, INTERNAL_ERROR)
+            except (asyncio.TimeoutError, ConnectionError):
+                pass
+        finally:
+            if session_id is not None:
+                try:
+                    await self.backend.close(session_id)
+                except Exception:
+                    logger.exception("Erreur à la fermeture de la session %s", session_id)
+                self.connected.discard(session_id)
+            if writer.transport.get_write_buffer_size() > 0:
+                # The client stopped reading: drop the unsent output.
+                writer.transport.abort()
+            else:
+                writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serveur de Crime a Montfleur")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--idle-timeout", type=float, default=300.0)
+    parser.add_argument("--workers", type=int, default=0,
+                        help="nombre de processus de jeu (0: dans le serveur)")
+    parser.add_argument("--journal", help="répertoire des journaux de parties")
+    parser.add_argument("--snapshot-interval", type=int, default=100,
+                        help="nombre de commandes entre deux instantanés du journal")
+    parser.add_argument("--park", help="fichier où ranger les parties inactives")
+    parser.add_argument("--memory-budget", type=int, default=64,
+                        help="mémoire des parties actives avec --park, en Mo")
+    args = parser.parse_args()
+    logging.basicConfig(format="%(asctime)s %(levelname)s %(message)s")
+    if args.park and (args.journal or args.workers > 0):
+        parser.error("--park ne se combine ni avec --journal ni avec --workers")
+    pool = None
+    journal = (args.journal, args.snapshot_interval) if args.journal else None
+    if journal is not None:
+        resumable, failed = JournalDirectory(*journal).recover_all()
+        for path in failed:
+            logger.error("Journal irrécupérable, mis de côté: %s", path)
+        print(f"{len(resumable)} partie(s) récupérée(s) dans {args.journal}")
+    try:
+        cache = parking_cache(args.park, args.memory_budget * 1024 * 1024) if args.park else None
+    except StoreError as error:
+        parser.error(str(error))
+    if args.workers > 0:
+        pool = ShardPool(args.workers, journal=journal)
+        backend = ShardedSessions(pool)
+    else:
+        backend = LocalSessions(journals=JournalDirectory(*journal) if journal else None, cache=cache)
+    server = GameServer(args.host, args.port, backend, idle_timeout=args.idle_timeout)
+    print(f"Serveur démarré sur {args.host}:{args.port}")
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if pool is not None:
+            backend.shutdown()
+            pool.close()
+        if cache is not None:
+            for session_id in cache.park_all():
+                logger.error("Partie trop grande pour être rangée, perdue: %s", session_id)
+            cache.store.close()
+
+
+if __name__ == "__main__":
+    main()
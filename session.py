@@ -0,0 +1,143 @@
+"""Headless game sessions.
+
+File `session.py`: drive a game without a terminal. A `GameSession` is built
+from a player name and a world, receives command strings and returns the
+text the game produced for each of them, so that a server, a bot or a test
+can play without reading stdin.
+
+Example:
+    >>> session = GameSession("Sherlock")
+    >>> result = session.send("go O")
+    >>> "rue de Montfleur" in result.output
+    True
+    >>> result.finished
+    False
+"""
+
+from game import Game
+from output import OutputSink
+from replay import format_header
+
+
+class CommandResult:
+    """
+    Result of one command sent to a session.
+
+    Attributes:
+        output (str): the text produced by the command.
+        finished (bool): True if the game is over after the command.
+        won (bool): True if the player has won.
+        lost (bool): True if the player has lost.
+    """
+
+    def __init__(self, output, finished, won, lost):
+        self.output = output
+        self.finished = finished
+        self.won = won
+        self.lost = lost
+
+    def __repr__(self):
+        return f"CommandResult(finished={self.finished}, won={self.won}, lost={self.lost})"
+
+
+class GameSession:
+    """
+    A game played through command strings instead of the terminal.
+
+    The text of the game is collected by its output sink and returned once
+    per command. With a `NullSink`, no text is produced at all.
+
+    Attributes:
+        game (Game): the game being played.
+        intro (str): the text produced by the setup and the welcome message.
+        commands (list): the commands received, for the transcript.
+    """
+
+    def __init__(self, player_name, world=None, welcome=True, out=None, seed=None):
+        """
+        Create the game and set it up for the given player.
+
+        Parameters:
+            player_name (str): the name of the player.
+            world (WorldTemplate): the world (default: Crime a Montfleur).
+            welcome (bool): if True, the welcome message is part of `intro`.
+            out (OutputSink): the output sink (default: a new buffer).
+            seed (int): the seed of the NPC moves (default: random).
+        """
+        self.game = Game.create(player_name, world, out if out is not None else OutputSink(), seed)
+        self.commands = []
+        if welcome:
+            self.game.print_welcome()
+        self.intro = self.game.out.take()
+
+    @classmethod
+    def from_game(cls, game):
+        """
+        Wrap an existing game, for instance one restored by `save.load`.
+
+        Parameters:
+            game (Game): the game, with its output sink.
+
+        Returns:
+            GameSession: a session without introduction nor past commands.
+        """
+        session = cls.__new__(cls)
+        session.game = game
+        session.commands = []
+        session.intro = ""
+        return session
+
+    def resume(self):
+        """Return the text shown to a player coming back to the session."""
+        game = self.game
+        return (f"\nReprise de la partie de {game.player.name}"
+                f" ({game.displacement_count} déplacement(s)).\n"
+                + game.player.current_room.get_long_description())
+
+    def send(self, command_string):
+        """
+        Execute one command, then check the win and loose conditions.
+
+        Parameters:
+            command_string (str): the command typed by the player.
+
+        Returns:
+            CommandResult: the output of the command and the game status.
+        """
+        game = self.game
+        if not game.finished:
+            self.commands.append(command_string)
+            game.process_command(command_string)
+            game.check_end()
+        return CommandResult(game.out.take(), game.finished, game.win(), game.loose())
+
+    def send_all(self, command_strings):
+        """
+        Execute several commands, stopping when the game is over.
+
+        Parameters:
+            command_strings (iterable): the commands typed by the player.
+
+        Returns:
+            list: the `CommandResult` of each executed command.
+        """
+        results = []
+        for command_string in command_strings:
+            if self.game.finished:
+                break
+            results.append(self.send(command_string))
+        return results
+
+    def transcript(self, session_id="1"):
+        """
+        Return the transcript of the session (see `replay.py`).
+
+        Parameters:
+            session_id (str): the id written in the session header.
+
+        Returns:
+            str: the header, with the seed, followed by the commands.
+        """
+        lines = [format_header(session_id, self.game.player.name, self.game.seed)]
+        lines.extend(self.commands)
+        return "\n".join(lines) + "\n"
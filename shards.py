@@ -0,0 +1,330 @@
+"""Sessions sharded across worker processes.
+
+File `shards.py`: spread the games over a pool of worker processes so that
+command throughput scales with the number of cores. Each session is sticky:
+it always lives on the worker chosen by `ShardPool.worker_of(session_id)`.
+
+Requests are batched: all the requests for one worker issued during the
+same event loop iteration (or the same `execute` call) travel in a single
+message, and each worker answers with a single message.
+
+A request that fails in a worker is answered with an error, which the
+caller receives as a `ShardError`; the worker keeps serving its other
+sessions. If a worker process dies, the requests waiting for it fail with
+a `ShardError` as well.
+"""
+
+import asyncio
+import multiprocessing
+import queue
+import threading
+import traceback
+import zlib
+
+from journal import JournalDirectory
+from output import OutputSink
+from session import GameSession
+
+# Operations understood by the workers
+OPEN = 0
+SEND = 1
+CLOSE = 2
+RESUME = 3
+
+
+class ShardError(RuntimeError):
+    """Raised when a request fails in a worker or its worker is dead."""
+
+
+def run_worker(connection, world, journal=None):
+    """
+    Main loop of a worker process: execute batches of requests.
+
+    Each request is a tuple (request id, operation, session id, argument)
+    and is answered by (request id, ok, result); when `ok` is False, the
+    request raised and `result` is the traceback.
+
+    Parameters:
+        connection (Connection): the pipe to the parent process.
+        world (WorldTemplate): the world of the new games (None: default).
+        journal (tuple): (directory, snapshot interval) of the session
+            journals (None: no journal).
+    """
+    sessions = {}
+    journals = JournalDirectory(*journal) if journal is not None else None
+    while True:
+        batch = connection.recv()
+        if batch is None:
+            break
+        replies = []
+        for request_id, operation, session_id, argument in batch:
+            try:
+                result = execute_request(sessions, journals, world, operation, session_id, argument)
+            except Exception:
+                replies.append((request_id, False, traceback.format_exc()))
+            else:
+                replies.append((request_id, True, result))
+        connection.send(replies)
+    connection.close()
+
+
+def execute_request(sessions, journals, world, operation, session_id, argument):
+    """Execute one request in a worker and return its result."""
+    if operation == SEND:
+        session = sessions.get(session_id)
+        if session is None:
+            return "\nSession inconnue.\n", True
+        result = session.send(argument)
+        return result.output, result.finished
+    if operation == OPEN:
+        session = GameSession(argument, world)
+        sessions[session_id] = session
+        if journals is not None:
+            journals.attach(session_id, session.game)
+        return session.intro
+    if operation == RESUME:
+        session = sessions.get(session_id)
+        if session is None and journals is not None:
+            game = journals.resume(session_id, OutputSink())
+            if game is not None:
+                session = sessions[session_id] = GameSession.from_game(game)
+        return session.resume() if session is not None else None
+    session = sessions.pop(session_id, None)
+    if session is not None and journals is not None:
+        journals.detach(session.game)
+    return None
+
+
+class ShardPool:
+    """
+    A pool of worker processes, each hosting a share of the sessions.
+
+    Attributes:
+        workers (int): the number of worker processes.
+        journal (tuple): (directory, snapshot interval) of the session
+            journals (None: no journal).
+    """
+
+    def __init__(self, workers=None, world=None, journal=None):
+        """
+        Start the worker processes.
+
+        Parameters:
+            workers (int): the number of workers (default: number of cores).
+            world (WorldTemplate): the world of the new games (None: default).
+            journal (tuple): (directory, snapshot interval) of the session
+                journals (None: no journal).
+        """
+        self.workers = workers or multiprocessing.cpu_count()
+        self.journal = journal
+        self.connections = []
+        self.processes = []
+        for _ in range(self.workers):
+            parent_end, child_end = multiprocessing.Pipe()
+            process = multiprocessing.Process(target=run_worker, args=(child_end, world, journal), daemon=True)
+            process.start()
+            child_end.close()
+            self.connections.append(parent_end)
+            self.processes.append(process)
+        self._next_request = 0
+
+    def worker_of(self, session_id):
+        """Return the index of the worker hosting the session."""
+        return zlib.crc32(str(session_id).encode("utf-8")) % self.workers
+
+    def request(self, operation, session_id, argument=None):
+        """
+        Build a request for `execute`.
+
+        Returns:
+            tuple: (worker index, request).
+        """
+        self._next_request += 1
+        return self.worker_of(session_id), (self._next_request, operation, session_id, argument)
+
+    def execute(self, requests):
+        """
+        Execute requests on the workers in parallel and wait for them.
+
+        Parameters:
+            requests (list): the (worker index, request) pairs from `request`.
+
+        Returns:
+            list: the results, in the order of the requests.
+
+        Raises:
+            ShardError: if a request failed in its worker.
+        """
+        batches = [[] for _ in range(self.workers)]
+        for worker, request in requests:
+            batches[worker].append(request)
+        for worker, batch in enumerate(batches):
+            if batch:
+                self.connections[worker].send(batch)
+        results = {}
+        for worker, batch in enumerate(batches):
+            if batch:
+                try:
+                    replies = self.connections[worker].recv()
+                except (EOFError, OSError):
+                    raise ShardError(f"Processus de jeu {worker} arrêté") from None
+                for request_id, ok, result in replies:
+                    results[request_id] = (ok, result)
+        for _, request in requests:
+            ok, result = results[request[0]]
+            if not ok:
+                raise ShardError(result)
+        return [results[request[0]][1] for _, request in requests]
+
+    def close(self):
+        """Stop the workers."""
+        for connection in self.connections:
+            try:
+                connection.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+        for process in self.processes:
+            process.join(timeout=5)
+        for connection in self.connections:
+            connection.close()
+
+
+class ShardedSessions:
+    """
+    Server backend hosting the sessions on a `ShardPool` (see `server.py`).
+
+    Requests issued during one event loop iteration are sent to each worker
+    as a single batch; replies are read when the worker pipe is readable.
+    The batches are written to the pipes by one sender thread per worker,
+    so the event loop never blocks on a full pipe (a worker busy writing a
+    large reply could otherwise wait for the loop while the loop waits for
+    it).
+    """
+
+    def __init__(self, pool):
+        self.pool = pool
+        self.count = 0
+        # The journals keep the unfinished games of the clients who left
+        self.resumable = pool.journal is not None
+        self._pending = [[] for _ in range(pool.workers)]
+        # Future and worker of each request waiting for its reply
+        self._futures = {}
+        self._dead = set()
+        self._flush_scheduled = False
+        self._loop = None
+        self._outboxes = []
+        self._senders = []
+
+    def _attach(self):
+        """Watch the worker pipes from the running event loop and start the senders."""
+        self._loop = asyncio.get_running_loop()
+        for worker, connection in enumerate(self.pool.connections):
+            self._loop.add_reader(connection.fileno(), self._receive, worker)
+            outbox = queue.SimpleQueue()
+            sender = threading.Thread(target=self._send_batches, args=(worker, outbox), daemon=True)
+            sender.start()
+            self._outboxes.append(outbox)
+            self._senders.append(sender)
+
+    def _send_batches(self, worker, outbox):
+        """Sender thread of a worker: write its batches to its pipe."""
+        connection = self.pool.connections[worker]
+        while True:
+            batch = outbox.get()
+            if batch is None:
+                return
+            try:
+                connection.send(batch)
+            except (OSError, ValueError):
+                self._loop.call_soon_threadsafe(self._fail_worker, worker)
+                return
+
+    def _receive(self, worker):
+        """Resolve the futures answered by a worker."""
+        try:
+            replies = self.pool.connections[worker].recv()
+        except (EOFError, OSError):
+            self._fail_worker(worker)
+            return
+        for request_id, ok, result in replies:
+            future, _ = self._futures.pop(request_id)
+            if future.done():
+                continue
+            if ok:
+                future.set_result(result)
+            else:
+                future.set_exception(ShardError(result))
+
+    def _fail_worker(self, worker):
+        """Fail the requests of a dead worker and stop watching it."""
+        if worker in self._dead:
+            return
+        self._dead.add(worker)
+        self._loop.remove_reader(self.pool.connections[worker].fileno())
+        self._pending[worker] = []
+        for request_id, (future, owner) in list(self._futures.items()):
+            if owner == worker:
+                del self._futures[request_id]
+                if not future.done():
+                    future.set_exception(ShardError(f"Processus de jeu {worker} arrêté"))
+
+    def _flush(self):
+        """Hand the pending batch of each worker to its sender thread."""
+        self._flush_scheduled = False
+        for worker, batch in enumerate(self._pending):
+            if batch:
+                self._outboxes[worker].put(batch)
+                self._pending[worker] = []
+
+    def _submit(self, operation, session_id, argument=None):
+        if self._loop is None:
+            self._attach()
+        worker, request = self.pool.request(operation, session_id, argument)
+        future = self._loop.create_future()
+        if worker in self._dead:
+            future.set_exception(ShardError(f"Processus de jeu {worker} arrêté"))
+            return future
+        self._futures[request[0]] = (future, worker)
+        self._pending[worker].append(request)
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            self._loop.call_soon(self._flush)
+        return future
+
+    def shutdown(self):
+        """Stop the sender threads and stop watching the worker pipes."""
+        if self._loop is None:
+            return
+        for worker, outbox in enumerate(self._outboxes):
+            outbox.put(None)
+            if worker not in self._dead:
+                self._loop.remove_reader(self.pool.connections[worker].fileno())
+        for sender in self._senders:
+            sender.join()
+        self._loop = None
+        self._outboxes = []
+        self._senders = []
+
+    async def open(self, session_id, player_name):
+        """Create a game for the session and return its introduction."""
+        self.count += 1
+        return await self._submit(OPEN, session_id, player_name)
+
+    async def resume(self, session_id):
+        """Get back to the game of a session; returns its text, or None if unknown."""
+        text = await self._submit(RESUME, session_id)
+        if text is not None:
+            self.count += 1
+        return text
+
+    async def send(self, session_id, command_string):
+        """Execute a command and return (output, finished)."""
+        return await self._submit(SEND, session_id, command_string)
+
+    async def close(self, session_id):
+        """The client of the session left: forget its game, keeping its journal if unfinished."""
+        self.count -= 1
+        await self._submit(CLOSE, session_id)
+
+    def __len__(self):
+        return self.count
@@ -0,0 +1,327 @@
+"""Monte Carlo playthrough simulator.
+
+File `simulate.py`: play many headless games with a scripted or
+policy-driven player and report aggregate statistics (win rate,
+displacement distribution, quest completion timing) instead of transcripts.
+Games are spread over worker processes; game number i uses the seed
+`seed + i`, so a run is reproducible whatever the number of workers.
+
+Usage:
+    python simulate.py [--games N] [--workers N] [--seed N]
+                       [--policy investigator|script] [--script FILE]
+                       [--no-durand] [--morgue] [--json]
+"""
+
+import argparse
+import json
+import multiprocessing
+import time
+from collections import Counter
+
+from game import Game
+from output import NullSink
+
+# Safety net against policies that never finish a game
+MAX_COMMANDS = 400
+
+
+def find_item(game, item_name):
+    """Return the room holding an item, or None."""
+    for room in game.rooms:
+        if item_name in room.inventory:
+            return room
+    return None
+
+
+def find_room(game, room_name):
+    """Return the room with the given name, or None."""
+    for room in game.rooms:
+        if room.name == room_name:
+            return room
+    return None
+
+
+def find_character(game, name):
+    """Return the room of an NPC, or None."""
+    for room in game.rooms:
+        if name in room.characters:
+            return room
+    return None
+
+
+class ScriptedPolicy:
+    """Play a fixed list of commands."""
+
+    def __init__(self, commands):
+        self.commands = list(commands)
+        self.index = 0
+
+    def __call__(self, game):
+        if self.index >= len(self.commands):
+            return None
+        self.index += 1
+        return self.commands[self.index - 1]
+
+
+class InvestigatorPolicy:
+    """
+    Play like a methodical investigator.
+
+    Collects the nearest missing evidence first, optionally chases Durand
+    to interrogate him and visits the morgue, then analyzes everything at
+    the lab, talks to the Chimiste and accuses Durand at the Commissariat.
+    """
+
+    def __init__(self, interrogate_durand=True, visit_morgue=False):
+        self.interrogate_durand = interrogate_durand
+        self.visit_morgue = visit_morgue
+        self.durand_interrogated = False
+        self.morgue_visited = False
+        self.chimiste_consulted = False
+
+    def go_to(self, game, room):
+        """Return the command moving one step towards a room."""
+        direction = game.routes.route(game.player.current_room.name, room.name)[0]
+        return f"go {direction}" if direction else None
+
+    def __call__(self, game):
+        player = game.player
+        here = player.current_room
+
+        # 1. Collect the missing evidence, nearest first
+        missing = [name for name in sorted(game.required_items)
+                   if name not in player.inventory and name not in game.analyzed_items]
+        if missing:
+            if any(name in here.inventory for name in missing):
+                return "take " + next(name for name in missing if name in here.inventory)
+            rooms = [room for room in (find_item(game, name) for name in missing) if room is not None]
+            if rooms:
+                nearest = min(rooms, key=lambda room: game.routes.route(here.name, room.name)[1])
+                return self.go_to(game, nearest)
+
+        # 2. Interrogate Durand, wherever he is
+        if self.interrogate_durand and not self.durand_interrogated:
+            if "Durand" in here.characters:
+                self.durand_interrogated = True
+                return "talk Durand"
+            return self.go_to(game, find_character(game, "Durand"))
+
+        # 3. Hear the medical examiner
+        if self.visit_morgue and not self.morgue_visited:
+            if "Médecin légiste" in here.characters:
+                self.morgue_visited = True
+                return "talk Médecin légiste"
+            return self.go_to(game, find_character(game, "Médecin légiste"))
+
+        # 4. Analyze everything at the lab
+        if game.analyzed_items != game.required_items or not self.chimiste_consulted:
+            if here.name != "Labo du commissariat":
+                return self.go_to(game, find_room(game, "Labo du commissariat"))
+            for name in sorted(game.required_items):
+                if name not in game.analyzed_items and name in player.inventory:
+                    return "analyze " + name
+            self.chimiste_consulted = True
+            return "talk Chimiste"
+
+        # 5. Accuse Durand
+        if here.name != "Commissariat":
+            return self.go_to(game, find_room(game, "Commissariat"))
+        return "accuse Durand"
+
+
+class Statistics:
+    """
+    Aggregate results of simulated games (can be merged across workers).
+
+    Attributes:
+        games (int): the number of games played.
+        wins (int): the number of games won.
+        losses (int): the number of games lost.
+        displacements (Counter): the number of games per final displacement count.
+        commands (int): the total number of commands played.
+        quests (dict): for each quest title, [games where it was completed,
+            total commands at completion, total displacements at completion].
+    """
+
+    def __init__(self):
+        self.games = 0
+        self.wins = 0
+        self.losses = 0
+        self.displacements = Counter()
+        self.commands = 0
+        self.quests = {}
+
+    def merge(self, other):
+        """Add the results of another `Statistics`."""
+        self.games += other.games
+        self.wins += other.wins
+        self.losses += other.losses
+        self.displacements.update(other.displacements)
+        self.commands += other.commands
+        for title, values in other.quests.items():
+            totals = self.quests.setdefault(title, [0, 0, 0])
+            for index, value in enumerate(values):
+                totals[index] += value
+
+    def percentile(self, fraction):
+        """Return a percentile of the final displacement counts."""
+        rank = fraction * (self.games - 1)
+        seen = 0
+        for value in sorted(self.displacements):
+            seen += self.displacements[value]
+            if seen > rank:
+                return value
+        return None
+
+    def to_dict(self):
+        """Return the statistics as a dictionary (JSON serializable)."""
+        games = max(self.games, 1)
+        return {
+            "games": self.games,
+            "win_rate": self.wins / games,
+            "loss_rate": self.losses / games,
+            "mean_commands": self.commands / games,
+            "displacements": {
+                "mean": sum(value * count for value, count in self.displacements.items()) / games,
+                "p50": self.percentile(0.5),
+                "p90": self.percentile(0.9),
+                "p99": self.percentile(0.99),
+                "max": max(self.displacements) if self.displacements else None,
+                "histogram": {str(value): self.displacements[value] for value in sorted(self.displacements)},
+            },
+            "quests": {
+                title: {
+                    "completion_rate": completed / games,
+                    "mean_command": total_commands / completed if completed else None,
+                    "mean_displacement": total_displacements / completed if completed else None,
+                }
+                for title, (completed, total_commands, total_displacements) in self.quests.items()
+            },
+        }
+
+
+def make_policy(name, options):
+    """Build a new policy from its name and options."""
+    if name == "script":
+        return ScriptedPolicy(options["commands"])
+    return InvestigatorPolicy(options.get("interrogate_durand", True), options.get("visit_morgue", False))
+
+
+def play(game, policy, stats):
+    """Play one game to the end and add its result to the statistics."""
+    quests = game.quest_manager.quests
+    pending = [quest for quest in quests if not quest.is_completed]
+    commands = 0
+    while not game.finished and commands < MAX_COMMANDS:
+        command_string = policy(game)
+        if command_string is None:
+            break
+        game.process_command(command_string)
+        game.check_end()
+        commands += 1
+        for quest in pending:
+            if quest.is_completed:
+                totals = stats.quests.setdefault(quest.title, [0, 0, 0])
+                totals[0] += 1
+                totals[1] += commands
+                totals[2] += game.displacement_count
+        pending = [quest for quest in pending if not quest.is_completed]
+    stats.games += 1
+    stats.commands += commands
+    stats.displacements[game.displacement_count] += 1
+    if game.win():
+        stats.wins += 1
+    elif game.loose():
+        stats.losses += 1
+
+
+def run_chunk(task):
+    """
+    Play a range of games (worker entry point).
+
+    Parameters:
+        task (tuple): (policy name, policy options, first seed, number of games).
+
+    Returns:
+        Statistics: the results of the games.
+    """
+    policy_name, options, first_seed, count = task
+    stats = Statistics()
+    out = NullSink()
+    for seed in range(first_seed, first_seed + count):
+        game = Game.create("simulation", out=out, seed=seed)
+        play(game, make_policy(policy_name, options), stats)
+    return stats
+
+
+def simulate(games, policy_name="investigator", options=None, seed=0, workers=None, chunk=1000):
+    """
+    Play many games in parallel and aggregate their results.
+
+    Parameters:
+        games (int): the number of games.
+        policy_name (str): "investigator" or "script".
+        options (dict): the options of the policy.
+        seed (int): the seed of the first game.
+        workers (int): the number of processes (default: number of cores).
+        chunk (int): the number of games per task.
+
+    Returns:
+        Statistics: the aggregated results.
+    """
+    options = options or {}
+    tasks = [(policy_name, options, seed + start, min(chunk, games - start))
+             for start in range(0, games, chunk)]
+    stats = Statistics()
+    workers = workers or multiprocessing.cpu_count()
+    if workers == 1:
+        for task in tasks:
+            stats.merge(run_chunk(task))
+        return stats
+    with multiprocessing.Pool(workers) as pool:
+        for partial in pool.imap_unordered(run_chunk, tasks):
+            stats.merge(partial)
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulateur de parties (Monte Carlo)")
+    parser.add_argument("--games", type=int, default=10000)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--policy", choices=["investigator", "script"], default="investigator")
+    parser.add_argument("--script", help="fichier de commandes pour la politique 'script'")
+    parser.add_argument("--no-durand", action="store_true", help="ne pas interroger Durand")
+    parser.add_argument("--morgue", action="store_true", help="passer par la morgue")
+    parser.add_argument("--json", action="store_true", help="sortie JSON")
+    args = parser.parse_args()
+
+    options = {"interrogate_durand": not args.no_durand, "visit_morgue": args.morgue}
+    if args.policy == "script":
+        if not args.script:
+            parser.error("--script est requis avec --policy script")
+        with open(args.script, encoding="utf-8") as script:
+            options = {"commands": [line.rstrip("\r\n") for line in script if line.strip()]}
+
+    start = time.perf_counter()
+    stats = simulate(args.games, args.policy, options, args.seed, args.workers)
+    elapsed = time.perf_counter() - start
+    report = stats.to_dict()
+    if args.json:
+        report["wall_time"] = elapsed
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+        return
+
+    displacements = report["displacements"]
+    print(f"{stats.games} parties en {elapsed:.2f} s ({stats.games / elapsed:.0f} parties/s)")
+    print(f"Victoires: {report['win_rate']:.2%}  Défaites: {report['loss_rate']:.2%}")
+    print(f"Déplacements: moyenne {displacements['mean']:.2f}, médiane {displacements['p50']}, "
+          f"p90 {displacements['p90']}, p99 {displacements['p99']}, max {displacements['max']}")
+    print("Quêtes terminées:")
+    for title, quest in report["quests"].items():
+        print(f"  {title}: {quest['completion_rate']:.2%} "
+              f"(commande {quest['mean_command']:.1f}, déplacement {quest['mean_displacement']:.1f})")
+
+
+if __name__ == "__main__":
+    main()
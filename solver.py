@@ -0,0 +1,258 @@
+"""Optimal solver.
+
+File `solver.py`: compute a winning plan with the fewest displacements
+(then the fewest commands) for a world, with an A* search.
+
+The win condition (`Game.win`) only looks at the analyzed items, the
+accusation and the displacement count, so the search state is projected on
+what can change them: the room of the player, the required items taken and
+the required items analyzed. The flags, quest progress, visited rooms and
+NPC positions are left out: they never enable nor forbid a move, a `take`,
+an `analyze` or the accusation (Durand is the only NPC that moves, and the
+Chimiste and the Policier stay in their rooms).
+
+Moves are macro-actions along the cheapest routes of `routes.py`: go to a
+room holding a missing item and take it, go to the lab and analyze every
+item carried, or go to the Commissariat and accuse. The heuristic is the
+cost of the longest detour still needed (item, then lab, then
+Commissariat), which never overestimates by the triangle inequality.
+
+Usage:
+    python solver.py [SCENARIO] [--seed N]
+
+Without SCENARIO, the plan is computed for Crime a Montfleur; otherwise the
+scenario file is loaded with `scenario.load`.
+
+Example:
+    >>> plan = solve()
+    >>> plan.displacements
+    7
+    >>> verify(plan.commands).win()
+    True
+"""
+
+import argparse
+import heapq
+import sys
+
+import scenario
+from game import Game
+from output import NullSink
+from routes import INFINITY
+
+LAB = "Labo du commissariat"
+LAB_NPC = "Chimiste"
+POLICE = "Commissariat"
+POLICE_NPC = "Policier"
+
+
+class Plan:
+    """
+    A winning sequence of commands.
+
+    Attributes:
+        commands (list): the commands to type.
+        displacements (int): the displacements of the plan.
+        expanded (int): the number of states expanded by the search.
+    """
+
+    def __init__(self, commands, displacements, expanded):
+        self.commands = commands
+        self.displacements = displacements
+        self.expanded = expanded
+
+    def __repr__(self):
+        return f"Plan({self.displacements} déplacements, {len(self.commands)} commandes)"
+
+
+class Solver:
+    """
+    A* search of the cheapest winning plan from the current state of a game.
+
+    Attributes:
+        game (Game): the game to solve (left unchanged).
+        routes (RouteTable): the cheapest routes of the game.
+        items (list): the names of the required items.
+        item_rooms (list): the room name of each item not carried yet.
+    """
+
+    def __init__(self, game):
+        self.game = game
+        self.routes = game.routes
+        self.items = sorted(game.required_items)
+        self.item_rooms = []
+        for name in self.items:
+            room = next((room.name for room in game.rooms if name in room.inventory), None)
+            self.item_rooms.append(room)
+
+    def start(self):
+        """Return the search state of the game: (room, taken mask, analyzed mask)."""
+        game = self.game
+        taken = analyzed = 0
+        for bit, name in enumerate(self.items):
+            if name in game.player.inventory:
+                taken |= 1 << bit
+            if name in game.analyzed_items:
+                analyzed |= 1 << bit
+                taken |= 1 << bit
+        return game.player.current_room.name, taken, analyzed
+
+    def cost(self, source, target):
+        return self.routes.distance(source, target)
+
+    def heuristic(self, state):
+        """Lower bound of the displacements left to win."""
+        room, taken, analyzed = state
+        full = (1 << len(self.items)) - 1
+        to_police = self.cost(LAB, POLICE)[0]
+        if taken != full:
+            return max(self.cost(room, self.item_rooms[bit])[0] + self.cost(self.item_rooms[bit], LAB)[0]
+                       for bit in range(len(self.items)) if not taken >> bit & 1) + to_police
+        if analyzed != full:
+            return self.cost(room, LAB)[0] + to_police
+        return self.cost(room, POLICE)[0]
+
+    def successors(self, state):
+        """
+        Yield the macro-actions of a state.
+
+        Yields:
+            tuple: (displacements, commands, next state, action), where the
+            action is (target room, commands to type there) or None for the goal.
+        """
+        room, taken, analyzed = state
+        full = (1 << len(self.items)) - 1
+        for bit, name in enumerate(self.items):
+            if not taken >> bit & 1:
+                target = self.item_rooms[bit]
+                displacements, moves = self.cost(room, target)
+                yield displacements, moves + 1, (target, taken | 1 << bit, analyzed), (target, [f"take {name}"])
+        if taken != analyzed:
+            displacements, moves = self.cost(room, LAB)
+            commands = [f"analyze {name}" for bit, name in enumerate(self.items) if (taken & ~analyzed) >> bit & 1]
+            yield displacements, moves + len(commands), (LAB, taken, taken), (LAB, commands)
+        if analyzed == full:
+            displacements, moves = self.cost(room, POLICE)
+            yield displacements, moves + 1, None, (POLICE, [f"accuse {self.game.culprit}"])
+
+    def solvable(self):
+        """Return an explanation if the game cannot be won, else None."""
+        names = self.routes.index
+        for room, npc in ((LAB, LAB_NPC), (POLICE, POLICE_NPC)):
+            if room not in names:
+                return f"salle manquante: {room}"
+            if not any(r.name == room and npc in r.characters for r in self.game.rooms):
+                return f"{npc} absent de: {room}"
+        start = self.start()
+        for bit, name in enumerate(self.items):
+            if not start[1] >> bit & 1 and self.item_rooms[bit] is None:
+                return f"objet introuvable: {name}"
+        return None
+
+    def solve(self):
+        """
+        Search the cheapest winning plan.
+
+        Returns:
+            Plan: the plan, or None if the game cannot be won (within the
+            displacement limit of its rules).
+        """
+        if self.solvable() is not None:
+            return None
+        limit = self.game.max_displacements
+        start = self.start()
+        best = {start: (0, 0)}
+        parents = {start: None}
+        queue = [(self.heuristic(start), 0, 0, 0, start)]
+        counter = 0
+        expanded = 0
+        while queue:
+            _, displacements, commands, _, state = heapq.heappop(queue)
+            if best[state] < (displacements, commands):
+                continue
+            if state is None:
+                return self.plan(parents, displacements, expanded)
+            expanded += 1
+            for cost, steps, next_state, action in self.successors(state):
+                key = (displacements + cost, commands + steps)
+                if key < best.get(next_state, (INFINITY, 0)):
+                    estimate = self.heuristic(next_state) if next_state is not None else 0
+                    # The heuristic never overestimates: this state cannot win in time
+                    if key[0] + estimate > limit:
+                        continue
+                    best[next_state] = key
+                    parents[next_state] = (state, action)
+                    counter += 1
+                    heapq.heappush(queue, (key[0] + estimate, key[0], key[1], counter, next_state))
+        return None
+
+    def plan(self, parents, displacements, expanded):
+        """Rebuild the commands of the plan ending at the goal."""
+        actions = []
+        state = None
+        while parents[state] is not None:
+            state, action = parents[state]
+            actions.append((state[0], action))
+        commands = []
+        for room, (target, typed) in reversed(actions):
+            commands.extend(f"go {direction}" for direction in self.routes.path(room, target))
+            commands.extend(typed)
+        return Plan(commands, displacements, expanded)
+
+
+def solve(world=None, seed=0):
+    """
+    Return the cheapest winning plan of a new game of a world.
+
+    Parameters:
+        world (WorldTemplate): the world (default: Crime a Montfleur).
+        seed (int): the seed of the game.
+
+    Returns:
+        Plan: the plan, or None if the world cannot be won.
+    """
+    return Solver(Game.create("solver", world, NullSink(), seed)).solve()
+
+
+def verify(commands, world=None, seed=0):
+    """Play commands in a new game and return the game."""
+    game = Game.create("solver", world, NullSink(), seed)
+    for command in commands:
+        if game.finished:
+            break
+        game.process_command(command)
+        game.check_end()
+    return game
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Plan gagnant optimal (A*)")
+    parser.add_argument("scenario", nargs="?", help="fichier de scénario (défaut: Crime a Montfleur)")
+    parser.add_argument("--seed", type=int, default=0, help="graine de la partie de vérification")
+    args = parser.parse_args()
+    world = None
+    if args.scenario:
+        try:
+            world = scenario.load(args.scenario)
+        except (OSError, scenario.ScenarioError) as error:
+            parser.error(str(error))
+    game = Game.create("solver", world, NullSink(), seed=args.seed)
+    solver = Solver(game)
+    reason = solver.solvable()
+    plan = solver.solve()
+    if plan is None:
+        reason = reason or f"aucun chemin en {game.max_displacements} déplacements ou moins"
+        print(f"Aucun plan gagnant: {reason}")
+        sys.exit(1)
+    print(f"Plan optimal: {plan.displacements} déplacements, {len(plan.commands)} commandes "
+          f"({plan.expanded} états explorés)")
+    for command in plan.commands:
+        print(f"  {command}")
+    won = verify(plan.commands, world, seed=args.seed).win()
+    print(f"Vérification: {'victoire' if won else 'ÉCHEC'}")
+    if not won:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,336 @@
+"""Memory-mapped store of parked sessions.
+
+File `store.py`: keep a very large number of idle games on disk instead of
+as Python objects. A `SessionStore` is a file of fixed-size slots mapped in
+memory (`mmap`); each slot holds the saved state of one game (see
+`save.py`), zlib-compressed when it does not fit as is. The slots form an
+open-addressing hash table on a digest of the session id, so finding a
+session reads one or a few slots and nothing has to be loaded at startup.
+When used and deleted slots fill three quarters of the table, it is rebuilt
+into a new file that replaces the old one: twice as large if it holds many
+sessions, the same size otherwise (only to drop the deleted slots).
+
+A `SessionCache` keeps the recently used games alive, in LRU order, within
+a memory budget: the least recently used games are parked in the store, and
+a parked game is rehydrated on its next use. A game is removed from memory
+only once the store holds it: a game too large for a slot stays alive,
+over the budget.
+
+File layout:
+    header: magic "TBAP", version, slot size, capacity, number of sessions,
+            number of deleted slots
+    slots:  digest of the session id (16 bytes), state, compressed flag,
+            payload length (2 bytes), payload
+
+Example:
+    >>> import os, tempfile
+    >>> path = os.path.join(tempfile.mkdtemp(), "parked.tba")
+    >>> store = SessionStore(path, capacity=8)
+    >>> store.put("42", b"state")
+    >>> store.get("42"), store.get("7"), len(store)
+    (b'state', None, 1)
+    >>> store.close()
+"""
+
+import hashlib
+import mmap
+import os
+import struct
+import zlib
+from collections import OrderedDict
+
+import save
+
+MAGIC = b"TBAP"
+VERSION = 1
+HEADER = struct.Struct("<4sBxxxIQQQ")
+COUNTS = struct.Struct("<QQ")
+SLOT_HEADER = struct.Struct("<16sBBH")
+
+# Slot states
+EMPTY = 0
+USED = 1
+DELETED = 2
+
+# Load limit (used and deleted slots) before rebuilding the table
+MAX_LOAD = 0.75
+
+# Memory retained by one live game, in bytes (see benchmarks/bench_world.py)
+GAME_MEMORY = 16 * 1024
+
+
+class StoreError(ValueError):
+    """Raised when a store file cannot be used or a state does not fit."""
+
+
+def digest(session_id):
+    """Return the 16-byte digest of a session id."""
+    return hashlib.blake2b(str(session_id).encode("utf-8"), digest_size=16).digest()
+
+
+class SessionStore:
+    """
+    Fixed-size slots of saved games in a memory-mapped file.
+
+    Attributes:
+        path (str): the store file.
+        slot_size (int): the size of one slot, in bytes.
+        capacity (int): the number of slots.
+        count (int): the number of stored sessions.
+        deleted (int): the number of deleted slots (not reused yet).
+    """
+
+    def __init__(self, path, capacity=1 << 16, slot_size=512):
+        """
+        Open a store file, creating it if needed.
+
+        Parameters:
+            path (str): the store file.
+            capacity (int): the initial number of slots of a new file.
+            slot_size (int): the slot size of a new file, in bytes.
+
+        Raises:
+            StoreError: if the file is not a store of this version.
+        """
+        self.path = path
+        self.map = None
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            self.create(path, capacity, slot_size)
+        self.open()
+
+    @staticmethod
+    def create(path, capacity, slot_size):
+        """Write an empty store file (sparse: free slots take no disk space)."""
+        if slot_size <= SLOT_HEADER.size:
+            raise StoreError(f"Taille d'emplacement trop petite: {slot_size}")
+        with open(path, "wb") as file:
+            file.write(HEADER.pack(MAGIC, VERSION, slot_size, capacity, 0, 0))
+            file.truncate(HEADER.size + capacity * slot_size)
+
+    def open(self):
+        self.file = open(self.path, "r+b")
+        self.map = mmap.mmap(self.file.fileno(), 0)
+        magic, version, self.slot_size, self.capacity, self.count, self.deleted = HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise StoreError(f"Fichier de sessions inconnu: {self.path}")
+        if len(self.map) < HEADER.size + self.capacity * self.slot_size:
+            self.close()
+            raise StoreError(f"Fichier de sessions tronqué: {self.path}")
+
+    def close(self):
+        """Unmap and close the file."""
+        if self.map is not None:
+            self.map.close()
+            self.file.close()
+            self.map = None
+
+    def flush(self):
+        """Force the mapped pages to the file."""
+        self.map.flush()
+
+    def __len__(self):
+        return self.count
+
+    def __contains__(self, session_id):
+        return self.find(digest(session_id))[1]
+
+    def offset(self, slot):
+        return HEADER.size + slot * self.slot_size
+
+    def set_counts(self, count, deleted):
+        self.count = count
+        self.deleted = deleted
+        COUNTS.pack_into(self.map, HEADER.size - COUNTS.size, count, deleted)
+
+    def find(self, key):
+        """
+        Find the slot of a digest (linear probing).
+
+        Returns:
+            tuple: (slot, found); when not found, the slot is the first free
+            one on the probe sequence, or -1 if the table has none.
+        """
+        capacity = self.capacity
+        slot = int.from_bytes(key[:8], "little") % capacity
+        free = -1
+        for _ in range(capacity):
+            stored, state, _, _ = SLOT_HEADER.unpack_from(self.map, self.offset(slot))
+            if state == EMPTY:
+                return (free if free >= 0 else slot), False
+            if state == USED and stored == key:
+                return slot, True
+            if state == DELETED and free < 0:
+                free = slot
+            slot = (slot + 1) % capacity
+        return free, False
+
+    def put(self, session_id, data):
+        """
+        Store the saved state of a session, replacing the previous one.
+
+        Raises:
+            StoreError: if the state does not fit in a slot, even compressed.
+        """
+        room = self.slot_size - SLOT_HEADER.size
+        compressed = 0
+        if len(data) > room:
+            data = zlib.compress(data, 6)
+            compressed = 1
+            if len(data) > room:
+                raise StoreError(f"État trop grand pour un emplacement ({len(data)} > {room} octets)")
+        key = digest(session_id)
+        slot, found = self.find(key)
+        if not found and (self.count + self.deleted + 1 > self.capacity * MAX_LOAD or slot < 0):
+            self.rebuild()
+            slot, found = self.find(key)
+        start = self.offset(slot)
+        reused = not found and self.map[start + 16] == DELETED
+        SLOT_HEADER.pack_into(self.map, start, key, USED, compressed, len(data))
+        self.map[start + SLOT_HEADER.size:start + SLOT_HEADER.size + len(data)] = data
+        if not found:
+            self.set_counts(self.count + 1, self.deleted - reused)
+
+    def get(self, session_id):
+        """Return the saved state of a session, or None."""
+        slot, found = self.find(digest(session_id))
+        if not found:
+            return None
+        start = self.offset(slot)
+        _, _, compressed, size = SLOT_HEADER.unpack_from(self.map, start)
+        data = self.map[start + SLOT_HEADER.size:start + SLOT_HEADER.size + size]
+        return zlib.decompress(data) if compressed else data
+
+    def delete(self, session_id):
+        """Remove a session. Returns True if it was stored."""
+        slot, found = self.find(digest(session_id))
+        if not found:
+            return False
+        self.map[self.offset(slot) + 16] = DELETED
+        self.set_counts(self.count - 1, self.deleted + 1)
+        return True
+
+    def rebuild(self):
+        """Rehash every session into a new file, doubling it if it is crowded."""
+        capacity = self.capacity * 2 if self.count + 1 > self.capacity * MAX_LOAD / 2 else self.capacity
+        temporary = self.path + ".grow"
+        self.create(temporary, capacity, self.slot_size)
+        bigger = SessionStore(temporary)
+        for slot in range(self.capacity):
+            start = self.offset(slot)
+            key, state, compressed, size = SLOT_HEADER.unpack_from(self.map, start)
+            if state != USED:
+                continue
+            target, _ = bigger.find(key)
+            end = start + SLOT_HEADER.size + size
+            target_start = bigger.offset(target)
+            bigger.map[target_start:target_start + end - start] = self.map[start:end]
+        bigger.set_counts(self.count, 0)
+        bigger.close()
+        self.close()
+        os.replace(temporary, self.path)
+        self.open()
+
+
+class SessionCache:
+    """
+    Live games in LRU order, within a memory budget; the others are parked.
+
+    Attributes:
+        store (SessionStore): where the parked games are kept.
+        capacity (int): the number of live games allowed by the budget.
+        live (OrderedDict): the live games, least recently used first.
+        dump (callable): encode a live game into bytes.
+        load (callable): rebuild a live game from bytes.
+    """
+
+    def __init__(self, store, memory_budget=64 * 1024 * 1024, game_memory=GAME_MEMORY, dump=None, load=None):
+        """
+        Parameters:
+            store (SessionStore): the store of the parked games.
+            memory_budget (int): the memory allowed for live games, in bytes.
+            game_memory (int): the memory of one live game, in bytes.
+            dump (callable): encoder of a live game (default: `save.dump`).
+            load (callable): decoder of a parked game (default: `save.load`).
+        """
+        self.store = store
+        self.capacity = max(1, memory_budget // game_memory)
+        self.live = OrderedDict()
+        self.dump = dump if dump is not None else save.dump
+        self.load = load if load is not None else save.load
+
+    def __len__(self):
+        return len(self.live) + len(self.store)
+
+    def __contains__(self, session_id):
+        return session_id in self.live or session_id in self.store
+
+    def add(self, session_id, game):
+        """Add a new live game, parking the least recently used ones if needed."""
+        self.live[session_id] = game
+        self.live.move_to_end(session_id)
+        self.evict()
+
+    def get(self, session_id):
+        """
+        Return a game, rehydrating it if it is parked.
+
+        Raises:
+            KeyError: if the session is unknown.
+        """
+        game = self.live.get(session_id)
+        if game is not None:
+            self.live.move_to_end(session_id)
+            return game
+        data = self.store.get(session_id)
+        if data is None:
+            raise KeyError(session_id)
+        game = self.load(data)
+        self.store.delete(session_id)
+        self.live[session_id] = game
+        self.evict()
+        return game
+
+    def remove(self, session_id):
+        """Forget a game, live or parked."""
+        if self.live.pop(session_id, None) is None:
+            self.store.delete(session_id)
+
+    def park(self, session_id):
+        """
+        Move a live game to the store.
+
+        Raises:
+            StoreError: if the game does not fit in a slot; it stays live.
+        """
+        self.store.put(session_id, self.dump(self.live[session_id]))
+        del self.live[session_id]
+
+    def evict(self):
+        """Park the least recently used games beyond the budget."""
+        # Each live game is tried at most once
+        for _ in range(len(self.live)):
+            if len(self.live) <= self.capacity:
+                return
+            session_id = next(iter(self.live))
+            try:
+                self.park(session_id)
+            except StoreError:
+                # Kept live, as the most recent game so as not to retry it at once
+                self.live.move_to_end(session_id)
+
+    def park_all(self):
+        """
+        Park every live game (before shutting down) and flush the store.
+
+        Returns:
+            list: the ids of the games that do not fit in a slot (still live).
+        """
+        failed = []
+        for session_id in list(self.live):
+            try:
+                self.park(session_id)
+            except StoreError:
+                failed.append(session_id)
+        self.store.flush()
+        return failed
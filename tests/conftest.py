@@ -0,0 +1,21 @@
+"""Shared fixtures of the tests (run with `python -m pytest` from the repository)."""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Shortest winning play of Crime a Montfleur (see solver.py)
+WINNING_COMMANDS = [
+    "take couteau", "go U", "take photos", "go D", "go D", "take coffre", "go U", "go E", "take arme",
+    "go O", "go O", "go N", "take clé", "go S", "go S", "take lettre", "go N", "go O", "go N", "go O",
+    "analyze couteau", "analyze photos", "analyze coffre", "analyze arme", "analyze clé", "analyze lettre",
+    "talk Chimiste", "go E", "accuse Durand",
+]
+
+
+@pytest.fixture
+def winning_commands():
+    return list(WINNING_COMMANDS)
@@ -0,0 +1,74 @@
+"""Tests of the vectorized NPC walks (batch.py), against the games."""
+
+import math
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+import worlds
+from batch import CLUE_ROOM, MOBILE_NPC, BatchWalk
+from game import Game
+from output import NullSink
+
+GAMES = 2000
+STEPS = 4
+
+# Durand walks freely between his house, the street and the police station
+SQUARE = {
+    "name": "Place", "start": "Rue",
+    "rooms": [
+        {"name": "Rue", "description": "une rue", "exits": {"N": "Maison", "E": CLUE_ROOM}},
+        {"name": "Maison", "description": "une maison", "exits": {"S": "Rue"}},
+        {"name": CLUE_ROOM, "description": "le commissariat", "exits": {"O": "Rue"}},
+    ],
+    "characters": [{"name": MOBILE_NPC, "description": "un voisin", "room": "Maison", "mobile": True}],
+    "rules": {"required_items": []},
+}
+
+
+def game_walks(world):
+    """
+    Play STEPS NPC updates in GAMES games.
+
+    Returns:
+        list: for each step, Durand's room in each game, the share of games
+        with a clue in the police station and the mean suspicion.
+    """
+    rooms = [[] for _ in range(STEPS)]
+    clues = [0] * STEPS
+    suspicions = [0] * STEPS
+    for seed in range(GAMES):
+        game = Game.create("test", world, NullSink(), seed=seed)
+        durand = next(npc for npc in game.mobile_characters if npc.name == MOBILE_NPC)
+        clue_room = next(room for room in game.rooms if room.name == CLUE_ROOM)
+        for step in range(STEPS):
+            game.update_characters()
+            rooms[step].append(durand.current_room.name)
+            clues[step] += "indice_durand_commissariat" in clue_room.inventory
+            suspicions[step] += game.suspicions.get(MOBILE_NPC, 0)
+    return [(rooms[step], clues[step] / GAMES, suspicions[step] / GAMES) for step in range(STEPS)]
+
+
+def close_shares(observed, expected):
+    """True if a share over GAMES games is within 4 standard deviations of `expected`."""
+    deviation = math.sqrt(expected * (1 - expected) / GAMES)
+    return abs(observed - expected) <= 4 * deviation + 0.005
+
+
+@pytest.mark.parametrize("world", [worlds.crime_a_montfleur(), worlds.WorldTemplate.from_spec(SQUARE, "place")],
+                         ids=["montfleur", "place"])
+def test_batch_walk_matches_the_games(world):
+    walk = BatchWalk(world, sessions=200000, seed=0)
+    for rooms, clue_share, suspicion in game_walks(world):
+        walk.step()
+        for name, share in walk.occupancy().items():
+            assert close_shares(rooms.count(name) / GAMES, share), (walk.steps, name)
+        assert close_shares(clue_share, walk.clue_dropped.mean()), walk.steps
+        assert abs(suspicion - walk.suspicions.mean()) <= 0.05, walk.steps
+
+
+def test_only_mobile_npcs_walk():
+    walk = BatchWalk(sessions=10, seed=0)
+    world = worlds.crime_a_montfleur()
+    assert walk.npc_names == [name for name, *_, mobile, _ in world.characters if mobile]
@@ -0,0 +1,72 @@
+"""Tests of the name bitsets (bitset.py) and of the interner of the worlds."""
+
+import pytest
+
+import worlds
+from bitset import BitSet, Interner, UnknownNameError
+from item import Item
+from session import GameSession
+
+
+def test_set_operations():
+    names = Interner(["a", "b", "c"])
+    left = BitSet(names, ["a", "b"])
+    right = BitSet(names, ["b", "c"])
+    assert left & right == {"b"}
+    assert left | right == {"a", "b", "c"}
+    assert left - right == {"a"}
+    assert BitSet(names, ["b"]) <= left
+    assert left.has_all(("a",)) and not left.equals(("a",))
+
+
+def test_closed_interner_rejects_unknown_names():
+    names = Interner(["a"], closed=True)
+    found = BitSet(names, ["a"])
+    with pytest.raises(UnknownNameError):
+        found.add("z")
+    # Reading never interns
+    assert "z" not in found
+    found.discard("z")
+    assert names.names == ["a"]
+
+
+def test_world_names_are_interned_at_compile_time():
+    names = worlds.crime_a_montfleur().names
+    assert names.closed
+    for name in worlds.FLAGS + worlds.CLUE_ITEMS:
+        assert name in names.bits
+    assert len(names.names) == names.base
+
+
+def test_games_do_not_grow_the_world_interner():
+    session = GameSession("Ana", seed=1)
+    names = session.game.names
+    before = list(names.names)
+    for name in ("clé", "coffre"):
+        session.game.player.inventory[name] = Item(name, "un objet", 1)
+    session.send("use clé on coffre")
+    assert "clé_utilisée" in session.game.flags
+    # The clues dropped by the NPCs can be analyzed
+    session.game.analyzed_items.update(worlds.CLUE_ITEMS)
+    assert names.names == before
+
+
+def test_montfleur_names_are_absent_from_other_worlds():
+    # A world without the crime scene of Montfleur: the quest checks of the
+    # actions ask for names it does not know
+    spec = {"name": "Gant", "start": "Hall",
+            "rooms": [{"name": "Hall", "description": "un hall", "exits": {"N": "Labo du commissariat"}},
+                      {"name": "Labo du commissariat", "description": "un labo", "exits": {"S": "Hall"}}],
+            "items": [{"name": "gant", "description": "un gant", "weight": 1, "room": "Hall"}],
+            "characters": [{"name": "Durand", "description": "un voisin", "room": "Hall"},
+                           {"name": "Chimiste", "description": "le chimiste", "room": "Labo du commissariat"}],
+            "rules": {"required_items": ["gant"]}}
+    session = GameSession("Ana", worlds.WorldTemplate.from_spec(spec, "gant"), seed=1)
+    outputs = [session.send(command).output for command in ["take gant", "go N", "analyze gant"]]
+    assert "Vous avez analysé: gant" in outputs[-1]
+    game = session.game
+    assert game.analyzed_items == {"gant"}
+    assert not game.analyzed_items.has_all(("gant", "photos"))
+    assert not game.analyzed_items.equals(("photos",))
+    game.accused = "Durand"
+    assert game.win()
@@ -0,0 +1,48 @@
+"""Tests of the procedural city generator (citygen.py)."""
+
+import collections
+
+import pytest
+
+import citygen
+import matcher
+import worlds
+from game import Game
+from output import NullSink
+
+
+def test_same_seed_same_city():
+    assert citygen.generate(500, seed=4) == citygen.generate(500, seed=4)
+    assert citygen.generate(500, seed=4) != citygen.generate(500, seed=5)
+    with pytest.raises(ValueError, match="Ville trop petite"):
+        citygen.generate(9)
+
+
+@pytest.mark.parametrize("rooms", [10, 97, 1000])
+def test_every_room_is_reachable_from_the_start(rooms):
+    template = worlds.WorldTemplate.from_spec(citygen.generate(rooms, seed=2))
+    reached = {template.start}
+    queue = collections.deque([template.start])
+    while queue:
+        for _, target in template.exits[queue.popleft()]:
+            if target not in reached:
+                reached.add(target)
+                queue.append(target)
+    assert len(reached) == len(template.rooms) == rooms
+
+
+def test_spec_compiles_into_a_playable_template():
+    spec = citygen.generate(300, seed=3)
+    template = worlds.WorldTemplate.from_spec(spec, "ville-300")
+    assert len(template.rooms) == 300 and template.rooms[template.start][0] == spec["start"]
+    item_names = {item.name for item, _ in template.items}
+    assert set(template.rules["required_items"]) <= item_names
+    assert len(template.rules["required_items"]) == citygen.REQUIRED_ITEMS
+    assert any(npc[0] == template.rules["culprit"] for npc in template.characters)
+    # The typo indexes are built with the template
+    assert template.arguments[matcher.ROOM].lookup("ru 0 n1°") == "Rue 0 n°1"
+
+    game = Game.create("Ana", template, NullSink(), seed=1)
+    game.process_command("go E")
+    assert game.player.current_room.name == "Rue 0 n°1" and game.displacement_count == 1
+    assert [quest.title for quest in game.quest_manager.quests if quest.is_active] == ["Ronde 0"]
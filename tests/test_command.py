@@ -0,0 +1,91 @@
+"""Tests of the command signatures and of the compiled dispatcher (command.py)."""
+
+import pytest
+
+import matcher
+import worlds
+from actions import MSG0, MSG1
+from command import NO_ARGUMENT, ONE_WORD, REST_OF_LINE, X_ON_Y, Command, Dispatcher
+from output import OutputSink
+
+
+class FakeGame:
+    """What the dispatcher needs from a game: an output and a matcher."""
+
+    def __init__(self, command_words):
+        self.out = OutputSink()
+        self.matcher = matcher.for_world(worlds.crime_a_montfleur(), command_words)
+
+
+@pytest.fixture
+def dispatch():
+    """Return a function running a line and returning (known, calls, output)."""
+    calls = []
+
+    def record(name):
+        def action(game, *arguments):
+            calls.append((name, *arguments))
+            return True
+        return action
+
+    commands = {
+        "look": Command("look", " : observer", record("look")),
+        "go": Command("go", " <direction> : aller", record("go"), ONE_WORD, matcher.DIRECTION),
+        "talk": Command("talk", " <name> : parler", record("talk"), REST_OF_LINE, matcher.CHARACTER),
+        "use": Command("use", " <objet1> on <objet2> : utiliser", record("use"), X_ON_Y, matcher.ITEM),
+    }
+    dispatcher = Dispatcher(commands)
+    game = FakeGame(list(commands))
+
+    def run(line):
+        calls.clear()
+        known = dispatcher.dispatch(game, line)
+        return known, list(calls), game.out.take()
+    return run
+
+
+@pytest.mark.parametrize("line, call", [
+    ("look", ("look",)),
+    ("  LOOK  ", ("look",)),
+    ("go n", ("go", "N")),
+    ("Go  N", ("go", "N")),
+    ("talk medecin legiste", ("talk", "Médecin légiste")),
+    ("talk Durand", ("talk", "Durand")),
+    ("use cle on cofre", ("use", "clé", "coffre")),
+    ("use clé ON coffre", ("use", "clé", "coffre")),
+    ("loook", ("look",)),
+])
+def test_arguments_are_parsed_and_corrected(dispatch, line, call):
+    assert dispatch(line) == (True, [call], "")
+
+
+@pytest.mark.parametrize("line, error", [
+    ("look around", MSG0.format(command_word="look")),
+    ("go", MSG1.format(command_word="go")),
+    ("go N S", MSG1.format(command_word="go")),
+    ("talk", MSG1.format(command_word="talk")),
+    ("use clé", "\nUtilisation: use <objet1> on <objet2>\n"),
+    ("use clé with coffre", "\nUtilisation: use <objet1> on <objet2>\n"),
+])
+def test_usage_errors(dispatch, line, error):
+    known, calls, output = dispatch(line)
+    assert known and calls == []
+    assert output == error + "\n"
+
+
+def test_unknown_command(dispatch):
+    assert dispatch("danser") == (False, [], "")
+
+
+def test_unknown_arguments_are_kept_as_typed(dispatch):
+    assert dispatch("go Z")[1] == [("go", "Z")]
+
+
+def test_unknown_signature():
+    with pytest.raises(ValueError):
+        Dispatcher({"x": Command("x", "", print, signature=42)})
+
+
+def test_number_of_parameters():
+    assert [Command("c", "", print, signature).number_of_parameters
+            for signature in (NO_ARGUMENT, ONE_WORD, REST_OF_LINE, X_ON_Y)] == [0, 1, 1, 1]
@@ -0,0 +1,152 @@
+"""Tests of the session journals (journal.py)."""
+
+import os
+import random
+
+import pytest
+
+import journal
+import save
+from game import Game
+from output import NullSink, OutputSink
+
+VOCABULARY = ["go N", "go S", "go E", "go O", "go U", "go D", "back", "look", "take photos", "take clé",
+              "drop photos", "talk Durand", "quests", "bogus", ""]
+
+
+def crash(game):
+    """Stop journaling without closing the journal cleanly."""
+    game.journal.file.close()
+    game.journal = None
+
+
+@pytest.mark.parametrize("interval", [1, 3, 100])
+def test_recovery_after_a_crash(tmp_path, interval, winning_commands):
+    rng = random.Random(interval)
+    for trial in range(10):
+        path = str(tmp_path / f"{trial}.wal")
+        game = Game.create("Ana", out=OutputSink(), seed=trial)
+        journal.Journal.create(path, game, interval)
+        commands = winning_commands if trial == 0 else [rng.choice(VOCABULARY) for _ in range(60)]
+        for command in commands:
+            game.process_command(command)
+            game.check_end()
+        crash(game)
+        recovered = journal.recover(path, NullSink())
+        assert save.dump(recovered) == save.dump(game)
+        # The recovered game goes on writing its journal
+        for command in ["go O", "go E"]:
+            game.process_command(command)
+            recovered.process_command(command)
+        recovered.journal.close()
+        assert save.dump(journal.recover(path, NullSink(), resume=False)) == save.dump(game)
+
+
+def test_rejected_commands_count_toward_compaction(tmp_path):
+    path = str(tmp_path / "wal.wal")
+    game = Game.create("Ana", out=NullSink(), seed=1)
+    journal.Journal.create(path, game, 5)
+    for i in range(200):
+        game.process_command(f"n'importe quoi {i}" if i % 7 else "look")
+        records, _ = journal.read_records(open(path, "rb").read())
+        commands = [kind for kind, _ in records].count(journal.COMMAND)
+        assert records[0][0] == journal.SNAPSHOT and 1 <= commands <= 5
+    crash(game)
+    recovered = journal.recover(path, NullSink())
+    assert save.dump(recovered) == save.dump(game)
+    assert recovered.journal.pending == commands
+
+
+def test_command_is_written_before_it_runs(tmp_path):
+    path = str(tmp_path / "wal.wal")
+    game = Game.create("Ana", out=NullSink(), seed=1)
+    journal.Journal.create(path, game, 100)
+    game.process_command("go O")
+    size = os.path.getsize(path)
+    game.process_command("go E")
+    records, _ = journal.read_records(open(path, "rb").read())
+    assert [kind for kind, _ in records][-4:] == [journal.COMMAND, journal.APPLIED] * 2
+    # A crash during "go E": its command is journaled, its delta is not
+    crash(game)
+    with open(path, "r+b") as file:
+        file.truncate(size + len(journal.encode_record(journal.COMMAND, b"go E")))
+    assert save.dump(journal.recover(path, NullSink())) == save.dump(game)
+
+
+def test_torn_record_is_cut_off(tmp_path, winning_commands):
+    path = str(tmp_path / "wal.wal")
+    game = Game.create("Ana", out=NullSink(), seed=1)
+    journal.Journal.create(path, game, 1000)
+    for command in winning_commands[:10]:
+        game.process_command(command)
+    crash(game)
+    size = os.path.getsize(path)
+    with open(path, "ab") as file:
+        file.write(b"\x02\x30\x00\x00\x00abc")
+    recovered = journal.recover(path, NullSink())
+    assert os.path.getsize(path) == size
+    assert recovered.progress_snapshot() == game.progress_snapshot()
+
+
+def test_divergent_replay_is_detected(tmp_path):
+    path = tmp_path / "wal.wal"
+    game = Game.create("Ana", out=NullSink(), seed=1)
+    path.write_bytes(journal.encode_record(journal.SNAPSHOT, save.dump(game))
+                     + journal.encode_record(journal.COMMAND, b"go O")
+                     + journal.encode_record(journal.APPLIED, journal.DELTA.pack(123, 0)))
+    with pytest.raises(journal.JournalError):
+        journal.recover(str(path), NullSink())
+
+
+def test_large_displacement_counts(tmp_path):
+    path = str(tmp_path / "wal.wal")
+    game = Game.create("Ana", out=NullSink(), seed=1)
+    game.max_displacements = float("inf")
+    journal.Journal.create(path, game, 1000)
+    game.displacement_count = 70000
+    game.journal.compact(game)
+    game.process_command("go O")
+    crash(game)
+    assert journal.recover(path, NullSink()).displacement_count == game.displacement_count
+
+
+def test_directory_keeps_unfinished_games(tmp_path, winning_commands):
+    journals = journal.JournalDirectory(str(tmp_path), snapshot_interval=5)
+    left = Game.create("Ana", out=NullSink(), seed=1)
+    journals.attach("a1", left)
+    left.process_command("go O")
+    journals.detach(left)
+    won = Game.create("Bob", out=NullSink(), seed=2)
+    journals.attach("b2", won)
+    for command in winning_commands:
+        won.process_command(command)
+        won.check_end()
+    assert won.finished
+    journals.detach(won)
+    assert sorted(os.listdir(tmp_path)) == ["a1.wal"]
+
+    resumed = journals.resume("a1")
+    assert save.dump(resumed) == save.dump(left)
+    assert journals.resume("zz") is None
+    with pytest.raises(journal.JournalError):
+        journals.path("../a1")
+
+
+def test_recover_all_at_startup(tmp_path):
+    journals = journal.JournalDirectory(str(tmp_path), snapshot_interval=100)
+    game = Game.create("Ana", out=NullSink(), seed=1)
+    journals.attach("a1", game)
+    for command in ["go O", "go N", "go S"]:
+        game.process_command(command)
+    crash(game)
+    (tmp_path / "b2.wal").write_bytes(b"garbage")
+    (tmp_path / "c3.wal.tmp").write_bytes(b"half a snapshot")
+
+    resumable, failed = journal.JournalDirectory(str(tmp_path)).recover_all()
+    assert resumable == ["a1"]
+    assert failed == [str(tmp_path / "b2.wal")]
+    assert sorted(os.listdir(tmp_path)) == ["a1.wal", "b2.wal.bad"]
+    # Compacted into a single snapshot
+    records, _ = journal.read_records((tmp_path / "a1.wal").read_bytes())
+    assert [kind for kind, _ in records] == [journal.SNAPSHOT]
+    assert save.dump(journals.resume("a1")) == save.dump(game)
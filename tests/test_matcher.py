@@ -0,0 +1,111 @@
+"""Tests of the typo-tolerant matcher (matcher.py)."""
+
+import gc
+import itertools
+import random
+import string
+
+import pytest
+
+import citygen
+import matcher
+import worlds
+from matcher import FuzzyIndex, edit_distance, max_distance, normalize
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("analyse", "analyze"),    # one typo
+    ("ANALYZE", "analyze"),    # case
+    ("cle", "clé"),            # accents
+    ("medecin   legiste", "Médecin légiste"),  # spaces
+    ("medecinn legitse", "Médecin légiste"),   # two typos in a long word
+    ("acuse", "accuse"),       # deletion
+    ("xyz", None),             # nothing close
+    ("clo", None),             # short words must match exactly
+])
+def test_lookup(text, expected):
+    index = FuzzyIndex(["analyze", "accuse", "clé", "Médecin légiste", "coffre"])
+    assert index.lookup(text) == expected
+
+
+def test_ambiguous_typo_matches_nothing():
+    index = FuzzyIndex(["photos", "photon"])
+    assert index.lookup("photo") is None
+    assert index.lookup("photos") == "photos"
+
+
+def test_index_is_built_with_the_words():
+    index = FuzzyIndex(["analyze", "accuse"])
+    assert index.neighbors["acuse"] == "accuse" and "z" in index.alphabet
+    assert index.lookup("acuse") == "accuse"
+    # Words added afterwards are indexed too
+    index.add("examine")
+    assert index.lookup("examien") == "examine"
+
+
+def test_probes_do_not_depend_on_the_vocabulary():
+    small = FuzzyIndex(["inspecteur"])
+    large = FuzzyIndex(["inspecteur"] + ["".join(letters) for letters in itertools.product("nrst", repeat=6)])
+    assert small.alphabet == large.alphabet
+    assert small.probes("inspecteru", 2) == large.probes("inspecteru", 2)
+    assert large.lookup("inspectuer") == "inspecteur"
+
+
+def brute_force(words, text):
+    """The reference: the only word within the tolerated distance, by full scan."""
+    key = normalize(text)
+    limit = max_distance(key)
+    distances = {}
+    for word in words:
+        candidate = normalize(word)
+        if candidate == key:
+            return word
+        distance = edit_distance(key, candidate, min(limit, max_distance(candidate)))
+        if distance <= min(limit, max_distance(candidate)):
+            distances[word] = distance
+    if not distances:
+        return None
+    best = min(distances.values())
+    found = [word for word, distance in distances.items() if distance == best]
+    return found[0] if len(found) == 1 else None
+
+
+def test_index_agrees_with_a_full_scan():
+    rng = random.Random(0)
+    letters = string.ascii_lowercase[:6]
+    words = sorted({"".join(rng.choice(letters) for _ in range(rng.randint(3, 9))) for _ in range(200)})
+    index = FuzzyIndex(words)
+    for _ in range(500):
+        word = list(rng.choice(words))
+        for _ in range(rng.randint(0, 3)):
+            position = rng.randrange(len(word) + 1)
+            operation = rng.choice("ids")
+            if operation == "i":
+                word.insert(position, rng.choice(letters))
+            elif word and position < len(word):
+                if operation == "d":
+                    del word[position]
+                else:
+                    word[position] = rng.choice(letters)
+        text = "".join(word)
+        assert index.lookup(text) == brute_force(words, text), text
+
+
+def test_world_matcher():
+    world_matcher = matcher.for_world(worlds.crime_a_montfleur(), ["go", "take", "talk"])
+    assert world_matcher is matcher.for_world(worlds.crime_a_montfleur(), ["go", "take", "talk"])
+    assert world_matcher.command("Tkae") == "take"
+    assert world_matcher.argument(matcher.DIRECTION, "n") == "N"
+    assert world_matcher.argument(matcher.ROOM, "commisariat") == "Commissariat"
+    assert world_matcher.argument(matcher.ITEM, "indice") == "indice"
+    assert world_matcher.argument(None, "cofre") == "cofre"
+
+
+def test_world_matchers_go_with_their_template():
+    template = worlds.WorldTemplate.from_spec(citygen.generate(20))
+    matcher.for_world(template, ["go"])
+    assert template in matcher._matchers
+    count = len(matcher._matchers)
+    del template
+    gc.collect()
+    assert len(matcher._matchers) == count - 1
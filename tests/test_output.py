@@ -0,0 +1,60 @@
+"""Tests of the output sinks (output.py)."""
+
+import contextlib
+import io
+
+import save
+from game import Game
+from output import ConsoleSink, NullSink, OutputSink
+
+COMMANDS = ["look", "go U", "take photos", "check", "go D", "go O", "quests", "history", "danser",
+            "talk Durand", "help"]
+
+
+def play(out, commands=COMMANDS):
+    """Play the commands with a sink, returning the game and the text taken after each command."""
+    game = Game.create("Ana", out=out, seed=5)
+    game.print_welcome()
+    texts = [out.take()]
+    for command in commands:
+        game.process_command(command)
+        game.check_end()
+        texts.append(out.take())
+    return game, texts
+
+
+def test_print_arguments_are_those_of_print():
+    out = OutputSink()
+    calls = [(("a",), {}), (("a", 1, None), {}), ((), {}), (("a", "b"), {"sep": "-", "end": "!"}),
+             (("x",), {"end": ""})]
+    expected = io.StringIO()
+    for values, options in calls:
+        out.print(*values, **options)
+        print(*values, file=expected, **options)
+    assert out.take() == expected.getvalue()
+
+
+def test_buffered_text_is_the_printed_text():
+    printed = io.StringIO()
+    with contextlib.redirect_stdout(printed):
+        play(ConsoleSink())
+    _, texts = play(OutputSink())
+    assert "".join(texts) == printed.getvalue()
+    assert "Bienvenue Ana" in texts[0] and "Commande non reconnue" in texts[9]
+
+
+def test_flush_writes_once_to_the_stream():
+    stream = io.StringIO()
+    out = OutputSink(stream)
+    out.print("Bonjour")
+    out.print("Montfleur")
+    assert stream.getvalue() == ""
+    out.flush()
+    assert stream.getvalue() == "Bonjour\nMontfleur\n" and out.take() == ""
+
+
+def test_null_sink_discards_the_text_but_not_the_game():
+    quiet, texts = play(NullSink())
+    assert texts == [""] * len(texts)
+    loud, _ = play(OutputSink())
+    assert save.dump(quiet) == save.dump(loud)
@@ -0,0 +1,96 @@
+"""Tests of the quests (quest.py)."""
+
+import pytest
+
+import worlds
+from game import Game
+from output import NullSink
+from quest import Quest, QuestManager
+
+# Quest events of the winning play, recorded with the original game (before
+# the quest index and the prerequisite DAG): (command number, event, title)
+WINNING_QUEST_EVENTS = [
+    (0, "activate", "Inspecter la maison du crime"),
+    (9, "complete", "Inspecter la maison du crime"),
+    (9, "activate", "Faire analyser les objets au Labo"),
+    (13, "activate", "Ouvrir le coffre"),
+    (16, "activate", "Lire la lettre mystérieuse"),
+    (24, "complete", "Faire analyser les objets au Labo"),
+    (24, "activate", "Aller à la morgue"),
+    (26, "complete", "Analyser les objets chez Lenoir"),
+    (26, "activate", "Inspecter chez Durand"),
+    (29, "complete", "Résoudre l'énigme"),
+]
+
+
+def quest_spec(title, requires=()):
+    return (title, "", (), None, not requires, tuple(requires), False)
+
+
+def test_winning_play_activates_and_completes_the_quests_in_order(monkeypatch, winning_commands):
+    events = []
+    step = [0]
+    activate, complete_quest = Quest.activate, Quest.complete_quest
+
+    def recording_activate(self):
+        events.append((step[0], "activate", self.title))
+        activate(self)
+
+    def recording_complete_quest(self, player=None):
+        if not self.is_completed:
+            events.append((step[0], "complete", self.title))
+        complete_quest(self, player)
+
+    monkeypatch.setattr(Quest, "activate", recording_activate)
+    monkeypatch.setattr(Quest, "complete_quest", recording_complete_quest)
+    game = Game.create("Ana", out=NullSink(), seed=0)
+    for step[0], command in enumerate(winning_commands, 1):
+        game.process_command(command)
+        game.check_end()
+    assert game.win()
+    assert events == WINNING_QUEST_EVENTS
+
+
+def test_quest_graph_accepts_a_dag():
+    worlds.check_quest_graph((quest_spec("A"), quest_spec("B", ["A"]), quest_spec("C", ["A", "B"])))
+    worlds.check_quest_graph(worlds.crime_a_montfleur().quests)
+
+
+def test_quest_graph_rejects_unknown_prerequisites():
+    with pytest.raises(ValueError, match="Quête inconnue: Z"):
+        worlds.check_quest_graph((quest_spec("A"), quest_spec("B", ["Z"])))
+
+
+@pytest.mark.parametrize("quests", [
+    (quest_spec("A"), quest_spec("B", ["C"]), quest_spec("C", ["B"])),
+    (quest_spec("A", ["A"]),),
+    (quest_spec("A"), quest_spec("B", ["A", "D"]), quest_spec("C", ["B"]), quest_spec("D", ["C"])),
+])
+def test_quest_graph_rejects_cycles(quests):
+    with pytest.raises(ValueError, match="Cycle de quêtes"):
+        worlds.check_quest_graph(quests)
+
+
+def test_from_spec_rejects_a_quest_cycle():
+    spec = {"name": "Petit", "start": "Hall", "rooms": [{"name": "Hall", "description": "un hall"}],
+            "quests": [{"title": "A", "description": "", "objectives": [], "requires": ["B"]},
+                       {"title": "B", "description": "", "objectives": [], "requires": ["A"]}]}
+    with pytest.raises(ValueError, match="Cycle de quêtes: A, B"):
+        worlds.WorldTemplate.from_spec(spec)
+
+
+def test_counter_names_match_anywhere_in_the_objective():
+    manager = QuestManager(out=NullSink())
+    quest = Quest("Fouille", "Fouiller le quartier", ["Trouver 3 indices", "Se déplacer 10 fois"])
+    manager.add_quest(quest)
+    manager.activate_quest("Fouille")
+    manager.increment_counter("indices", 2)
+    assert not quest.completed_objectives
+    assert "Trouver 3 indices (Progression: 2/3)" in quest.get_details()
+    manager.increment_counter("indices")
+    assert quest.completed_objectives == ["Trouver 3 indices"]
+    # Words after the number, or inside the text, name the counter too
+    manager.increment_counter("fois", 9)
+    assert not quest.is_completed
+    manager.increment_counter("déplacer", 10)
+    assert quest.is_completed and not manager.active_quests
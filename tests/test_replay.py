@@ -0,0 +1,72 @@
+"""Tests of the transcript replay (replay.py)."""
+
+import gzip
+
+import save
+from game import Game
+from output import NullSink
+from replay import Replayer, SessionReport, format_header, open_transcript, parse_header
+
+WANDER = ["go O", "go N", "talk Durand", "go S", "go E", "take couteau", "look", "danser", "go U", "back"] * 3
+
+
+class KeepingReplayer(Replayer):
+    """Replayer keeping the games it creates."""
+
+    def __init__(self):
+        super().__init__()
+        self.games = []
+
+    def start(self, fields):
+        self.games.append(super().start(fields))
+        return self.games[-1]
+
+
+def recorded(player_name, seed, commands):
+    """Play a session directly, as the server would, and return its game and report."""
+    game = Game.create(player_name, out=NullSink(), seed=seed)
+    played = 0
+    for command in commands:
+        if game.finished:
+            break
+        game.process_command(command)
+        game.check_end()
+        played += 1
+    return game, SessionReport("", game, played, 0.0).to_dict()
+
+
+def same_state(game, report, player_name, seed, commands):
+    expected_game, expected = recorded(player_name, seed, commands)
+    assert save.dump(game) == save.dump(expected_game)
+    report = report.to_dict()
+    for key in ("session_id", "wall_time"):
+        report.pop(key)
+        expected.pop(key)
+    assert report == expected
+
+
+def test_header_round_trip():
+    line = format_header("7", "Jean de la Fontaine", 123)
+    assert parse_header(line) == ("7", {"seed": "123", "name": "Jean de la Fontaine"})
+
+
+def test_transcript_replays_to_the_recorded_state(tmp_path, winning_commands):
+    lines = [format_header("a", "Ana", 11)] + winning_commands + ["look", "# note", ""]
+    lines += [format_header("b", "Bob", 12)] + WANDER
+    path = tmp_path / "sessions.txt.gz"
+    with gzip.open(path, "wt", encoding="utf-8") as file:
+        file.write("\n".join(lines) + "\n")
+    replayer = KeepingReplayer()
+    with open_transcript(str(path)) as transcript:
+        first, second = replayer.replay(transcript)
+    assert (first.session_id, second.session_id) == ("a", "b")
+    assert first.won and first.commands == len(winning_commands)
+    same_state(replayer.games[0], first, "Ana", 11, winning_commands)
+    same_state(replayer.games[1], second, "Bob", 12, WANDER)
+
+
+def test_commands_before_a_header_form_session_one():
+    reports = list(Replayer().replay(["go O\n", "go E\n"]))
+    assert len(reports) == 1
+    assert reports[0].session_id == "1" and reports[0].commands == 2
+    assert reports[0].displacement_count == 2
@@ -0,0 +1,57 @@
+"""Tests of the random generator of the sessions (rng.py)."""
+
+import collections
+
+import pytest
+
+from game import Game
+from output import NullSink
+from rng import MASK64, SessionRandom
+
+
+def test_same_seed_same_stream():
+    first, second = SessionRandom(2024), SessionRandom(2024)
+    assert [first.next64() for _ in range(1000)] == [second.next64() for _ in range(1000)]
+    assert [first.random() for _ in range(100)] == [second.random() for _ in range(100)]
+    assert [first.randbelow(7) for _ in range(100)] == [second.randbelow(7) for _ in range(100)]
+    assert SessionRandom(1).next64() != SessionRandom(2).next64()
+
+
+def test_known_splitmix64_values():
+    # Reference outputs of SplitMix64 for seed 0
+    rng = SessionRandom(0)
+    assert [rng.next64() for _ in range(3)] == [0xE220A8397B1DCDAF, 0x6E789E6AA1B965F4, 0x06C45D188009454F]
+
+
+def test_seed_and_state():
+    rng = SessionRandom(-1)
+    assert rng.state == MASK64
+    state = rng.getstate()
+    values = [rng.random() for _ in range(10)]
+    rng.setstate(state)
+    assert [rng.random() for _ in range(10)] == values
+    rng.seed(-1)
+    assert rng.getstate() == state
+
+
+def test_draws_are_in_range_and_uniform():
+    rng = SessionRandom(3)
+    assert all(0.0 <= rng.random() < 1.0 for _ in range(10000))
+    counts = collections.Counter(rng.randbelow(6) for _ in range(60000))
+    assert sorted(counts) == list(range(6))
+    assert all(count == pytest.approx(10000, rel=0.05) for count in counts.values())
+    assert rng.randbelow(1) == 0
+    with pytest.raises(IndexError):
+        rng.choice([])
+
+
+def test_same_seed_same_npc_moves():
+    first = Game.create("Ana", out=NullSink(), seed=99)
+    second = Game.create("Bob", out=NullSink(), seed=99)
+    other = Game.create("Eve", out=NullSink(), seed=100)
+    trails = [], [], []
+    for _ in range(100):
+        for game, trail in zip((first, second, other), trails):
+            game.update_characters()
+            trail.append(tuple(npc.current_room.name for npc in game.mobile_characters))
+    assert trails[0] == trails[1] != trails[2]
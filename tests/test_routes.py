@@ -0,0 +1,85 @@
+"""Tests of the route tables (routes.py) and of the `route` command."""
+
+import gc
+import random
+
+import citygen
+import routes
+import worlds
+from session import GameSession
+
+
+def fresh(table):
+    """Return a table of the same graph without any computed row."""
+    return routes.RouteTable(table.names, table.exits)
+
+
+def assert_same_rows(table):
+    reference = fresh(table)
+    for source in range(len(table.names)):
+        costs, hops, _ = table.row(source)
+        assert (costs, hops) == reference.row(source)[:2], table.names[source]
+
+
+def test_rows_are_cheapest_paths():
+    table = routes.for_world(worlds.crime_a_montfleur())
+    for source, name in enumerate(table.names):
+        costs, hops, first = table.row(source)
+        for target, target_name in enumerate(table.names):
+            path = table.path(name, target_name)
+            if costs[target] == routes.INFINITY:
+                assert path is None
+                continue
+            assert len(path) == hops[target]
+            # Following the path costs its displacements
+            room, cost = source, 0
+            for direction in path:
+                nxt = next(t for d, t in table.exits[room] if d == direction)
+                cost += routes.step_cost(table.names[room], table.names[nxt])
+                room = nxt
+            assert (room, cost) == (target, costs[target])
+
+
+def test_changed_exits_match_a_recomputed_table():
+    world = worlds.WorldTemplate.from_spec(citygen.generate(100, 3), "ville-100")
+    table = routes.RouteTable.from_world(world).precompute()
+    rng = random.Random(0)
+    for _ in range(30):
+        room = rng.randrange(len(table.names))
+        direction = rng.choice("NSEOUD")
+        target = rng.choice([None, rng.randrange(len(table.names))])
+        table = table.with_exit(table.names[room], direction,
+                                table.names[target] if target is not None else None)
+        assert_same_rows(table)
+
+
+def test_with_exit_leaves_the_table_unchanged():
+    table = routes.for_world(worlds.crime_a_montfleur())
+    before = table.route("Maison du crime", "Commissariat")
+    changed = table.with_exit("Maison du crime", "O", None)
+    assert table.route("Maison du crime", "Commissariat") == before
+    assert changed.route("Maison du crime", "Commissariat") == (None, routes.INFINITY)
+
+
+def test_tables_go_with_their_template():
+    template = worlds.WorldTemplate.from_spec(citygen.generate(20))
+    assert routes.for_world(template) is routes.for_world(template)
+    count = len(routes._tables)
+    del template
+    gc.collect()
+    assert len(routes._tables) == count - 1
+
+
+def test_lookup_ignores_case():
+    table = routes.for_world(worlds.crime_a_montfleur())
+    assert table.lookup("Commissariat") == "Commissariat"
+    assert table.lookup("cOMMISSARIAT") == "Commissariat"
+    assert table.lookup("Nulle part") is None
+
+
+def test_route_command():
+    session = GameSession("Ana", seed=1)
+    assert "go O" in session.send("route commissariat").output
+    here = session.game.player.current_room.name
+    assert "déjà ici" in session.send(f"route {here}").output
+    assert "pas de salle" in session.send("route Nulle part").output
@@ -0,0 +1,127 @@
+"""Tests of the binary saves (save.py)."""
+
+import gc
+
+import pytest
+
+import citygen
+import save
+import worlds
+from output import NullSink
+from session import GameSession
+
+
+def game_state(game):
+    """Return everything a save must keep, as plain values."""
+    def names(rooms):
+        return [room.name for room in rooms]
+
+    def quest_state(quest):
+        return (quest.title, quest.is_active, quest.is_completed, list(quest.completed_objectives),
+                dict(quest.counters), quest.waiting)
+
+    manager = game.quest_manager
+    return {
+        "seed": game.seed,
+        "rng": game.rng.getstate(),
+        "finished": game.finished,
+        "law": game.law_allows_durand_commissariat,
+        "accused": game.accused,
+        "displacements": game.displacement_count,
+        "player": (game.player.name, game.player.current_room.name, names(game.player.history),
+                   {name: (item.description, item.weight) for name, item in game.player.inventory.items()}),
+        "rooms": [(room.name, sorted(room.inventory), sorted(room.characters),
+                   {direction: target.name for direction, target in room.exits.items()})
+                  for room in game.rooms],
+        "npcs": sorted((npc.name, npc.current_room.name, npc._msg_index)
+                       for room in game.rooms for npc in room.characters.values()),
+        "mobile": [npc.name for npc in game.mobile_characters],
+        "tick": game.tick,
+        "scheduler": game.scheduler.entries(),
+        "quests": [quest_state(quest) for quest in manager.quests],
+        "active": [quest.title for quest in manager.active_quests],
+        "counters": dict(manager.counters),
+        "bitsets": [set(bitset) for bitset in (game.analyzed_items, game.collected_items,
+                                               game.visited_crime_scene_rooms, game.flags,
+                                               game.required_items)],
+        "suspicions": dict(game.suspicions),
+        "clues": list(game.clues),
+        "routes": game.routes.route(game.player.current_room.name, "Commissariat"),
+    }
+
+
+def mid_game(winning_commands):
+    session = GameSession("Ana", seed=5)
+    session.send_all(winning_commands[:15] + ["talk Durand", "talk Durand"])
+    return session.game
+
+
+def test_round_trip_keeps_the_full_state(winning_commands):
+    game = mid_game(winning_commands)
+    manager = game.quest_manager
+    manager.increment_counter("indices", 3)
+    manager.increment_counter("erreurs", -2)
+    manager.quests[0].counters["indices"] = 3
+    game.suspicions["Durand"] = 2
+    game.clues.append("Une trace de pas")
+    copy = save.load(save.dump(game), NullSink())
+    assert game_state(copy) == game_state(game)
+
+
+def test_round_trip_of_changed_exits(winning_commands):
+    game = mid_game(winning_commands)
+    rooms = {room.name: room for room in game.rooms}
+    game.set_exit(rooms["Rue de Montfleur"], "N", rooms["Commissariat"])
+    game.set_exit(rooms["Café du Marchand"], "N", None)
+    copy = save.load(save.dump(game), NullSink())
+    assert game_state(copy) == game_state(game)
+
+
+def test_large_values(winning_commands):
+    game = mid_game(winning_commands)
+    game.displacement_count = 70000
+    game.tick = 2 ** 40
+    game.suspicions["Durand"] = 100000
+    game.player.history = [game.rooms[i % len(game.rooms)] for i in range(70000)]
+    game.clues.append("x" * 70000)
+    copy = save.load(save.dump(game), NullSink())
+    assert game_state(copy) == game_state(game)
+
+
+@pytest.mark.parametrize("value", [0, 1, 127, 128, 65535, 65536, 2 ** 63])
+def test_varints(value):
+    out = save.Writer()
+    out.uint(value)
+    out.sint(value)
+    out.sint(-value)
+    reader = save.Reader(out.getvalue())
+    assert (reader.uint(), reader.sint(), reader.sint()) == (value, value, -value)
+
+
+def test_negative_counts_are_rejected():
+    with pytest.raises(save.SaveError):
+        save.Writer().uint(-1)
+
+
+def test_truncated_saves_are_rejected(winning_commands):
+    data = save.dump(mid_game(winning_commands))
+    for size in range(len(data)):
+        with pytest.raises(save.SaveError):
+            save.load(data[:size], NullSink())
+
+
+def test_trailing_data_is_rejected(winning_commands):
+    with pytest.raises(save.SaveError):
+        save.load(save.dump(mid_game(winning_commands)) + b"\0", NullSink())
+
+
+def test_item_indexes_are_kept_per_template():
+    first = worlds.WorldTemplate.from_spec(citygen.generate(20, seed=1))
+    second = worlds.WorldTemplate.from_spec(citygen.generate(20, seed=2))
+    assert first.id is None and second.id is None
+    for template in (first, second):
+        assert save.item_indexes(template) == {id(item): i for i, (item, _) in enumerate(template.items)}
+    count = len(save._item_indexes)
+    del first, second, template
+    gc.collect()
+    assert len(save._item_indexes) == count - 2
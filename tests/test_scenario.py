@@ -0,0 +1,106 @@
+"""Tests of the scenario files (scenario.py): checks, cache and rules."""
+
+import json
+import os
+import pickle
+import shutil
+
+import pytest
+
+import scenario
+import worlds
+from session import GameSession
+
+MONTFLEUR = os.path.join(worlds.SCENARIO_DIR, "crime_a_montfleur.json")
+
+
+def copy_scenario(tmp_path, **rules):
+    """Copy the Crime a Montfleur scenario, with changed rules."""
+    with open(MONTFLEUR, encoding="utf-8") as file:
+        spec = json.load(file)
+    spec["rules"].update(rules)
+    path = tmp_path / "court.json"
+    path.write_text(json.dumps(spec), encoding="utf-8")
+    return str(path)
+
+
+def test_invalid_scenario_is_reported(tmp_path):
+    path = tmp_path / "vide.json"
+    path.write_text('{"name": "Vide"}', encoding="utf-8")
+    with pytest.raises(scenario.ScenarioError, match="vide.json"):
+        scenario.load(str(path), use_cache=False)
+
+
+def test_cache_is_written_then_used(tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    first = scenario.load(MONTFLEUR, cache_dir)
+    compiled = scenario.cache_path(MONTFLEUR, open(MONTFLEUR, "rb").read(), cache_dir)
+    assert os.path.exists(compiled)
+    second = scenario.load(MONTFLEUR, cache_dir)
+    assert second is not first and second.rooms == first.rooms
+    assert os.stat(cache_dir).st_mode & 0o777 == 0o700
+
+
+@pytest.mark.parametrize("content", [b"", b"not a pickle", pickle.dumps({"rooms": []}),
+                                     b"cnowhere\nmissing\n."])
+def test_bad_cache_file_is_rebuilt(tmp_path, content):
+    cache_dir = str(tmp_path / "cache")
+    compiled = scenario.cache_path(MONTFLEUR, open(MONTFLEUR, "rb").read(), cache_dir)
+    os.makedirs(cache_dir, mode=0o700)
+    with open(compiled, "wb") as file:
+        file.write(content)
+    template = scenario.load(MONTFLEUR, cache_dir)
+    assert isinstance(template, worlds.WorldTemplate) and template.id == "crime_a_montfleur"
+    assert scenario.read_cache(compiled) is not None
+
+
+@pytest.mark.skipif(not hasattr(os, "getuid"), reason="no file owners")
+def test_shared_cache_directory_is_restricted(tmp_path):
+    cache_dir = tmp_path / "cache"
+    cache_dir.mkdir()
+    cache_dir.chmod(0o777)
+    scenario.load(MONTFLEUR, str(cache_dir))
+    assert cache_dir.stat().st_mode & 0o777 == 0o700
+
+
+@pytest.mark.skipif(not hasattr(os, "getuid"), reason="no file owners")
+def test_linked_cache_directory_is_not_used(tmp_path):
+    target = tmp_path / "ailleurs"
+    target.mkdir()
+    os.symlink(target, tmp_path / "cache")
+    assert not scenario.private_directory(str(tmp_path / "cache"))
+    assert scenario.load(MONTFLEUR, str(tmp_path / "cache")).id == "crime_a_montfleur"
+    assert os.listdir(target) == []
+
+
+@pytest.mark.skipif(not hasattr(os, "getuid") or os.getuid() != 0, reason="changing owners needs root")
+def test_cache_of_another_user_is_not_read(tmp_path):
+    cache_dir = tmp_path / "cache"
+    scenario.load(MONTFLEUR, str(cache_dir))
+    compiled = scenario.cache_path(MONTFLEUR, open(MONTFLEUR, "rb").read(), str(cache_dir))
+    os.chown(compiled, 12345, 12345)
+    assert scenario.read_cache(compiled) is None
+    os.chown(cache_dir, 12345, 12345)
+    assert not scenario.private_directory(str(cache_dir))
+    shutil.rmtree(cache_dir)
+
+
+def test_time_limit_messages_follow_the_rules(tmp_path):
+    world = scenario.load(copy_scenario(tmp_path, max_displacements=20), use_cache=False)
+    session = GameSession("Ana", world, seed=1)
+    assert "Temps disponible: 2 jours = 20 deplacements" in session.intro
+    assert "moins de 20 deplacements" in session.intro
+    assert "Tout faire en moins de 20 deplacements" in session.send("help").output
+    output = session.send("quests").output
+    assert "Temps total disponible: 2 jours = 20 déplacements" in output
+    assert "Temps écoulé: 0/20 déplacements" in output
+    assert "Déplacements: 1/20 | Temps restant: ≈ 1.9 jours" in session.send("go O").output
+    outputs = []
+    for command in ["go E", "go O"] * 15:
+        result = session.send(command)
+        outputs.append(result.output)
+        if result.finished:
+            break
+    assert "FIN DU JOUR 1" in outputs[8] and "Jours restants: 1\n" in outputs[8]
+    assert result.lost
+    assert "dépassé les 2 jours d'investigation (21 déplacements)" in result.output
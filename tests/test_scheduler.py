@@ -0,0 +1,118 @@
+"""Tests of the NPC scheduler (scheduler.py) and of its use by the games."""
+
+import collections
+
+import pytest
+
+import worlds
+from game import Game
+from output import NullSink
+from rng import SessionRandom
+from scheduler import Scheduler, geometric_delay
+
+ROOMS = 10
+
+
+def ring_world(chances):
+    """Return a ring of rooms holding one mobile NPC per move chance, and a static one."""
+    rooms = [{"name": f"Salle {i}", "description": "une salle",
+              "exits": {"E": f"Salle {(i + 1) % ROOMS}", "O": f"Salle {(i - 1) % ROOMS}"}}
+             for i in range(ROOMS)]
+    characters = [{"name": "Durand", "description": "un voisin", "room": "Salle 0"}]
+    characters += [{"name": f"PNJ {i}", "description": "un passant", "room": f"Salle {i % ROOMS}",
+                    "mobile": True, "move_chance": chance} for i, chance in enumerate(chances)]
+    spec = {"name": "Anneau", "start": "Salle 0", "rooms": rooms, "characters": characters,
+            "rules": {"required_items": []}}
+    return worlds.WorldTemplate.from_spec(spec, f"anneau-{len(chances)}")
+
+
+def test_pop_due_returns_the_due_npcs_in_tick_then_index_order():
+    scheduler = Scheduler()
+    for tick, index in [(5, 2), (3, 4), (5, 0), (1, 3), (3, 1)]:
+        scheduler.schedule(tick, index)
+    assert scheduler.entries() == [(1, 3), (3, 1), (3, 4), (5, 0), (5, 2)]
+    assert scheduler.pop_due(0) == []
+    # A late update pops everything overdue
+    assert scheduler.pop_due(4) == [3, 1, 4]
+    assert len(scheduler) == 2
+    assert scheduler.pop_due(5) == [0, 2]
+    assert scheduler.pop_due(100) == [] and len(scheduler) == 0
+
+
+def test_clear_forgets_the_planned_actions():
+    scheduler = Scheduler()
+    scheduler.schedule(1, 0)
+    scheduler.clear()
+    assert scheduler.entries() == [] and scheduler.pop_due(1) == []
+
+
+def test_geometric_delay_bounds():
+    rng = SessionRandom(1)
+    assert geometric_delay(rng, 1.0) == 1 and geometric_delay(rng, 2.0) == 1
+    assert geometric_delay(rng, 0) is None and geometric_delay(rng, -0.5) is None
+    assert min(geometric_delay(rng, 0.999) for _ in range(1000)) == 1
+
+
+@pytest.mark.parametrize("chance", [0.05, 0.3, 0.5, 0.9])
+def test_geometric_delay_follows_the_law_of_one_draw_per_tick(chance):
+    rng = SessionRandom(2)
+    samples = 40000
+    counts = collections.Counter(geometric_delay(rng, chance) for _ in range(samples))
+    mean = sum(delay * count for delay, count in counts.items()) / samples
+    assert mean == pytest.approx(1 / chance, rel=0.03)
+    # P(delay = k) = (1 - chance) ** (k - 1) * chance
+    for delay in range(1, 6):
+        expected = (1 - chance) ** (delay - 1) * chance
+        assert counts[delay] / samples == pytest.approx(expected, abs=0.01)
+
+
+def test_game_schedules_only_the_mobile_npcs():
+    game = Game.create("Ana", ring_world([0.5, 0.0, 1.0]), NullSink(), seed=1)
+    names = [npc.name for npc in game.mobile_characters]
+    assert "Durand" not in names
+    planned = {game.mobile_characters[index].name: tick for tick, index in game.scheduler.entries()}
+    # A zero chance never acts, a certain one acts at the next tick
+    assert set(planned) == {"PNJ 0", "PNJ 2"}
+    assert planned["PNJ 2"] == game.tick + 1
+
+
+def test_update_moves_the_due_npcs_and_plans_their_next_move():
+    game = Game.create("Ana", ring_world([1.0, 0.2]), NullSink(), seed=3)
+    index = next(i for i, npc in enumerate(game.mobile_characters) if npc.name == "PNJ 0")
+    certain = game.mobile_characters[index]
+    for _ in range(20):
+        before = certain.current_room
+        due = [i for tick, i in game.scheduler.entries() if tick == game.tick + 1]
+        assert index in due
+        game.update_characters()
+        assert certain.current_room in before.exits.values()
+        # Each NPC stays planned once, in the future
+        entries = game.scheduler.entries()
+        assert sorted(i for _, i in entries) == list(range(len(game.mobile_characters)))
+        assert all(tick > game.tick for tick, _ in entries)
+
+
+def test_npcs_move_at_their_chance_per_tick():
+    chances = [0.1, 0.5]
+    game = Game.create("Ana", ring_world(chances), NullSink(), seed=4)
+    ticks = 20000
+    moves = collections.Counter()
+    for _ in range(ticks):
+        rooms = [npc.current_room for npc in game.mobile_characters]
+        game.update_characters()
+        for npc, room in zip(game.mobile_characters, rooms):
+            moves[npc.name] += npc.current_room is not room
+    for i, chance in enumerate(chances):
+        assert moves[f"PNJ {i}"] / ticks == pytest.approx(chance, abs=0.015)
+
+
+def test_same_seed_same_schedule():
+    world = ring_world([0.3, 0.6, 0.9])
+    first = Game.create("Ana", world, NullSink(), seed=7)
+    second = Game.create("Ana", world, NullSink(), seed=7)
+    for _ in range(200):
+        first.update_characters()
+        second.update_characters()
+    assert first.scheduler.entries() == second.scheduler.entries()
+    assert [npc.current_room.name for npc in first.mobile_characters] == \
+        [npc.current_room.name for npc in second.mobile_characters]
@@ -0,0 +1,113 @@
+"""Tests of the TCP game server (server.py)."""
+
+import asyncio
+import re
+
+from journal import JournalDirectory
+from server import INTERNAL_ERROR, GameServer, LocalSessions
+
+
+async def play(port, commands, name="Ana"):
+    """Connect, give a name, send commands and return everything received."""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    await reader.readuntil(b"nom: ")
+    writer.write(name.encode("utf-8") + b"\n")
+    try:
+        received = [await reader.readuntil(b"> ")]
+    except asyncio.IncompleteReadError as error:
+        writer.close()
+        return error.partial.decode("utf-8")
+    for command in commands:
+        writer.write(command.encode("utf-8") + b"\n")
+        try:
+            received.append(await reader.readuntil(b"> "))
+        except asyncio.IncompleteReadError as error:
+            received.append(error.partial)
+            break
+    writer.close()
+    return b"".join(received).decode("utf-8")
+
+
+def serve(backend, client):
+    async def run():
+        server = GameServer(port=0, backend=backend, idle_timeout=2)
+        await server.start()
+        try:
+            return await client(server.port)
+        finally:
+            await server.close()
+    return asyncio.run(run())
+
+
+def test_game_over_tcp(winning_commands):
+    backend = LocalSessions()
+    text = serve(backend, lambda port: play(port, winning_commands))
+    assert "GAGNÉ" in text
+    assert len(backend) == 0
+
+
+def test_concurrent_clients():
+    async def clients(port):
+        return await asyncio.gather(*[play(port, ["go O", "look"]) for _ in range(20)])
+    texts = serve(LocalSessions(), clients)
+    assert all("rue de Montfleur" in text for text in texts)
+
+
+class FailingSessions(LocalSessions):
+    """Sessions whose commands raise, as a bug in an action would."""
+
+    async def send(self, session_id, command_string):
+        raise RuntimeError("bug")
+
+
+def test_unexpected_error_is_reported_to_the_client():
+    backend = FailingSessions()
+    text = serve(backend, lambda port: play(port, ["look"]))
+    assert INTERNAL_ERROR in text
+    assert len(backend) == 0
+
+
+def resume_code(text):
+    return re.search(r"reprendre ([0-9a-f]+)", text).group(1)
+
+
+def test_resume_after_disconnection_and_restart(tmp_path):
+    backend = LocalSessions(journals=JournalDirectory(str(tmp_path)))
+    text = serve(backend, lambda port: play(port, ["go O", "go N"]))
+    code = resume_code(text)
+    assert len(backend) == 0
+
+    text = serve(backend, lambda port: play(port, ["go S"], f"reprendre {code}"))
+    assert "Reprise de la partie de Ana" in text and "maison de Durand" in text
+
+    # A new server recovers the journals left by the previous one
+    assert JournalDirectory(str(tmp_path)).recover_all() == ([code], [])
+    backend = LocalSessions(journals=JournalDirectory(str(tmp_path)))
+    text = serve(backend, lambda port: play(port, ["look"], f"reprendre {code}"))
+    assert "Reprise de la partie de Ana (3 déplacement(s))" in text
+
+
+def test_finished_games_cannot_be_resumed(tmp_path, winning_commands):
+    backend = LocalSessions(journals=JournalDirectory(str(tmp_path)))
+    text = serve(backend, lambda port: play(port, winning_commands))
+    assert "GAGNÉ" in text
+    text = serve(backend, lambda port: play(port, [], f"reprendre {resume_code(text)}"))
+    assert "Aucune partie à reprendre" in text
+    assert "Code de reprise invalide" in serve(backend, lambda port: play(port, [], "reprendre ../x"))
+
+
+def test_a_game_is_played_by_one_connection_at_a_time(tmp_path):
+    async def clients(port):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        await reader.readuntil(b"nom: ")
+        writer.write(b"Ana\n")
+        code = resume_code((await reader.readuntil(b"> ")).decode("utf-8"))
+        text = await play(port, [], f"reprendre {code}")
+        writer.close()
+        return text
+    backend = LocalSessions(journals=JournalDirectory(str(tmp_path)))
+    assert "déjà jouée" in serve(backend, clients)
+
+
+def test_no_resume_code_without_journal():
+    assert "reprendre" not in serve(LocalSessions(), lambda port: play(port, []))
@@ -0,0 +1,58 @@
+"""Tests of the headless session API (session.py)."""
+
+from output import NullSink
+from replay import Replayer
+from session import GameSession
+
+
+def test_send_returns_the_output_of_the_command():
+    session = GameSession("Ana", seed=1)
+    assert "Bienvenue Ana" in session.intro
+    result = session.send("go O")
+    assert "rue de Montfleur" in result.output
+    assert not result.finished and not result.won and not result.lost
+    assert session.game.player.current_room.name == "Rue de Montfleur"
+
+
+def test_unknown_command_is_reported():
+    session = GameSession("Ana", seed=1)
+    assert "Commande non reconnue" in session.send("danser").output
+
+
+def test_winning_play(winning_commands):
+    session = GameSession("Ana", seed=1)
+    results = session.send_all(winning_commands)
+    assert len(results) == len(winning_commands)
+    assert results[-1].finished and results[-1].won and not results[-1].lost
+
+
+def test_send_all_stops_when_the_game_ends(winning_commands):
+    session = GameSession("Ana", seed=1)
+    results = session.send_all(winning_commands + ["look", "look"])
+    assert len(results) == len(winning_commands)
+    assert session.commands == winning_commands
+
+
+def test_same_seed_same_game():
+    commands = ["go O", "go N", "go S", "go E", "look"] * 10
+    first = GameSession("Ana", seed=7)
+    second = GameSession("Ana", seed=7)
+    assert [r.output for r in first.send_all(commands)] == [r.output for r in second.send_all(commands)]
+    assert first.game.rng.getstate() == second.game.rng.getstate()
+
+
+def test_null_sink_produces_no_text():
+    session = GameSession("Ana", out=NullSink(), seed=1)
+    assert session.intro == ""
+    assert session.send("look").output == ""
+
+
+def test_transcript_replays_to_the_same_state():
+    session = GameSession("Ana", seed=11)
+    session.send_all(["go O", "go N", "take clé", "go S", "go E", "look"] * 3)
+    report = next(Replayer().replay(session.transcript("42").splitlines()))
+    assert report.session_id == "42"
+    assert report.seed == 11
+    assert report.commands == len(session.commands)
+    assert report.displacement_count == session.game.displacement_count
+    assert report.quests_completed == [q.title for q in session.game.quest_manager.quests if q.is_completed]
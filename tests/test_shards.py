@@ -0,0 +1,104 @@
+"""Tests of the sessions sharded across worker processes (shards.py)."""
+
+import asyncio
+import os
+import signal
+
+import pytest
+
+from shards import OPEN, SEND, ShardedSessions, ShardError, ShardPool
+
+
+@pytest.fixture
+def pool():
+    pool = ShardPool(2)
+    yield pool
+    pool.close()
+
+
+def run(pool, scenario):
+    """Run `scenario(sessions)` on an event loop and return its result."""
+    async def main():
+        sessions = ShardedSessions(pool)
+        try:
+            return await scenario(sessions)
+        finally:
+            sessions.shutdown()
+    return asyncio.run(main())
+
+
+def test_winning_game(pool, winning_commands):
+    async def scenario(sessions):
+        await sessions.open(1, "Ana")
+        for command in winning_commands:
+            output, finished = await sessions.send(1, command)
+        await sessions.close(1)
+        return output, finished
+    output, finished = run(pool, scenario)
+    assert "GAGNÉ" in output and finished
+
+
+def test_concurrent_sessions(pool):
+    async def scenario(sessions):
+        await asyncio.gather(*[sessions.open(i, "Ana") for i in range(50)])
+        replies = await asyncio.gather(*[sessions.send(i, "go O") for i in range(50)])
+        await asyncio.gather(*[sessions.close(i) for i in range(50)])
+        return replies, len(sessions)
+    replies, count = run(pool, scenario)
+    assert all(not finished for _, finished in replies)
+    assert count == 0
+
+
+def test_failing_request_is_answered_with_an_error(pool):
+    async def scenario(sessions):
+        await sessions.open(1, "Ana")
+        with pytest.raises(ShardError):
+            # Not a command string: the game raises in the worker
+            await sessions.send(1, None)
+        # The worker and the session survive the error
+        return await sessions.send(1, "look")
+    output, finished = run(pool, scenario)
+    assert not finished
+
+
+def test_execute_reports_worker_errors(pool):
+    pool.execute([pool.request(OPEN, 1, "Ana")])
+    with pytest.raises(ShardError):
+        pool.execute([pool.request(SEND, 1, None)])
+    output, finished = pool.execute([pool.request(SEND, 1, "look")])[0]
+    assert not finished
+
+
+def test_dead_worker_fails_its_requests(pool):
+    async def scenario(sessions):
+        worker = pool.worker_of(1)
+        await sessions.open(1, "Ana")
+        os.kill(pool.processes[worker].pid, signal.SIGKILL)
+        pool.processes[worker].join()
+        with pytest.raises(ShardError):
+            await asyncio.wait_for(sessions.send(1, "look"), 5)
+        # Later requests to the dead worker fail at once
+        with pytest.raises(ShardError):
+            await asyncio.wait_for(sessions.send(1, "look"), 5)
+        # The other worker still serves its sessions
+        other = next(i for i in range(100) if pool.worker_of(i) != worker)
+        return await sessions.open(other, "Ana")
+    assert "Ana" in run(pool, scenario)
+
+
+def test_resume_from_the_journals(tmp_path):
+    pool = ShardPool(2, journal=(str(tmp_path), 100))
+    try:
+        async def scenario(sessions):
+            await sessions.open("a1", "Ana")
+            await sessions.send("a1", "go O")
+            await sessions.close("a1")
+            text = await sessions.resume("a1")
+            unknown = await sessions.resume("b2")
+            await sessions.close("a1")
+            return text, unknown, len(sessions)
+        text, unknown, count = run(pool, scenario)
+    finally:
+        pool.close()
+    assert "Reprise de la partie de Ana" in text
+    assert unknown is None and count == 0
@@ -0,0 +1,39 @@
+"""Tests of the Monte Carlo simulator (simulate.py)."""
+
+from simulate import Statistics, simulate
+
+
+def test_fixed_seed_gives_stable_results():
+    first = simulate(60, seed=3, workers=1, chunk=25).to_dict()
+    second = simulate(60, seed=3, workers=1, chunk=60).to_dict()
+    assert first == second
+    assert first["games"] == 60
+    assert 0 <= first["win_rate"] <= 1 and first["win_rate"] + first["loss_rate"] <= 1
+    assert sum(first["displacements"]["histogram"].values()) == 60
+
+
+def test_results_do_not_depend_on_the_workers():
+    assert simulate(40, seed=8, workers=2, chunk=10).to_dict() == simulate(40, seed=8, workers=1).to_dict()
+
+
+def test_scripted_winning_play(winning_commands):
+    stats = simulate(5, "script", {"commands": winning_commands}, workers=1).to_dict()
+    assert stats["win_rate"] == 1.0 and stats["mean_commands"] == len(winning_commands)
+    assert stats["displacements"]["p50"] == stats["displacements"]["max"]
+    quests = stats["quests"]
+    assert quests["Inspecter la maison du crime"] == {"completion_rate": 1.0, "mean_command": 9.0,
+                                                     "mean_displacement": 0.0}
+    assert quests["Résoudre l'énigme"]["mean_command"] == len(winning_commands)
+
+
+def test_merge_adds_the_results():
+    first, second = Statistics(), Statistics()
+    first.games, first.wins, first.displacements[10] = 1, 1, 1
+    first.quests["A"] = [1, 5, 3]
+    second.games, second.losses, second.displacements[12] = 1, 1, 1
+    second.quests["A"] = [1, 7, 5]
+    first.merge(second)
+    result = first.to_dict()
+    assert (result["win_rate"], result["loss_rate"]) == (0.5, 0.5)
+    assert result["quests"]["A"] == {"completion_rate": 1.0, "mean_command": 6.0, "mean_displacement": 4.0}
+    assert result["displacements"]["histogram"] == {"10": 1, "12": 1}
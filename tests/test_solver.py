@@ -0,0 +1,59 @@
+"""Tests of the optimal solver (solver.py)."""
+
+import json
+import os
+import sys
+
+import pytest
+
+import solver
+import worlds
+
+MONTFLEUR = os.path.join(worlds.SCENARIO_DIR, "crime_a_montfleur.json")
+
+
+def scenario_file(tmp_path, **rules):
+    """Write Crime a Montfleur with changed rules and return its path."""
+    with open(MONTFLEUR, encoding="utf-8") as file:
+        spec = json.load(file)
+    spec["rules"].update(rules)
+    path = tmp_path / "variante.json"
+    path.write_text(json.dumps(spec), encoding="utf-8")
+    return str(path)
+
+
+def run_main(monkeypatch, capsys, *args):
+    monkeypatch.setattr(sys, "argv", ["solver.py", *args])
+    try:
+        solver.main()
+        status = 0
+    except SystemExit as exit:
+        status = exit.code
+    return status, capsys.readouterr()
+
+
+def test_plan_wins():
+    plan = solver.solve()
+    assert plan.displacements == 7
+    assert solver.verify(plan.commands).win()
+
+
+def test_scenario_argument(tmp_path, monkeypatch, capsys):
+    status, output = run_main(monkeypatch, capsys, scenario_file(tmp_path), "--seed", "3")
+    assert status == 0
+    assert "Plan optimal: 7 déplacements" in output.out
+    assert "Vérification: victoire" in output.out
+
+
+def test_displacement_limit_of_the_scenario(tmp_path, monkeypatch, capsys):
+    status, output = run_main(monkeypatch, capsys, scenario_file(tmp_path, max_displacements=6))
+    assert status == 1
+    assert "aucun chemin en 6 déplacements" in output.out
+
+
+def test_invalid_scenario(tmp_path, monkeypatch, capsys):
+    path = tmp_path / "vide.json"
+    path.write_text("{}", encoding="utf-8")
+    status, output = run_main(monkeypatch, capsys, str(path))
+    assert status == 2
+    assert "champ manquant" in output.err
@@ -0,0 +1,128 @@
+"""Tests of the parked session store and of the LRU cache (store.py)."""
+
+import asyncio
+
+import pytest
+
+import save
+from output import NullSink
+from server import LocalSessions, parking_cache
+from session import GameSession
+from store import GAME_MEMORY, SessionCache, SessionStore, StoreError
+
+from test_server import play, resume_code, serve
+
+
+def test_put_get_delete(tmp_path):
+    store = SessionStore(str(tmp_path / "s.tba"), capacity=8)
+    store.put("a", b"1")
+    store.put("a", b"2")
+    store.put("b", b"x" * 2000)  # compressed to fit
+    assert (store.get("a"), store.get("b"), store.get("c"), len(store)) == (b"2", b"x" * 2000, None, 2)
+    assert store.delete("a") and not store.delete("a")
+    assert "a" not in store and "b" in store
+    store.close()
+
+
+def test_rebuild_keeps_every_session(tmp_path):
+    store = SessionStore(str(tmp_path / "s.tba"), capacity=8)
+    for i in range(100):
+        store.put(i, str(i).encode())
+        if i % 3 == 0:
+            store.delete(i // 2)
+    expected = {i for i in range(100)} - {i // 2 for i in range(0, 100, 3)}
+    assert all(store.get(i) == str(i).encode() for i in expected)
+    assert len(store) == len(expected) and store.capacity > 8
+    store.close()
+
+
+def test_store_survives_a_reopen(tmp_path):
+    path = str(tmp_path / "s.tba")
+    store = SessionStore(path, capacity=8)
+    store.put("a", b"state")
+    store.close()
+    store = SessionStore(path)
+    assert store.get("a") == b"state"
+    store.close()
+
+
+def test_unknown_file_is_rejected(tmp_path):
+    path = tmp_path / "s.tba"
+    path.write_bytes(b"not a store" * 10)
+    with pytest.raises(StoreError):
+        SessionStore(str(path))
+
+
+def game(seed):
+    return GameSession("Ana", out=NullSink(), seed=seed).game
+
+
+def test_cache_parks_the_least_recently_used(tmp_path):
+    cache = SessionCache(SessionStore(str(tmp_path / "s.tba")), 2 * GAME_MEMORY)
+    games = {i: game(i) for i in range(4)}
+    for i, live in games.items():
+        cache.add(i, live)
+    assert list(cache.live) == [2, 3] and len(cache) == 4
+    restored = cache.get(0)
+    assert save.dump(restored) == save.dump(games[0])
+    assert list(cache.live) == [3, 0]
+    cache.remove(1)
+    assert 1 not in cache and len(cache) == 3
+
+
+def test_game_too_large_for_a_slot_stays_live(tmp_path):
+    store = SessionStore(str(tmp_path / "s.tba"), capacity=8, slot_size=64)
+    cache = SessionCache(store, GAME_MEMORY)
+    first, second = game(1), game(2)
+    cache.add(1, first)
+    cache.add(2, second)
+    # Neither fits: both stay live, over the budget, and nothing is lost
+    assert cache.get(1) is first and cache.get(2) is second
+    assert len(store) == 0
+    assert sorted(cache.park_all()) == [1, 2]
+    assert len(cache.live) == 2
+
+
+def test_parked_games_are_resumed_after_a_restart(tmp_path):
+    path = str(tmp_path / "s.tba")
+    cache = parking_cache(path, GAME_MEMORY)
+    text = serve(LocalSessions(cache=cache), lambda port: play(port, ["go O", "go N"]))
+    assert cache.park_all() == []
+    cache.store.close()
+
+    cache = parking_cache(path, GAME_MEMORY)
+    backend = LocalSessions(cache=cache)
+    text = serve(backend, lambda port: play(port, ["look"], f"reprendre {resume_code(text)}"))
+    assert "Reprise de la partie de Ana (2 déplacement(s))" in text
+    assert "maison de Durand" in text
+    cache.store.close()
+
+
+def test_finished_games_leave_the_cache(tmp_path, winning_commands):
+    cache = parking_cache(str(tmp_path / "s.tba"), GAME_MEMORY)
+    backend = LocalSessions(cache=cache)
+    assert "GAGNÉ" in serve(backend, lambda port: play(port, winning_commands))
+    assert len(backend) == 0
+    cache.store.close()
+
+
+def test_closing_a_parked_session_does_not_load_it(tmp_path, winning_commands):
+    cache = parking_cache(str(tmp_path / "s.tba"), GAME_MEMORY)
+    backend = LocalSessions(cache=cache)
+
+    async def scenario():
+        for i in range(3):
+            await backend.open(i, f"p{i}")
+        assert list(cache.live) == [2] and len(cache.store) == 2
+        await backend.close(0)
+        # Still parked, and the live game was not evicted for it
+        assert list(cache.live) == [2] and 0 in cache.store
+        for command in winning_commands:
+            output, finished = await backend.send(2, command)
+        # A finished game leaves the cache with its last command
+        assert finished and 2 not in cache
+        await backend.close(2)
+
+    asyncio.run(scenario())
+    assert len(backend) == 2 and len(cache.live) == 0
+    cache.store.close()
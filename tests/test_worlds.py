@@ -0,0 +1,62 @@
+"""Tests of the world templates (worlds.py)."""
+
+import pytest
+
+import worlds
+from game import Game
+from output import NullSink
+
+
+def room(game, name):
+    return next(r for r in game.rooms if r.name == name)
+
+
+def test_games_of_a_template_share_no_mutable_state(winning_commands):
+    world = worlds.crime_a_montfleur()
+    rooms, items, characters = world.rooms, world.items, world.characters
+    first = Game.create("Ana", world, NullSink(), seed=1)
+    second = Game.create("Bob", world, NullSink(), seed=1)
+    assert not {id(r) for r in first.rooms} & {id(r) for r in second.rooms}
+    assert first.quest_manager.quests[0] is not second.quest_manager.quests[0]
+
+    for command in winning_commands:
+        first.process_command(command)
+    first.set_exit(room(first, "Maison du crime"), "O", None)
+    for _ in range(50):
+        first.update_characters()
+
+    assert first.win() and not second.win()
+    # The second game is untouched: items in place, exits, NPCs, quests, progress
+    start = room(second, "Maison du crime")
+    assert "couteau" in start.inventory and "O" in start.exits
+    assert first.routes is not second.routes
+    assert not second.player.inventory and second.displacement_count == 0
+    assert second.tick == 0 and not second.analyzed_items and second.accused is None
+    assert not any(quest.is_completed for quest in second.quest_manager.quests)
+    durand = next(npc for npc in second.mobile_characters if npc.name == "Durand")
+    assert durand.current_room.name == world.rooms[next(c[2] for c in characters if c[0] == "Durand")][0]
+    # ... and so is the template
+    assert (world.rooms, world.items, world.characters) == (rooms, items, characters)
+    fresh = Game.create("Eve", world, NullSink(), seed=1)
+    assert [sorted(r.inventory) for r in fresh.rooms] == [sorted(r.inventory) for r in second.rooms]
+
+
+def test_from_spec_rejects_invalid_references():
+    spec = {"name": "Petit", "start": "Hall", "rooms": [{"name": "Hall", "description": "un hall"}],
+            "characters": [{"name": "Durand", "description": "un voisin", "room": "Hall"}],
+            "rules": {"required_items": []}}
+    assert worlds.WorldTemplate.from_spec(spec).start == 0
+    with pytest.raises(ValueError, match="Salle inconnue"):
+        worlds.WorldTemplate.from_spec(dict(spec, start="Cave"))
+    with pytest.raises(ValueError, match="Salle en double"):
+        worlds.WorldTemplate.from_spec(dict(spec, rooms=spec["rooms"] * 2))
+    with pytest.raises(ValueError, match="Objet inconnu"):
+        worlds.WorldTemplate.from_spec(dict(spec, rules={"required_items": ["gant"]}))
+
+
+def test_get_template_loads_scenario_files_once():
+    assert worlds.get_template("crime_a_montfleur") is worlds.crime_a_montfleur()
+    with pytest.raises(KeyError):
+        worlds.get_template("../crime_a_montfleur")
+    with pytest.raises(KeyError):
+        worlds.get_template("inconnu")
@@ -0,0 +1,258 @@
+"""World definition.
+
+File `worlds.py`: compile the rooms, exits, quests, objects, characters and
+rules of a world.
+
+A world is described once as plain data (a spec, read from a scenario file
+of `scenarios/` by `scenario.py`) and compiled into an immutable
+`WorldTemplate`. The template is built once per process and is
+instantiated for each game: only the mutable state (rooms with their
+inventories and characters, NPC positions, quest progress) is allocated per
+player, while descriptions, dialogues, objectives and objects are shared.
+"""
+
+# Import modules
+import os
+
+from room import Room
+from item import Item
+from quest import Quest
+from bitset import Interner
+import character
+import matcher
+
+
+# Rules of a world whose spec has none ("Crime a Montfleur")
+DEFAULT_RULES = {
+    "culprit": "Durand",
+    "required_items": ("clé", "photos", "coffre", "couteau", "arme", "lettre"),
+    "max_displacements": 40,
+}
+
+# Names stored in the progress sets of the games besides the rooms and items
+# of the spec: the flags set by the actions and the clues dropped by the NPC
+# moves (see `Game.update_characters`)
+FLAGS = ("clé_utilisée",)
+CLUE_ITEMS = ("indice_durand_commissariat", "indice_durand_inattendu")
+
+
+class WorldTemplate:
+    """
+    Compiled, immutable description of a world.
+
+    Rooms are referenced by their index in `rooms`. Objects are shared
+    between games since they are never modified during a game.
+
+    Attributes:
+        name (str): the name of the world.
+        rooms (tuple): (name, description) of each room.
+        exits (tuple): for each room, the (direction, room index) pairs.
+        start (int): the index of the starting room.
+        items (tuple): (Item, room index) of each object.
+        characters (tuple): (name, description, room index, messages,
+            allowed room indexes or None, mobile, chance to move after a
+            command) of each NPC.
+        quests (tuple): (title, description, objectives, reward, active,
+            prerequisite titles, optional) of each quest.
+        rules (dict): the culprit, the required items and the maximal
+            number of displacements (see `DEFAULT_RULES`).
+        names (Interner): the bit numbers of the room, item, flag and clue
+            names, used by the progress sets of the games (closed, see
+            `bitset.py`).
+        arguments (dict): the `FuzzyIndex` of the directions, object,
+            character and room names, shared by the matchers of the games
+            (see `matcher.py`).
+        id (str): the id of the template in the registry (see `get_template`).
+    """
+
+    def __init__(self, name, rooms, exits, start, items, characters, quests, template_id=None, rules=None):
+        self.id = template_id
+        self.name = name
+        self.rooms = rooms
+        self.exits = exits
+        self.start = start
+        self.items = items
+        self.characters = characters
+        self.quests = quests
+        self.rules = rules if rules is not None else DEFAULT_RULES
+        self.names = Interner([item.name for item, _ in items] + [room_name for room_name, _ in rooms]
+                              + list(FLAGS) + list(CLUE_ITEMS), closed=True)
+        self.arguments = matcher.argument_indexes(
+            sorted({direction for room_exits in exits for direction, _ in room_exits}),
+            [item.name for item, _ in items], [npc[0] for npc in characters], [room_name for room_name, _ in rooms])
+
+    @classmethod
+    def from_spec(cls, spec, template_id=None):
+        """
+        Validate a world spec and compile it into a template.
+
+        Parameters:
+            spec (dict): the world description (see `scenarios/crime_a_montfleur.json`).
+            template_id (str): the id of the template in the registry.
+
+        Returns:
+            WorldTemplate: the compiled world.
+
+        Raises:
+            ValueError: if the spec references an unknown or duplicate room,
+                or an unknown quest, object or character, or if quest
+                prerequisites form a cycle.
+        """
+        room_index = {}
+        for index, room in enumerate(spec["rooms"]):
+            if room["name"] in room_index:
+                raise ValueError(f"Salle en double: {room['name']}")
+            room_index[room["name"]] = index
+
+        def index_of(room_name):
+            if room_name not in room_index:
+                raise ValueError(f"Salle inconnue: {room_name}")
+            return room_index[room_name]
+
+        rooms = tuple((room["name"], room["description"]) for room in spec["rooms"])
+        exits = tuple(
+            tuple((direction, index_of(target)) for direction, target in room.get("exits", {}).items())
+            for room in spec["rooms"]
+        )
+        items = tuple(
+            (Item(item["name"], item["description"], item["weight"]), index_of(item["room"]))
+            for item in spec.get("items", [])
+        )
+        characters = []
+        for npc in spec.get("characters", []):
+            allowed = npc.get("allowed_rooms")
+            if allowed is not None:
+                allowed = tuple(index_of(room_name) for room_name in allowed)
+            characters.append((npc["name"], npc["description"], index_of(npc["room"]),
+                               tuple(npc.get("msgs", [])), allowed, npc.get("mobile", False),
+                               npc.get("move_chance", character.MOVE_CHANCE)))
+        quests = tuple(
+            (quest["title"], quest["description"], tuple(quest.get("objectives", [])),
+             quest.get("reward"), quest.get("active", False), tuple(quest.get("requires", [])),
+             quest.get("optional", False))
+            for quest in spec.get("quests", [])
+        )
+        check_quest_graph(quests)
+        rules = dict(DEFAULT_RULES, **spec.get("rules", {}))
+        rules["required_items"] = tuple(rules["required_items"])
+        item_names = {item.name for item, _ in items}
+        for name in rules["required_items"]:
+            if name not in item_names:
+                raise ValueError(f"Objet inconnu: {name}")
+        if rules["culprit"] not in {npc[0] for npc in characters}:
+            raise ValueError(f"Personnage inconnu: {rules['culprit']}")
+        return cls(spec["name"], rooms, exits, index_of(spec["start"]), items, tuple(characters), quests,
+                   template_id, rules)
+
+    def __call__(self, game):
+        """
+        Instantiate the world into the given game.
+
+        Parameters:
+            game (Game): the game object to populate.
+
+        Returns:
+            Room: the room where the player starts.
+        """
+        rooms = [Room(name, description) for name, description in self.rooms]
+        for room, exits in zip(rooms, self.exits):
+            room.exits = {direction: rooms[index] for direction, index in exits}
+
+        # Create quests
+        for title, description, objectives, reward, active, requires, optional in self.quests:
+            quest = Quest(title, description, objectives, reward, requires, optional)
+            game.quest_manager.add_quest(quest)
+            if active:
+                quest.activate()
+
+        # Add objects to rooms
+        for item, index in self.items:
+            rooms[index].inventory[item.name] = item
+
+        # Setup characters (NPCs)
+        for name, description, index, msgs, allowed, mobile, move_chance in self.characters:
+            npc = character.Character(name, description, rooms[index], msgs, mobile, move_chance)
+            if allowed is not None:
+                npc.allowed_rooms = [rooms[i] for i in allowed]
+            rooms[index].characters[name] = npc
+
+        game.rooms.extend(rooms)
+        return rooms[self.start]
+
+
+def check_quest_graph(quests):
+    """
+    Check that the quest prerequisites form a DAG of known quests.
+
+    Parameters:
+        quests (tuple): the compiled quests (see `WorldTemplate.quests`).
+
+    Raises:
+        ValueError: if a prerequisite is unknown or if they form a cycle.
+    """
+    waiting = {}
+    dependents = {}
+    for title, *_, requires, _ in quests:
+        waiting[title] = len(requires)
+        for required in requires:
+            dependents.setdefault(required, []).append(title)
+    for required in dependents:
+        if required not in waiting:
+            raise ValueError(f"Quête inconnue: {required}")
+    ready = [title for title, count in waiting.items() if count == 0]
+    while ready:
+        for title in dependents.get(ready.pop(), ()):
+            waiting[title] -= 1
+            if waiting[title] == 0:
+                ready.append(title)
+    cycle = sorted(title for title, count in waiting.items() if count > 0)
+    if cycle:
+        raise ValueError(f"Cycle de quêtes: {', '.join(cycle)}")
+
+
+# Directory of the scenario files; the id of a scenario is its file name
+SCENARIO_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "scenarios")
+
+# Compiled templates, by template id
+_templates = {}
+
+
+def register(template):
+    """
+    Make a template available by its id (saved games reference it).
+
+    Parameters:
+        template (WorldTemplate): a template with an `id`.
+    """
+    if template.id is None:
+        raise ValueError("Le monde n'a pas d'identifiant")
+    _templates[template.id] = template
+
+
+def get_template(template_id):
+    """
+    Return a template by its id, loading the scenario file
+    `SCENARIO_DIR/<id>.json` on first use.
+
+    Raises:
+        KeyError: if no world has this id.
+    """
+    template = _templates.get(template_id)
+    if template is None:
+        path = os.path.join(SCENARIO_DIR, f"{template_id}.json")
+        if os.path.basename(template_id) != template_id or not os.path.exists(path):
+            raise KeyError(f"Monde inconnu: {template_id}")
+        import scenario
+        template = scenario.load(path)
+        _templates[template_id] = template
+    return template
+
+
+def crime_a_montfleur():
+    """
+    Return the "Crime a Montfleur" template, compiled on first use.
+
+    Returns:
+        WorldTemplate: the shared template of the world.
+    """
+    return get_template("crime_a_montfleur")